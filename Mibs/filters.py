@@ -8,8 +8,10 @@ from django import forms
 from django.db import models
 from base.methods import reload_queryset
 from django.core.paginator import Page, Paginator
+from django.forms.models import ModelChoiceField, ModelChoiceIterator
+from django.urls import reverse_lazy
 from django_filters.filterset import FILTER_FOR_DBFIELD_DEFAULTS
-
+from employee.models import Employee
 
 FILTER_FOR_DBFIELD_DEFAULTS[models.ForeignKey][
     "filter_class"
@@ -41,10 +43,51 @@ def filter_by_name(queryset, name, value):
     return queryset
 
 
+class SelectedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Choice iterator rendering only the selected options, the other options
+    are searched through the autocomplete endpoint of the widget
+    """
+
+    def __init__(self, field, selected):
+        super().__init__(field)
+        selected = [value for value in selected if str(value).isdigit()]
+        self.queryset = field.queryset.filter(pk__in=selected)
+
+
+def selected_values(data, name):
+    """
+    This method is used to get the submitted values of the field
+    """
+    if hasattr(data, "getlist"):
+        return data.getlist(name)
+    value = data.get(name)
+    if value is None:
+        return []
+    return value if isinstance(value, (list, tuple)) else [value]
+
+
 class FilterSet(django_filters.FilterSet):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         reload_queryset(self.form.fields)
+        for field_name, field in self.form.fields.items():
+            # the employees are searched on demand instead of rendering every
+            # employee as an option
+            if (
+                isinstance(field, ModelChoiceField)
+                and isinstance(field.widget, forms.Select)
+                and field.queryset.model == Employee
+            ):
+                field.widget.choices = SelectedModelChoiceIterator(
+                    field, selected_values(self.data, self.form.add_prefix(field_name))
+                )
+                field.widget.attrs.update(
+                    {
+                        "data-ajax--url": reverse_lazy("employee-autocomplete"),
+                        "data-ajax--delay": 250,
+                    }
+                )
         for field_name, field in self.form.fields.items():
             filter_widget = self.filters[field_name]
             widget = filter_widget.field.widget
@@ -14,10 +14,9 @@ setattr(
     },
 )
 
+# index updates are queued and applied in batches by a background thread
 setattr(
     settings,
-    "HAYSTACK_SIGNAL_PROCESSORS",
-    {
-        "helpdesk": "helpdesk.signals.SignalProcessor",
-    },
+    "HAYSTACK_SIGNAL_PROCESSOR",
+    "helpdesk.signals.SignalProcessor",
 )
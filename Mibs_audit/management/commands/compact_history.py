@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from simple_history.models import registered_models
+from Mibs_audit.methods import compact_history
+
+
+class Command(BaseCommand):
+    help = "Removes the history entries that do not change any tracked field"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the duplicate entries without deleting them",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of entries fetched and deleted per query",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in registered_models.values():
+            manager_name = getattr(
+                model._meta, "simple_history_manager_attribute", None
+            )
+            if manager_name is None:
+                continue
+            history_model = getattr(model, manager_name).model
+            count = compact_history(
+                history_model,
+                dry_run=options["dry_run"],
+                batch_size=options["batch_size"],
+            )
+            total += count
+            if count:
+                self.stdout.write(f"{history_model._meta.label}: {count}")
+
+        action = "found" if options["dry_run"] else "removed"
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} duplicate history entries {action}")
+        )
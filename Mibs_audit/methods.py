@@ -19,31 +19,40 @@ class Bot:
         return "https://ui-avatars.com/api/?name=Mibs+Bot&background=random"
 
 
-def _check_and_delete(entry1, entry2, dry_run=False):
-    delta = entry1.diff_against(entry2)
-    if not delta.changed_fields:
-        if not dry_run:
-            entry1.delete()
-        return 1
-    return 0
-
-
-def remove_duplicate_history(instance):
+def compact_history(history_model, dry_run=False, batch_size=1000):
     """
-    This method is used to remove duplicate entries
+    This method is used to remove the update entries of the history table that
+    do not change any tracked field from the previous entry of the same object.
+    The table is walked once in object and history date order, so the cost is
+    linear in the size of the table.
+
+    Returns:
+        int: count of duplicate entries
     """
-    o_qs = instance.history_set.all()
-    entries_deleted = 0
-    # ordering is ('-history_date', '-history_id') so this is ok
-    f1 = o_qs.first()
-    if not f1:
-        return
-    for f2 in o_qs[1:]:
-        entries_deleted += _check_and_delete(
-            f1,
-            f2,
-        )
-        f1 = f2
+    object_pk = history_model.instance_type._meta.pk.attname
+    fields = [field.attname for field in history_model.tracked_fields]
+    entries = (
+        history_model._default_manager.order_by(object_pk, "history_date", "pk")
+        .values_list("pk", "history_type", object_pk, *fields)
+        .iterator(chunk_size=batch_size)
+    )
+    duplicates = []
+    previous_object = previous_values = None
+    for history_id, history_type, object_id, *values in entries:
+        if (
+            history_type == "~"
+            and object_id == previous_object
+            and values == previous_values
+        ):
+            duplicates.append(history_id)
+        previous_object, previous_values = object_id, values
+
+    if not dry_run:
+        for index in range(0, len(duplicates), batch_size):
+            history_model._default_manager.filter(
+                pk__in=duplicates[index : index + batch_size]
+            ).delete()
+    return len(duplicates)
 
 
 def get_field_label(model_class, field_name):
@@ -73,7 +82,6 @@ def get_diff(instance):
     """
     This method is used to find the differences in the history
     """
-    remove_duplicate_history(instance)
     history = instance.history_set.all()
     history_list = list(history)
     pairs = [
@@ -83,6 +91,8 @@ def get_diff(instance):
     create_history = history.filter(history_type="+").first()
     for pair in pairs:
         delta = pair[0].diff_against(pair[1])
+        if not delta.changes:
+            continue
         diffs = []
         class_name = pair[0].instance.__class__
         for change in delta.changes:
@@ -3,6 +3,7 @@ models.py
 """
 
 from collections.abc import Iterable
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.dispatch import receiver
 from simple_history.models import (
@@ -20,7 +21,6 @@ from simple_history.signals import (
 
 # from employee.models import Employee
 from Mibs.models import MibsModel
-from Mibs_audit.methods import remove_duplicate_history
 
 
 # Create your models here.
@@ -67,13 +67,41 @@ class MibsAuditInfo(models.Model):
 class MibsAuditLog(HistoricalRecords):
     """
     Model to store additional information for historical records.
+
+    Updates that do not change any tracked field are not recorded, the instance
+    is compared with its latest history entry before the insert.
     """
 
     # def __init__(self, *args, bases=None, **kwargs):
     #     super(MibsAuditLog, self).__init__(*args, **kwargs)
     #     self.is_Mibs_audit_log = True
 
-    pass
+    def post_save(self, instance, created, using=None, **kwargs):
+        if not created and not self.has_changes(instance):
+            return
+        super().post_save(instance, created, using=using, **kwargs)
+
+    def has_changes(self, instance):
+        """
+        This method is used to check the instance differs from its latest history
+        """
+        fields = self.fields_included(instance)
+        latest = (
+            getattr(instance, self.manager_name)
+            .only(*[field.attname for field in fields])
+            .first()
+        )
+        if latest is None:
+            return True
+        for field in fields:
+            try:
+                if field.to_python(getattr(instance, field.attname)) != getattr(
+                    latest, field.attname
+                ):
+                    return True
+            except ValidationError:
+                return True
+        return False
 
     # history_comments = models.ManyToManyField("HistoryComment", blank=True)
 
@@ -113,7 +141,6 @@ def post_create_Mibs_audit_log(sender, instance, *_args, **kwargs):
         )
         if isinstance(history_instance, MibsAuditLog):
             history_instance.history_title = "Demo Title"
-            remove_duplicate_history(instance)
             if instance.skip_history:
                 instance.history_set.filter(pk=history_instance.pk).delete()
             kwargs["history_instance"] = None
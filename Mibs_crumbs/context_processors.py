@@ -1,4 +1,6 @@
+from functools import lru_cache
 from urllib.parse import urlparse
+from django.core.cache import cache
 from django.shortcuts import redirect
 from Mibs.urls import urlpatterns
 from django.urls import Resolver404, path, resolve, reverse
@@ -112,76 +114,100 @@ remove_urls = [
     "employee-view-new",
 ]
 
-user_breadcrumbs = {}
+BREADCRUMBS_SESSION_KEY = "breadcrumbs"
+MAX_BREADCRUMBS = 20
+OBJECT_NAME_CACHE_TIMEOUT = 60 * 5
+
+
+@lru_cache(maxsize=4096)
+def path_resolves(check_path):
+    """
+    This method is used to check the path resolves to a view, the result is
+    memoized per path
+    """
+    try:
+        resolve(check_path)
+        return True
+    except Resolver404:
+        return False
+
+
+def object_name(model, object_id):
+    """
+    This method is used to get the display name of the object from a short
+    lived cache, returns None if the object does not exist
+    """
+    key = f"Mibs_crumbs:object_name:{model._meta.label_lower}:{object_id}"
+    name = cache.get(key)
+    if name is None:
+        instance = model.objects.filter(id=object_id).first()
+        name = str(instance) if instance else ""
+        cache.set(key, name, OBJECT_NAME_CACHE_TIMEOUT)
+    return name or None
 
 
 def breadcrumbs(request):
     base_url = request.build_absolute_uri("/")
-    user_id = str(request.user)
+    home = {"url": base_url, "name": "Mibs", "found": True}
+    session = getattr(request, "session", None)
+    if session is None:
+        return {"breadcrumbs": [home]}
 
-    if user_id not in user_breadcrumbs:
-        user_breadcrumbs[user_id] = [
-            {"url": base_url, "name": "Mibs", "found": True}
-        ]
+    stored = session.get(BREADCRUMBS_SESSION_KEY)
+    user_breadcrumb = list(stored) if stored else [home]
 
     try:
-        user_breadcrumb = user_breadcrumbs[user_id]
-
         parts = _split_path(request)
         path = base_url
         if len(parts) == 0:
-            user_breadcrumbs[user_id].clear()
-            user_breadcrumb.append({"url": base_url, "name": "Mibs", "found": True})
+            user_breadcrumb = [home]
 
         if len(parts) > 1:
             last_path = parts[-1]
             if last_path in sidebar_urls:
-                breadcrumbs = user_breadcrumbs[user_id]
-                first_path = breadcrumbs[0]
-                user_breadcrumbs[user_id].clear()
-                user_breadcrumbs[user_id].append(first_path)
-        for i, item in enumerate(parts):
-            path = path + item + "/"
-            parsed_url = urlparse(path)
-            check_path = parsed_url.path
-            try:
-                resolver_match = resolve(check_path)
-                found = True
-            except Resolver404 as e:
-                found = False
-
-            new_dict = {"url": path, "name": item, "found": found}
-
-            if item.isdigit():
+                user_breadcrumb = user_breadcrumb[:1]
+
+        # htmx partials never add breadcrumbs
+        if "HTTP_HX_REQUEST" not in request.META:
+            model_value = None
+            if any(item.isdigit() for item in parts):
                 # Handle the case when item is a digit (e.g., an ID)
-                current_url = resolve(request.path_info)
-                url_kwargs = current_url.kwargs
-                model_value = url_kwargs.get("model")
-
-                if model_value:
-                    try:
-                        object = model_value.objects.get(id=item)
-                        new_dict["name"] = str(object)
-                    except:
-                        pass
-
-            key = "HTTP_HX_REQUEST"
-            if (
-                new_dict not in user_breadcrumb
-                and new_dict["name"] not in remove_urls
-                and key not in request.META.keys()
-                and not new_dict["name"].isdigit()
-            ):
-                user_breadcrumb.append(new_dict)
-
-        user_breadcrumbs[user_id] = user_breadcrumb
+                current_url = getattr(request, "resolver_match", None)
+                if current_url is None:
+                    current_url = resolve(request.path_info)
+                model_value = current_url.kwargs.get("model")
+
+            for item in parts:
+                path = path + item + "/"
+                check_path = urlparse(path).path
+                new_dict = {
+                    "url": path,
+                    "name": item,
+                    "found": path_resolves(check_path),
+                }
+
+                if item.isdigit() and model_value:
+                    new_dict["name"] = object_name(model_value, item) or item
+
+                if (
+                    new_dict not in user_breadcrumb
+                    and new_dict["name"] not in remove_urls
+                    and not new_dict["name"].isdigit()
+                ):
+                    user_breadcrumb.append(new_dict)
+
+        if len(user_breadcrumb) > MAX_BREADCRUMBS:
+            user_breadcrumb = (
+                user_breadcrumb[:1] + user_breadcrumb[1 - MAX_BREADCRUMBS :]
+            )
 
     except Exception as e:
-        user_breadcrumb[user_id].clear()
-        user_breadcrumbs[user_id] = [
-            {"url": base_url, "name": "Mibs", "found": True}
-        ]
-    return {"breadcrumbs": user_breadcrumbs[user_id]}
+        user_breadcrumb = [home]
+
+    # the session is written only when the trail changed
+    if user_breadcrumb != stored:
+        session[BREADCRUMBS_SESSION_KEY] = user_breadcrumb
+    return {"breadcrumbs": user_breadcrumb}
 
 
 urlpatterns.append(
@@ -0,0 +1,197 @@
+"""
+asset_import.py
+
+This module is used to import the assets of an excel sheet.
+
+The rows are validated with the AssetImportForm and imported by chunks, each
+chunk in one transaction: the categories and lots of the chunk are loaded with
+one query and the missing ones bulk created, the valid assets are bulk
+created. The invalid rows are returned with their errors for the report.
+"""
+
+import pandas as pd
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.translation import gettext as _
+
+from asset.forms import AssetImportForm
+from asset.models import Asset, AssetCategory, AssetLot
+
+CHUNK_SIZE = 500
+
+# sheet column: form field
+COLUMNS = {
+    "Asset name": "asset_name",
+    "Description": "asset_description",
+    "Tracking id": "asset_tracking_id",
+    "Purchase date": "asset_purchase_date",
+    "Purchase cost": "asset_purchase_cost",
+    "Category": "asset_category",
+    "Status": "asset_status",
+    "lot number": "asset_lot_number",
+}
+ERROR_COLUMN = "Errors"
+
+
+def convert_nan(value):
+    """
+    This method is used to convert the empty cells to None
+    """
+    if pd.isna(value):
+        return None
+    return value
+
+
+def row_errors(form):
+    """
+    This method is used to join the errors of the form of a row
+    """
+    labels = {field: column for column, field in COLUMNS.items()}
+    return "; ".join(
+        f"{labels.get(field, field)}: {' '.join(messages)}"
+        for field, messages in form.errors.items()
+    )
+
+
+def resolve(model, field, values):
+    """
+    This method is used to get the records of the values of the unique field,
+    the missing ones are created
+
+    Returns:
+        dict: value: record
+    """
+    if not values:
+        return {}
+    # the field is unique across the companies
+    manager = model._base_manager
+    records = {
+        getattr(record, field): record
+        for record in manager.filter(**{f"{field}__in": values})
+    }
+    missing = [value for value in values if value not in records]
+    if missing:
+        manager.bulk_create(
+            [model(**{field: value}) for value in missing], ignore_conflicts=True
+        )
+        records.update(
+            {
+                getattr(record, field): record
+                for record in manager.filter(**{f"{field}__in": missing})
+            }
+        )
+    return records
+
+
+def import_chunk(rows, tracking_ids, created_by=None):
+    """
+    This method is used to validate and import a chunk of rows in one
+    transaction
+
+    Args:
+        rows: the rows of the chunk, as dicts of the sheet columns
+        tracking_ids: the tracking ids already imported from the sheet
+        created_by: the user importing the assets
+
+    Returns:
+        tuple: the number of imported assets and the invalid rows
+    """
+    forms = []
+    error_rows = []
+    for row in rows:
+        form = AssetImportForm(
+            {field: convert_nan(row.get(column)) for column, field in COLUMNS.items()}
+        )
+        if form.is_valid():
+            forms.append((row, form))
+        else:
+            error_rows.append({**row, ERROR_COLUMN: row_errors(form)})
+
+    existing = set(
+        Asset._base_manager.filter(
+            asset_tracking_id__in=[
+                form.cleaned_data["asset_tracking_id"] for _row, form in forms
+            ]
+        ).values_list("asset_tracking_id", flat=True)
+    )
+    valid_forms = []
+    for row, form in forms:
+        tracking_id = form.cleaned_data["asset_tracking_id"]
+        if tracking_id in existing or tracking_id in tracking_ids:
+            error_rows.append(
+                {
+                    **row,
+                    ERROR_COLUMN: _("An asset with this tracking ID already exists."),
+                }
+            )
+            continue
+        tracking_ids.add(tracking_id)
+        valid_forms.append(form)
+    if not valid_forms:
+        return 0, error_rows
+
+    with transaction.atomic():
+        categories = resolve(
+            AssetCategory,
+            "asset_category_name",
+            {form.cleaned_data["asset_category"] for form in valid_forms},
+        )
+        lots = resolve(
+            AssetLot,
+            "lot_number",
+            {
+                form.cleaned_data["asset_lot_number"]
+                for form in valid_forms
+                if form.cleaned_data["asset_lot_number"]
+            },
+        )
+        assets = Asset.objects.bulk_create(
+            [
+                Asset(
+                    asset_name=form.cleaned_data["asset_name"],
+                    asset_description=form.cleaned_data["asset_description"],
+                    asset_tracking_id=form.cleaned_data["asset_tracking_id"],
+                    asset_purchase_date=form.cleaned_data["asset_purchase_date"],
+                    asset_purchase_cost=form.cleaned_data["asset_purchase_cost"],
+                    asset_category_id=categories[form.cleaned_data["asset_category"]],
+                    asset_lot_number_id=lots.get(form.cleaned_data["asset_lot_number"]),
+                    asset_status=form.cleaned_data["asset_status"],
+                    created_by=created_by,
+                )
+                for form in valid_forms
+            ]
+        )
+    return len(assets), error_rows
+
+
+def import_assets(dataframe, created_by=None):
+    """
+    This method is used to import the assets of the sheet by chunks
+
+    Returns:
+        tuple: the number of imported assets and the invalid rows
+    """
+    rows = dataframe.to_dict("records")
+    tracking_ids = set()
+    imported = 0
+    error_rows = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        count, chunk_errors = import_chunk(
+            rows[start : start + CHUNK_SIZE], tracking_ids, created_by
+        )
+        imported += count
+        error_rows += chunk_errors
+    return imported, error_rows
+
+
+def error_report(error_rows, file_name="AssetImportError.xlsx"):
+    """
+    This method is used to return the invalid rows with their errors as excel
+    """
+    data_frame = pd.DataFrame(error_rows, columns=[*COLUMNS, ERROR_COLUMN])
+    response = HttpResponse(content_type="application/ms-excel")
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    with pd.ExcelWriter(response, engine="xlsxwriter") as writer:
+        data_frame.to_excel(writer, index=False, sheet_name="Sheet1")
+        writer.sheets["Sheet1"].set_column("A:Z", 30)
+    return response
@@ -411,3 +411,24 @@ class AssetBatchForm(ModelForm):
                 }
             ),
         }
+
+
+class AssetImportForm(forms.Form):
+    """
+    A form validating a row of the asset import sheet.
+    """
+
+    asset_name = forms.CharField(max_length=255)
+    asset_description = forms.CharField(max_length=255, required=False)
+    asset_tracking_id = forms.CharField(max_length=30)
+    asset_purchase_date = forms.DateField()
+    asset_purchase_cost = forms.DecimalField(max_digits=10, decimal_places=2)
+    asset_category = forms.CharField(max_length=255)
+    asset_lot_number = forms.CharField(max_length=30, required=False)
+    asset_status = forms.ChoiceField(choices=Asset.ASSET_STATUS, required=False)
+
+    def clean_asset_status(self):
+        """
+        The assets without status are available
+        """
+        return self.cleaned_data["asset_status"] or "Available"
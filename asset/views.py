@@ -37,6 +37,7 @@ from asset.models import (
     AssetLot,
     ReturnImages,
 )
+from asset.asset_import import error_report, import_assets
 from asset.forms import (
     AssetBatchForm,
     AssetForm,
@@ -969,12 +970,6 @@ def asset_allocation_individual_view(request, id):
     return render(request, "request_allocation/individual allocation.html", context)
 
 
-def convert_nan(val):
-    if pd.isna(val):
-        return None
-    return val
-
-
 @login_required
 @permission_required(perm="asset.add_asset")
 def asset_import(request):
@@ -991,35 +986,11 @@ def asset_import(request):
                     messages.error(request, f"{exception}")
                     return redirect(asset_category_view)
 
-                # Create Asset objects from the DataFrame and save them to the database
-                for index, row in dataframe.iterrows():
-                    asset_name = convert_nan(row["Asset name"])
-                    asset_description = convert_nan(row["Description"])
-                    asset_tracking_id = convert_nan(row["Tracking id"])
-                    purchase_date = convert_nan(row["Purchase date"])
-                    purchase_cost = convert_nan(row["Purchase cost"])
-                    category_name = convert_nan(row["Category"])
-                    lot_number = convert_nan(row["lot number"])
-                    status = convert_nan(row["Status"])
-
-                    asset_category, create = AssetCategory.objects.get_or_create(
-                        asset_category_name=category_name
-                    )
-                    asset_lot_number, create = AssetLot.objects.get_or_create(
-                        lot_number=lot_number
-                    )
-                    Asset.objects.create(
-                        asset_name=asset_name,
-                        asset_description=asset_description,
-                        asset_tracking_id=asset_tracking_id,
-                        asset_purchase_date=purchase_date,
-                        asset_purchase_cost=purchase_cost,
-                        asset_category_id=asset_category,
-                        asset_status=status,
-                        asset_lot_number_id=asset_lot_number,
-                    )
-
-                messages.success(request, _("Successfully imported Assets"))
+                imported, error_rows = import_assets(dataframe, created_by=request.user)
+                if imported:
+                    messages.success(request, _("Successfully imported Assets"))
+                if error_rows:
+                    return error_report(error_rows)
                 return redirect(asset_category_view)
             messages.error(request, _("File Error"))
             return redirect(asset_category_view)
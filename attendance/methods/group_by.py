@@ -2,63 +2,177 @@
 group_by.py
 
 This module is used to make queryset by groups
+
+The groups are built with two queries whatever the number of groups: one
+aggregate query for the per group counts and one windowed query
+(ROW_NUMBER() OVER (PARTITION BY group)) for the current page rows of every
+group on the page.
 """
 
-from datetime import datetime
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Count, ExpressionWrapper, F, Max, Min, Q, Window
 from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
-from django.core.paginator import Paginator
+from django.db.models.functions import RowNumber
 from base.thread_local_middleware import _thread_locals
-from django.db import models
+
+GROUP_KEY = "_group_key"
+GROUP_ROW_NUMBER = "_group_row_number"
 
 
-def record_queryset_paginator(request, queryset, page_name, records_per_page=10):
+class GroupPaginator(Paginator):
     """
-    This method is used to return the paginator entries
+    Paginator of a single group, the count and the rows of the current page
+    are fetched beforehand together with the other groups
     """
-    page = request.GET.get(page_name)
-    queryset = Paginator(queryset, records_per_page)
-    queryset = queryset.get_page(page)
-    return queryset
 
+    def __init__(self, count, per_page):
+        super().__init__([], per_page)
+        self.count = count
+
+    def valid_page_number(self, number):
+        """
+        This method is used to return a valid page number like get_page does
+        """
+        try:
+            return self.validate_number(number)
+        except PageNotAnInteger:
+            return 1
+        except EmptyPage:
+            return self.num_pages
+
+    def page_with_rows(self, number, rows):
+        """
+        This method is used to return the page with the prefetched rows
+        """
+        return self._get_page(rows, number, self)
 
-def generate_groups(request, groupers, queryset, page_name, group_field, is_fk_field):
+
+def queryset_ordering(queryset):
     """
-    groups generating method
+    This method is used to return the ordering of the queryset with the pk
+    as tie breaker, so that the row numbers are stable
     """
-    groups = []
-    if is_fk_field:
-        for grouper in groupers:
-            group_queryset = queryset.filter(**{group_field: grouper.id})
-            # to avoid zero records groupings
-            if group_queryset.count():
-                group_info = {
-                    "grouper": grouper,
-                    "list": record_queryset_paginator(
-                        request,
-                        group_queryset,
-                        f"dynamic_page_{page_name}{grouper.id}",
-                    ),
-                    "dynamic_name": f"dynamic_page_{page_name}{grouper.id}",
-                }
-                groups.append(group_info)
+    if queryset.query.order_by:
+        ordering = list(queryset.query.order_by)
+    elif queryset.query.default_ordering:
+        ordering = list(queryset.model._meta.ordering)
     else:
-        for grouper in groupers:
-            group_queryset = queryset.filter(**{group_field: grouper})
-            # to avoid zero records groupings
-            if group_queryset.count():
-                group = {
-                    "grouper": grouper,
-                    "list": record_queryset_paginator(
-                        request,
-                        group_queryset,
-                        f"dynamic_page_{page_name}{grouper}".replace(" ", "_"),
-                    ),
-                    "dynamic_name": f"dynamic_page_{page_name}{grouper}".replace(
-                        " ", "_"
-                    ),
-                }
-                groups.append(group)
-    return groups
+        ordering = []
+    return [order for order in ordering if order != "?"] + ["pk"]
+
+
+def group_counts(queryset, group_field):
+    """
+    This method is used to find the count of records in each group with one
+    aggregate query, the groups are in the order the values first appear in
+    the queryset ordering
+
+    Returns:
+        dict: {group value: count}
+    """
+    primary_order = queryset_ordering(queryset)[0]
+    counts = queryset.values(group_field).annotate(count=Count("pk", distinct=True))
+    if isinstance(primary_order, str) and primary_order != "pk":
+        descending = primary_order.startswith("-")
+        order_field = primary_order.lstrip("-")
+        counts = counts.annotate(
+            first_seen=Max(order_field) if descending else Min(order_field)
+        ).order_by(
+            (
+                F("first_seen").desc(nulls_last=True)
+                if descending
+                else F("first_seen").asc(nulls_last=True)
+            ),
+            F(group_field).asc(),
+        )
+    else:
+        counts = counts.order_by(F(group_field).asc())
+    return {row[group_field]: row["count"] for row in counts}
+
+
+def group_rows(queryset, group_field, pages, records_per_page=10):
+    """
+    This method is used to fetch the rows of the requested page of every group
+    with one windowed query
+
+    Args:
+        pages: {group value: page number}
+
+    Returns:
+        dict: {group value: [records]}
+    """
+    if not pages:
+        return {}
+    offsets = {}
+    for key, number in pages.items():
+        offsets.setdefault(number, []).append(key)
+
+    condition = Q()
+    for number, keys in offsets.items():
+        row_range = Q(
+            **{
+                f"{GROUP_ROW_NUMBER}__gt": (number - 1) * records_per_page,
+                f"{GROUP_ROW_NUMBER}__lte": number * records_per_page,
+            }
+        )
+        values = [key for key in keys if key is not None]
+        group_condition = Q(**{f"{GROUP_KEY}__in": values}) if values else Q()
+        if None in keys:
+            null_condition = Q(**{f"{GROUP_KEY}__isnull": True})
+            group_condition = (
+                group_condition | null_condition if values else null_condition
+            )
+        condition |= group_condition & row_range
+
+    # wrapped so that the key is not merged with the column of the same name,
+    # which breaks the window filtering when the ordering spans a relation
+    group_key = ExpressionWrapper(
+        F(group_field),
+        output_field=queryset.query.clone().resolve_ref(group_field).output_field,
+    )
+    records = queryset.annotate(
+        **{
+            GROUP_KEY: group_key,
+            GROUP_ROW_NUMBER: Window(
+                RowNumber(),
+                partition_by=[F(group_field)],
+                order_by=queryset_ordering(queryset),
+            ),
+        }
+    ).filter(condition)
+
+    rows = {}
+    for record in records:
+        rows.setdefault(getattr(record, GROUP_KEY), []).append(record)
+    return rows
+
+
+def generate_groups(
+    request, groupers, counts, queryset, group_field, records_per_page=10
+):
+    """
+    groups generating method
+
+    Args:
+        groupers: list of (group value, grouper, dynamic page name)
+        counts: {group value: count}
+    """
+    paginators = {}
+    pages = {}
+    for key, _grouper, dynamic_name in groupers:
+        paginators[key] = GroupPaginator(counts.get(key, 0), records_per_page)
+        pages[key] = paginators[key].valid_page_number(
+            request.GET.get(dynamic_name) if request is not None else None
+        )
+    rows = group_rows(queryset, group_field, pages, records_per_page)
+    return [
+        {
+            "grouper": grouper,
+            "list": paginators[key].page_with_rows(pages[key], rows.get(key, [])),
+            "dynamic_name": dynamic_name,
+        }
+        for key, grouper, dynamic_name in groupers
+    ]
 
 
 def group_by_queryset(
@@ -73,51 +187,70 @@ def group_by_queryset(
     is_fk_field = isinstance(
         getattr(model, group_field, None), ForwardManyToOneDescriptor
     )
-    model_copy = model
-    field_obj = None
 
     # geting request from the thread locals
     request = getattr(_thread_locals, "request", None)
     if splited or is_fk_field:
+        model_copy = model
         for field in fields_split:
-            field_obj = model_copy._meta.get_field(field)
-            model_copy = field_obj.related_model
-        if model_copy:
-            groupers = model_copy.objects.all()
-            groups = generate_groups(
-                request,
-                groupers,
-                queryset,
-                page_name,
-                group_field,
-                is_fk_field=True,
+            model_copy = model_copy._meta.get_field(field).related_model
+        related_model = model_copy
+    else:
+        related_model = model._meta.get_field(group_field).related_model
+
+    # to avoid zero records groupings only the groups having records are listed
+    counts = group_counts(queryset, group_field)
+    if related_model:
+        groupers = [
+            (
+                grouper.pk,
+                grouper,
+                (
+                    f"dynamic_page_{page_name}{grouper.id}"
+                    if splited or is_fk_field
+                    else f"dynamic_page_{page_name}{grouper}".replace(" ", "_")
+                ),
             )
-        else:
-            groupers = [
-                item
-                for index, item in enumerate(
-                    queryset.values_list(group_field, flat=True)
-                )
-                if item not in queryset.values_list(group_field, flat=True)[:index]
-            ]
-            groups = generate_groups(
-                request, groupers, queryset, page_name, group_field, is_fk_field=False
+            for grouper in related_model.objects.filter(
+                pk__in=[key for key in counts if key is not None]
             )
-
+        ]
     else:
-        # making unique | not using set(groupers) due to ordering issue
         groupers = [
-            item
-            for index, item in enumerate(queryset.values_list(group_field, flat=True))
-            if item not in queryset.values_list(group_field, flat=True)[:index]
+            (key, key, f"dynamic_page_{page_name}{key}".replace(" ", "_"))
+            for key in counts
         ]
-        # getting related queryset
-        related_model = queryset.model._meta.get_field(group_field).related_model
-        if related_model:
-            groupers = related_model.objects.filter(id__in=groupers)
-        groups = generate_groups(
-            request, groupers, queryset, page_name, group_field, is_fk_field=False
-        )
 
-    groups = Paginator(groups, records_per_page)
-    return groups.get_page(page)
+    groups = Paginator(groupers, records_per_page).get_page(page)
+    groups.object_list = generate_groups(
+        request, groups.object_list, counts, queryset, group_field
+    )
+    return groups
+
+
+def group_by_groupers(queryset, group_field, groupers, records_per_page=10):
+    """
+    This method is used to group the queryset into the given groupers (like the
+    stages of the pipelines) with one count query and one windowed query, the
+    groupers without records are returned without the list
+
+    Args:
+        groupers: list of (group value, grouper, dynamic page name)
+    """
+    request = getattr(_thread_locals, "request", None)
+    counts = group_counts(queryset, group_field)
+    groups = {
+        group["dynamic_name"]: group
+        for group in generate_groups(
+            request,
+            [grouper for grouper in groupers if counts.get(grouper[0])],
+            counts,
+            queryset,
+            group_field,
+            records_per_page,
+        )
+    }
+    return [
+        groups.get(dynamic_name, {"grouper": grouper})
+        for _key, grouper, dynamic_name in groupers
+    ]
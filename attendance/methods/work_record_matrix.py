@@ -0,0 +1,138 @@
+"""
+work_record_matrix.py
+
+This module is used to build the month wise work record matrix
+(employees x days) shown in the work records view.
+
+Employees are paginated first, then the work records of the requested
+page are fetched in one query and pivoted into the day grid. Grids of
+closed months are cached, the cache is invalidated whenever a work
+record of that month is saved or deleted.
+"""
+
+import calendar
+import hashlib
+import uuid
+from datetime import date
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from payroll.models.models import WorkRecord
+
+CACHE_PREFIX = "attendance:work_record_matrix"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def month_date_list(year: int, month: int) -> list:
+    """
+    This method is used to return all the dates in the month
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    return [date(year, month, day) for day in range(1, days_in_month + 1)]
+
+
+def is_closed_month(year: int, month: int) -> bool:
+    """
+    This method is used to check the month is completely in the past
+    """
+    today = date.today()
+    return (year, month) < (today.year, today.month)
+
+
+def _version_key(year, month):
+    return f"{CACHE_PREFIX}:{year}-{month:02d}:version"
+
+
+def month_version(year: int, month: int) -> str:
+    """
+    This method is used to get the current cache version of the month
+    """
+    return cache.get_or_set(_version_key(year, month), uuid.uuid4().hex, None)
+
+
+def invalidate_month(year: int, month: int) -> None:
+    """
+    This method is used to drop the cached grids of the month
+    """
+    cache.set(_version_key(year, month), uuid.uuid4().hex, None)
+
+
+def _grid_key(year, month, employee_ids):
+    digest = hashlib.md5(
+        ",".join(str(employee_id) for employee_id in employee_ids).encode()
+    ).hexdigest()
+    return (
+        f"{CACHE_PREFIX}:{year}-{month:02d}:"
+        f"{month_version(year, month)}:{digest}"
+    )
+
+
+def build_grid(employee_ids: list, date_list: list) -> dict:
+    """
+    This method is used to pivot the work records of the employees into
+    {employee_id: [work_record or None for each day]} with one query
+    """
+    grid = {employee_id: [None] * len(date_list) for employee_id in employee_ids}
+    day_index = {day: index for index, day in enumerate(date_list)}
+    work_records = WorkRecord.objects.filter(
+        employee_id__in=employee_ids,
+        date__range=(date_list[0], date_list[-1]),
+    ).only(
+        "id",
+        "employee_id",
+        "date",
+        "work_record_type",
+        "message",
+    )
+    for record in work_records:
+        grid[record.employee_id_id][day_index[record.date]] = record
+    return grid
+
+
+def get_month_grid(employee_ids: list, year: int, month: int) -> dict:
+    """
+    This method is used to get the day grid of the employees for the month,
+    closed months are served from the cache
+    """
+    date_list = month_date_list(year, month)
+    if not is_closed_month(year, month):
+        return build_grid(employee_ids, date_list)
+
+    key = _grid_key(year, month, employee_ids)
+    grid = cache.get(key)
+    if grid is None:
+        grid = build_grid(employee_ids, date_list)
+        cache.set(key, grid, CACHE_TIMEOUT)
+    return grid
+
+
+def work_record_matrix(employees, year, month, page_number, per_page):
+    """
+    This method is used to paginate the employees and attach the work record
+    row of the month to each employee on the requested page
+
+    Returns:
+        tuple: (list of dates in the month, page of {"employee", "work_record"})
+    """
+    date_list = month_date_list(year, month)
+    page = Paginator(employees, per_page).get_page(page_number)
+    employee_list = list(page.object_list)
+    grid = get_month_grid([employee.id for employee in employee_list], year, month)
+    page.object_list = [
+        {"employee": employee, "work_record": grid[employee.id]}
+        for employee in employee_list
+    ]
+    return date_list, page
+
+
+@receiver(post_save, sender=WorkRecord)
+@receiver(post_delete, sender=WorkRecord)
+def work_record_changed(sender, instance, **_kwargs):
+    """
+    Invalidate the cached grids of the month the work record belongs to
+    """
+    if instance.date and is_closed_month(instance.date.year, instance.date.month):
+        invalidate_month(instance.date.year, instance.date.month)
@@ -13,7 +13,7 @@ from django.template import TemplateSyntaxError
 from django.template.defaultfilters import register
 from attendance.views.views import strtime_seconds
 from attendance.models import AttendanceValidationCondition
-
+from base.request_cache import request_cached, subordinate_ids
 
 register = template.Library()
 
@@ -30,9 +30,14 @@ def checkminimumot(ot=None):
     the attendance validation condition
     """
     if ot is not None:
-        condition = AttendanceValidationCondition.objects.all()
-        if condition.exists():
-            minimum_overtime_to_approve = condition[0].minimum_overtime_to_approve
+        condition = request_cached(
+            "attendance_validation_condition",
+            lambda: AttendanceValidationCondition.objects.values(
+                "minimum_overtime_to_approve"
+            ).first(),
+        )
+        if condition:
+            minimum_overtime_to_approve = condition["minimum_overtime_to_approve"]
             overtime_second = strtime_seconds(ot)
             minimum_ot_approve_seconds = strtime_seconds(minimum_overtime_to_approve)
             if overtime_second > minimum_ot_approve_seconds:
@@ -51,9 +56,8 @@ def checkmanager(user, employee):
     """
 
     employee_user = user.employee_get
-    employee_manager = employee.employee_work_info.reporting_manager_id
     return bool(
-        employee_user == employee_manager
+        employee.pk in subordinate_ids(employee_user)
         or user.is_superuser
         or user.has_perm("attendance.change_attendance")
     )
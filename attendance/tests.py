@@ -1,3 +1,79 @@
+import html
+import re
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from attendance.models import AttendanceActivity
+from base.keyset_paginator import KEYSET_DEPTH
+from employee.models import Employee
+
+PER_PAGE = 2
+
+
+class ActivityKeysetPaginationTests(TestCase):
+    """
+    Pagination of the attendance activities past KEYSET_DEPTH pages
+    """
+
+    def setUp(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        employee = Employee.objects.create(
+            employee_user_id=user,
+            employee_first_name="Admin",
+            email="admin@example.com",
+            phone="1",
+        )
+        self.first_date = date(2024, 1, 1)
+        AttendanceActivity.objects.bulk_create(
+            [
+                AttendanceActivity(
+                    employee_id=employee,
+                    attendance_date=self.first_date + timedelta(days=index),
+                    clock_in=time(9),
+                )
+                for index in range(PER_PAGE * KEYSET_DEPTH + 5)
+            ]
+        )
+        self.client.force_login(user)
+        patcher = mock.patch(
+            "attendance.views.views.get_pagination", return_value=PER_PAGE
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url):
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def next_url(self, response):
+        link = re.search(r'hx-get="([^"]*)"[^>]*>\s*Next', response.content.decode())
+        return html.unescape(link.group(1)) if link else None
+
+    def days(self, response):
+        return [
+            (activity.attendance_date - self.first_date).days
+            for activity in response.context["data"]
+        ]
+
+    def test_deep_pages_continue_in_cursor_mode(self):
+        url = reverse("attendance-activity-search")
+        response = self.get(f"{url}?page={KEYSET_DEPTH - 1}")
+        self.assertNotIn("cursor=", self.next_url(response))
+
+        response = self.get(f"{url}?page={KEYSET_DEPTH}")
+        self.assertEqual(self.days(response), [6, 5])
+        next_url = self.next_url(response)
+        self.assertIn("cursor=", next_url)
+
+        # ordered by the latest attendance date first
+        response = self.get(next_url)
+        self.assertTrue(response.context["data"].keyset)
+        self.assertEqual(self.days(response), [4, 3])
 
-# Create your tests here.
+        response = self.get(self.next_url(response))
+        self.assertEqual(self.days(response), [2, 1])
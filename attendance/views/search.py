@@ -7,6 +7,7 @@ This is moduel is used to register end point related to the search filter functi
 import json
 from datetime import datetime
 from urllib.parse import parse_qs
+from django.db.models import Count, Q
 from django.shortcuts import render
 from attendance.methods.group_by import group_by_queryset
 from base.methods import filtersubordinates, sortby, get_key_instances
@@ -33,11 +34,40 @@ from attendance.views.views import paginator_qry, strtime_seconds
 from django.utils.translation import gettext_lazy as _
 
 
+# tab name: (tab content id, page parameter, rows context key, ids context key)
+ATTENDANCE_TABS = {
+    "validate": (
+        "tab_1",
+        "vpage",
+        "validate_attendances",
+        "validate_attendances_ids",
+    ),
+    "overtime": ("tab_3", "opage", "overtime_attendances", "ot_attendances_ids"),
+    "validated": ("tab_2", "page", "attendances", "attendances_ids"),
+}
+
+
+def attendance_tab_conditions(minot):
+    """
+    This method is used to return the condition of each attendance tab
+    """
+    return {
+        "validate": Q(attendance_validated=False),
+        "overtime": Q(attendance_validated=True, overtime_second__gte=minot),
+        "validated": Q(attendance_validated=True),
+    }
+
+
 @login_required
 @manager_can_enter("attendance.view_attendance")
 def attendance_search(request):
     """
     This method is used to search attendances
+
+    The filters are compiled once into a base queryset shared by the tabs.
+    Without a tab parameter the tab container is rendered with the tab
+    counts and each tab loads its rows when it is shown, with the tab
+    parameter only the rows of that tab are fetched.
     """
     month_name = ""
     params = [
@@ -47,9 +77,13 @@ def attendance_search(request):
         "attendance_date__lte",
     ]
     remove_params = []
-    if params == list(request.GET.keys()):
+    query_params = [key for key in request.GET.keys() if key != "tab"]
+    if params == query_params:
         remove_params = [param for param in params if param != "employee_id"]
-    previous_data = request.GET.urlencode()
+    tab = request.GET.get("tab")
+    query = request.GET.copy()
+    query.pop("tab", None)
+    previous_data = query.urlencode()
     field = request.GET.get("field")
     minot = strtime_seconds("00:00")
     condition = AttendanceValidationCondition.objects.first()
@@ -60,109 +94,77 @@ def attendance_search(request):
     if condition is not None and condition.minimum_overtime_to_approve is not None:
         minot = strtime_seconds(condition.minimum_overtime_to_approve)
 
-    validate_attendances = all_attendances.filter(attendance_validated=False)
-    attendances = all_attendances.filter(attendance_validated=True)
-    ot_attendances = all_attendances.filter(
-        overtime_second__gte=minot,
-        attendance_validated=True,
-    )
-
-    validate_attendances = AttendanceFilters(request.GET, validate_attendances).qs
-    attendances = AttendanceFilters(request.GET, attendances).qs
-    ot_attendances = AttendanceFilters(request.GET, ot_attendances).qs
-
+    attendances = AttendanceFilters(request.GET, all_attendances).qs
     if not request.user.has_perm("attendance.view_attendance"):
         attendances = filtersubordinates(
             request, attendances, "attendance.view_attendance"
         )
-        validate_attendances = filtersubordinates(
-            request, validate_attendances, "attendance.view_attendance"
-        )
-        ot_attendances = filtersubordinates(
-            request, ot_attendances, "attendance.view_attendance"
+
+    conditions = attendance_tab_conditions(minot)
+    if params == query_params:
+        conditions = {name: conditions["validated"] for name in conditions}
+
+    template = "attendance/attendance/tab_content.html"
+    if field != "" and field is not None:
+        template = "attendance/attendance/group_by.html"
+
+    if tab not in ATTENDANCE_TABS:
+        tab_counts = attendances.aggregate(
+            **{
+                name: Count("id", filter=tab_condition)
+                for name, tab_condition in conditions.items()
+            }
         )
-    data_dict = parse_qs(previous_data)
-    get_key_instances(Attendance, data_dict)
-    keys_to_remove = [
-        key
-        for key, value in data_dict.items()
-        if value == ["unknown"] or key in remove_params
-    ]
-    for key in keys_to_remove:
-        data_dict.pop(key)
-    if params == list(request.GET.keys()):
-        ot_attendances = validate_attendances = attendances
-        template = "attendance/attendance/validate_attendance.html"
-        if not attendances:
+        data_dict = parse_qs(previous_data)
+        get_key_instances(Attendance, data_dict)
+        keys_to_remove = [
+            key
+            for key, value in data_dict.items()
+            if value == ["unknown"] or key in remove_params
+        ]
+        for key in keys_to_remove:
+            data_dict.pop(key)
+        if params == query_params and not tab_counts["validated"]:
             date_object = datetime.strptime(
                 request.GET.get("attendance_date__gte"), "%Y-%m-%d"
             )
             month_name = _(date_object.strftime("%B"))
-            template = "attendance/attendance/validate_attendance_empty.html"
-
-    template = "attendance/attendance/tab_content.html"
-    validate_attendances_ids, ot_attendances_ids, attendances_ids = [], [], []
-    if field != "" and field is not None:
-        attendances = group_by_queryset(
-            attendances, field, request.GET.get("page"), "page"
+        return render(
+            request,
+            template,
+            {
+                "tab_counts": tab_counts,
+                "pd": previous_data,
+                "field": field,
+                "filter_dict": data_dict,
+                "month_name": month_name,
+            },
         )
-        list_values = [entry["list"] for entry in attendances]
-        id_list = []
-        for value in list_values:
-            for instance in value.object_list:
-                id_list.append(instance.id)
-        attendances_ids = json.dumps(list(id_list))
 
-        validate_attendances = group_by_queryset(
-            validate_attendances, field, request.GET.get("vpage"), "vpage"
-        )
-        list_values = [entry["list"] for entry in validate_attendances]
-        id_list = []
-        for value in list_values:
-            for instance in value.object_list:
-                id_list.append(instance.id)
-        validate_attendances_ids = json.dumps(list(id_list))
-
-        ot_attendances = group_by_queryset(
-            ot_attendances, field, request.GET.get("opage"), "opage"
+    tab_id, page_param, rows_key, ids_key = ATTENDANCE_TABS[tab]
+    attendances = attendances.filter(conditions[tab])
+    if template == "attendance/attendance/group_by.html":
+        attendances = group_by_queryset(
+            attendances, field, request.GET.get(page_param), page_param
         )
-        list_values = [entry["list"] for entry in ot_attendances]
-        id_list = []
-        for value in list_values:
-            for instance in value.object_list:
-                id_list.append(instance.id)
-        ot_attendances_ids = json.dumps(list(id_list))
-
-        template = "attendance/attendance/group_by.html"
+        ids = [
+            instance.id
+            for entry in attendances
+            for instance in entry["list"].object_list
+        ]
     else:
-        validate_attendances = paginator_qry(
-            validate_attendances, request.GET.get("vpage")
-        )
-        ot_attendances = paginator_qry(ot_attendances, request.GET.get("opage"))
-        attendances = paginator_qry(attendances, request.GET.get("page"))
-        validate_attendances_ids = json.dumps(
-            [instance.id for instance in validate_attendances.object_list]
-        )
-        ot_attendances_ids = json.dumps(
-            [instance.id for instance in ot_attendances.object_list]
-        )
-        attendances_ids = json.dumps(
-            [instance.id for instance in attendances.object_list]
-        )
+        attendances = paginator_qry(attendances, request.GET.get(page_param))
+        ids = [instance.id for instance in attendances.object_list]
     return render(
         request,
         template,
         {
-            "validate_attendances": validate_attendances,
-            "attendances": attendances,
-            "overtime_attendances": ot_attendances,
-            "validate_attendances_ids": validate_attendances_ids,
-            "ot_attendances_ids": ot_attendances_ids,
-            "attendances_ids": attendances_ids,
-            "pd": previous_data,
+            "tab": tab,
+            "tab_id": tab_id,
+            rows_key: attendances,
+            ids_key: json.dumps(ids),
+            "pd": request.GET.urlencode(),
             "field": field,
-            "filter_dict": data_dict,
-            "month_name": month_name,
         },
     )
 
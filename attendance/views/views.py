@@ -11,7 +11,6 @@ This module is part of the recruitment project and is intended to
 provide the main entry points for interacting with the application's functionality.
 """
 
-import calendar
 import json
 import contextlib
 from datetime import datetime, timedelta
@@ -22,7 +21,6 @@ from django.shortcuts import render, redirect
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import gettext as __
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import ProtectedError
 from django.http import HttpResponseRedirect, HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -35,12 +33,14 @@ from Mibs.decorators import (
 )
 from base.methods import closest_numbers, export_data, get_pagination
 from base.methods import get_key_instances
+from base.keyset_paginator import paginate
 from base.models import EmployeeShiftSchedule
 from base.methods import filtersubordinates, choosesubordinates
 from leave.models import WEEK_DAYS, CompanyLeave, Holiday
 from notifications.signals import notify
 from attendance.views.handle_attendance_errors import handle_attendance_errors
 from attendance.views.process_attendance_data import process_attendance_data
+from attendance.methods.work_record_matrix import work_record_matrix
 from attendance.filters import (
     AttendanceFilters,
     AttendanceOverTimeFilter,
@@ -240,9 +240,7 @@ def paginator_qry(qryset, page_number):
     """
     This method is used to paginate queryset
     """
-    paginator = Paginator(qryset, get_pagination())
-    qryset = paginator.get_page(page_number)
-    return qryset
+    return paginate(qryset, get_pagination(), page_number)
 
 
 def attendance_excel(_request):
@@ -325,80 +323,22 @@ def attendance_view(request):
     previous_data = request.GET.urlencode()
     form = AttendanceForm()
     export_form = AttendanceExportForm()
-    condition = AttendanceValidationCondition.objects.first()
-    minot = strtime_seconds("00:00")
-    if condition is not None and condition.minimum_overtime_to_approve is not None:
-        minot = strtime_seconds(condition.minimum_overtime_to_approve)
-    validate_attendances = Attendance.objects.filter(
-        attendance_validated=False, employee_id__is_active=True
-    )
     attendances = Attendance.objects.filter(
         attendance_validated=True, employee_id__is_active=True
     )
-    ot_attendances = Attendance.objects.filter(
-        overtime_second__gte=minot,
-        attendance_validated=True,
-        employee_id__is_active=True,
-    )
     filter_obj = AttendanceFilters(request.GET, queryset=attendances)
-    attendances = filtersubordinates(
-        request, filter_obj.qs, "attendance.view_attendance"
-    )
-    validate_attendances = AttendanceFilters(
-        request.GET, queryset=validate_attendances
-    ).qs
-    validate_attendances = filtersubordinates(
-        request, validate_attendances, "attendance.view_attendance"
-    )
-    ot_attendances = AttendanceFilters(request.GET, queryset=ot_attendances).qs
-    ot_attendances = filtersubordinates(
-        request, ot_attendances, "attendance.view_attendance"
-    )
     check_attendance = Attendance.objects.all()
     if check_attendance.exists():
         template = "attendance/attendance/attendance_view.html"
     else:
         template = "attendance/attendance/attendance_empty.html"
-    validate_attendances_ids = json.dumps(
-        [
-            instance.id
-            for instance in paginator_qry(
-                validate_attendances, request.GET.get("vpage")
-            ).object_list
-        ]
-    )
-    ot_attendances_ids = json.dumps(
-        [
-            instance.id
-            for instance in paginator_qry(
-                ot_attendances, request.GET.get("opage")
-            ).object_list
-        ]
-    )
-    attendances_ids = json.dumps(
-        [
-            instance.id
-            for instance in paginator_qry(
-                attendances, request.GET.get("page")
-            ).object_list
-        ]
-    )
+    # the tabs are loaded by attendance_search once the page is shown
     return render(
         request,
         template,
         {
             "form": form,
             "export_form": export_form,
-            # "validate_attendances": paginator_qry(
-            #     validate_attendances, request.GET.get("vpage")
-            # ),
-            # "attendances": paginator_qry(attendances, request.GET.get("page")),
-            # "overtime_attendances": paginator_qry(
-            #     ot_attendances, request.GET.get("opage")
-            # ),
-            "validate_attendances_ids": validate_attendances_ids,
-            "ot_attendances_ids": ot_attendances_ids,
-            "attendances_ids": attendances_ids,
             "f": filter_obj,
             "export": AttendanceFilters(queryset=Attendance.objects.all()),
             "pd": previous_data,
@@ -1931,39 +1871,20 @@ def delete_comment_file(request):
 
 @login_required
 def work_records(request):
-    employees = Employee.objects.filter(is_active=True)
-    data = []
     today = date.today()
-    month_matrix = calendar.monthcalendar(today.year, today.month)
-
-    days = [day for week in month_matrix for day in week if day != 0]
-    current_month_date_list = [
-        datetime(today.year, today.month, day).date() for day in days
-    ]
-
-    for employee in employees:
-        work_record_list = []
-        work_records_dict = {
-            record.date: record
-            for record in WorkRecord.objects.filter(
-                employee_id=employee, date__in=current_month_date_list
-            )
-        }
-
-        for day in current_month_date_list:
-            work_record = work_records_dict.get(day, None)
-            work_record_list.append(work_record)
-        data.append(
-            {
-                "employee": employee,
-                "work_record": work_record_list,
-            }
-        )
+    current_month_date_list, data = work_record_matrix(
+        Employee.objects.filter(is_active=True),
+        today.year,
+        today.month,
+        1,
+        get_pagination(),
+    )
 
     context = {
         "current_date": today,
         "current_month_dates_list": current_month_date_list,
-        "data": paginator_qry(data, 1),
+        "data": data,
+        "pd": f"month={today:%Y-%m}",
     }
     return render(
         request, "attendance/work_record/work_record_view.html", context=context
@@ -1981,35 +1902,18 @@ def work_records_change_month(request):
         month = date.today().month
         year = date.today().year
 
-    employees = Employee.objects.filter(is_active=True)
-    data = []
-    month_matrix = calendar.monthcalendar(year, month)
-
-    days = [day for week in month_matrix for day in week if day != 0]
-    current_month_date_list = [datetime(year, month, day).date() for day in days]
-
-    for employee in employees:
-        work_record_list = []
-        work_records_dict = {
-            record.date: record
-            for record in WorkRecord.objects.filter(
-                employee_id=employee, date__in=current_month_date_list
-            )
-        }
-
-        for day in current_month_date_list:
-            work_record = work_records_dict.get(day, None)
-            work_record_list.append(work_record)
-        data.append(
-            {
-                "employee": employee,
-                "work_record": work_record_list,
-            }
-        )
+    current_month_date_list, data = work_record_matrix(
+        Employee.objects.filter(is_active=True),
+        year,
+        month,
+        request.GET.get("page"),
+        get_pagination(),
+    )
 
     context = {
         "current_month_dates_list": current_month_date_list,
-        "data": paginator_qry(data, request.GET.get("page")),
+        "data": data,
+        "pd": f"month={year}-{month:02d}",
     }
     return render(
         request, "attendance/work_record/work_record_list.html", context=context
@@ -2,9 +2,36 @@
 Mibs_company_manager.py
 """
 
-import threading
+import contextvars
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
-from base.thread_local_middleware import _thread_locals
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# company selected for the current request, set by the CompanyMiddleware
+_current_company = contextvars.ContextVar("Mibs_current_company", default=None)
+
+
+def set_current_company(company_id):
+    """
+    This method is used to set the company the queries are scoped to, returns
+    the token to reset it
+    """
+    return _current_company.set(company_id)
+
+
+def reset_current_company(token):
+    """
+    This method is used to restore the company scope before set_current_company
+    """
+    _current_company.reset(token)
+
+
+def get_current_company():
+    """
+    This method is used to get the company the queries are scoped to
+    """
+    return _current_company.get()
 
 
 class MibsCompanyManager(models.Manager):
@@ -20,29 +47,51 @@ class MibsCompanyManager(models.Manager):
             "requested_employee_id",
         ]
 
+    @cached_property
+    def company_scope(self):
+        """
+        The field path to the company and whether the path spans a multi valued
+        relation, computed once per model
+        """
+        try:
+            self.model._meta.get_field("company_id")
+            field_path = "company_id"
+        except FieldDoesNotExist:
+            field_path = self.related_company_field
+        if not field_path:
+            return None, False
+
+        multi_valued = False
+        model = self.model
+        for field_name in field_path.split("__"):
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                break
+            multi_valued = multi_valued or field.many_to_many or field.one_to_many
+            model = field.related_model
+            if model is None:
+                break
+        return field_path, multi_valued
+
+    def company_filter(self, company_id):
+        """
+        This method is used to build the company scope condition of the model
+        """
+        field_path, _multi_valued = self.company_scope
+        return Q(**{field_path: company_id}) | Q(**{f"{field_path}__isnull": True})
+
     def get_queryset(self):
         """
         get_queryset method
         """
         queryset = super().get_queryset()
-        request = getattr(_thread_locals, "request", None)
-        selected_company = None
-        if request is not None:
-            selected_company = request.session.get("selected_company")
-        try:
-            queryset = (
-                queryset.filter(self.model.company_filter)
-                if selected_company != "all" and selected_company
-                else queryset
-            )
-        except Exception as e:
-            print(e)
-        try:
-            has_duplicates = queryset.count() != queryset.distinct().count()
-            if has_duplicates:
+        company_id = get_current_company()
+        field_path, multi_valued = self.company_scope
+        if company_id and field_path:
+            queryset = queryset.filter(self.company_filter(company_id))
+            if multi_valued:
                 queryset = queryset.distinct()
-        except:
-            pass
         return queryset
 
     def all(self):
@@ -51,24 +100,24 @@ class MibsCompanyManager(models.Manager):
         """
         queryset = []
         try:
+            # the queryset stays lazy, no query is made until it is evaluated
             queryset = self.get_queryset()
-            if queryset.exists():
-                try:
-                    model_name = queryset.model._meta.model_name
-                    if model_name == "employee":
-                        queryset = queryset.filter(is_active=True)
-                    else:
-                        for field in queryset.model._meta.fields:
-                            if isinstance(field, models.ForeignKey):
-                                if field.name in self.check_fields:
-                                    related_model_is_active_filter = {
-                                        f"{field.name}__is_active": True
-                                    }
-                                    queryset = queryset.filter(
-                                        **related_model_is_active_filter
-                                    )
-                except:
-                    pass
+            try:
+                model_name = queryset.model._meta.model_name
+                if model_name == "employee":
+                    queryset = queryset.filter(is_active=True)
+                else:
+                    for field in queryset.model._meta.fields:
+                        if isinstance(field, models.ForeignKey):
+                            if field.name in self.check_fields:
+                                related_model_is_active_filter = {
+                                    f"{field.name}__is_active": True
+                                }
+                                queryset = queryset.filter(
+                                    **related_model_is_active_filter
+                                )
+            except:
+                pass
         except:
             pass
         return queryset
@@ -12,3 +12,10 @@ class BaseConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "base"
+
+    def ready(self):
+        super().ready()
+        # connects the general settings registry and pagination cache
+        # invalidation signals
+        import base.general_settings
+        import base.methods
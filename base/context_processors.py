@@ -6,13 +6,9 @@ This module is used to register context processor`
 
 from django.urls import path
 from django.http import HttpResponse
-from attendance.models import AttendanceGeneralSetting
+from base.general_settings import get_registry, get_setting
 from base.models import Company
 from base.urls import urlpatterns
-from employee.models import EmployeeGeneralSetting
-from offboarding.models import OffboardingGeneralSetting
-from payroll.models.models import PayrollGeneralSetting
-from recruitment.models import RecruitmentGeneralSetting
 
 
 class AllCompany:
@@ -34,8 +30,8 @@ def get_companies(request):
     This method will return the history additional field form
     """
     companies = list(
-        [company.id, company.company, company.icon.url, False]
-        for company in Company.objects.all()
+        [company_id, company, icon_url, False]
+        for company_id, company, icon_url in get_registry()["companies"]
     )
     companies = [
         [
@@ -102,10 +98,7 @@ def resignation_request_enabled(request):
     """
     Check weather resignation_request enabled of not in offboarding
     """
-    first = OffboardingGeneralSetting.objects.first()
-    enabled_resignation_request = True
-    if first:
-        enabled_resignation_request = first.resignation_request
+    enabled_resignation_request = get_setting("offboarding", "resignation_request")
     return {"enabled_resignation_request": enabled_resignation_request}
 
 
@@ -113,10 +106,7 @@ def timerunner_enabled(request):
     """
     Check weather resignation_request enabled of not in offboarding
     """
-    first = AttendanceGeneralSetting.objects.first()
-    enabled_timerunner = True
-    if first:
-        enabled_timerunner = first.time_runner
+    enabled_timerunner = get_setting("attendance", "time_runner")
     return {"enabled_timerunner": enabled_timerunner}
 
 
@@ -124,10 +114,7 @@ def intial_notice_period(request):
     """
     Check weather resignation_request enabled of not in offboarding
     """
-    first = PayrollGeneralSetting.objects.first()
-    initial = 30
-    if first:
-        initial = first.notice_period
+    initial = get_setting("payroll", "notice_period")
     return {"get_initial_notice_period": initial}
 
 
@@ -135,10 +122,7 @@ def check_candidate_self_tracking(request):
     """
     This method is used to get the candidate self tracking is enabled or not
     """
-    first = RecruitmentGeneralSetting.objects.first()
-    candidate_self_tracking = False
-    if first:
-        candidate_self_tracking = first.candidate_self_tracking
+    candidate_self_tracking = get_setting("recruitment", "candidate_self_tracking")
     return {"check_candidate_self_tracking": candidate_self_tracking}
 
 
@@ -146,10 +130,7 @@ def check_candidate_self_tracking_rating(request):
     """
     This method is used to check enabled/disabled of rating option
     """
-    first = RecruitmentGeneralSetting.objects.first()
-    rating_option = False
-    if first:
-        rating_option = first.show_overall_rating
+    rating_option = get_setting("recruitment", "show_overall_rating")
     return {"check_candidate_self_tracking_rating": rating_option}
 
 
@@ -157,12 +138,9 @@ def get_initial_prefix(request):
     """
     This method is used to get the initial prefix
     """
-    settings = EmployeeGeneralSetting.objects.first()
-    instance_id = None
-    prefix = "PEP"
-    if settings:
-        instance_id = settings.id
-        prefix = settings.badge_id_prefix
+    settings = get_registry()["employee"]
+    instance_id = settings["id"]
+    prefix = settings["badge_id_prefix"]
     return {"get_initial_prefix": prefix, "prefix_instance_id": instance_id}
 
 
@@ -0,0 +1,132 @@
+"""
+general_settings.py
+
+This module is used to keep the general settings singletons and the company
+list used by the context processors in the cache.
+
+The registry is loaded in one go and shared process wide (and across the
+processes when a shared cache is configured). It is invalidated by bumping
+a version key whenever one of the settings or a company is saved or deleted.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import AttendanceGeneralSetting
+from base.models import Company
+from employee.models import EmployeeGeneralSetting
+from offboarding.models import OffboardingGeneralSetting
+from payroll.models.models import PayrollGeneralSetting
+from recruitment.models import RecruitmentGeneralSetting
+
+CACHE_PREFIX = "base:general_settings"
+CACHE_TIMEOUT = 60 * 60 * 24
+VERSION_KEY = f"{CACHE_PREFIX}:version"
+
+# registry key: (model, {registry field: (model field, default)})
+SETTINGS = {
+    "offboarding": (
+        OffboardingGeneralSetting,
+        {"resignation_request": ("resignation_request", True)},
+    ),
+    "attendance": (
+        AttendanceGeneralSetting,
+        {"time_runner": ("time_runner", True)},
+    ),
+    "payroll": (
+        PayrollGeneralSetting,
+        {"notice_period": ("notice_period", 30)},
+    ),
+    "recruitment": (
+        RecruitmentGeneralSetting,
+        {
+            "candidate_self_tracking": ("candidate_self_tracking", False),
+            "show_overall_rating": ("show_overall_rating", False),
+        },
+    ),
+    "employee": (
+        EmployeeGeneralSetting,
+        {
+            "id": ("id", None),
+            "badge_id_prefix": ("badge_id_prefix", "PEP"),
+        },
+    ),
+}
+
+
+def registry_version() -> str:
+    """
+    This method is used to get the current cache version of the registry
+    """
+    return cache.get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_registry() -> None:
+    """
+    This method is used to drop the cached registry
+    """
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def load_registry() -> dict:
+    """
+    This method is used to load the general settings and the companies from
+    the database
+
+    Returns:
+        dict: {registry key: {registry field: value}, "companies": [...]}
+    """
+    registry = {}
+    for key, (model, fields) in SETTINGS.items():
+        instance = model.objects.values(*(field for field, _ in fields.values()))
+        instance = instance.order_by("pk").first()
+        registry[key] = {
+            name: instance[field] if instance else default
+            for name, (field, default) in fields.items()
+        }
+    registry["companies"] = [
+        (company.id, company.company, company.icon.url)
+        for company in Company.objects.only("id", "company", "icon").order_by("pk")
+    ]
+    return registry
+
+
+def get_registry() -> dict:
+    """
+    This method is used to get the cached registry, loads it on a miss
+    """
+    key = f"{CACHE_PREFIX}:{registry_version()}"
+    registry = cache.get(key)
+    if registry is None:
+        registry = load_registry()
+        cache.set(key, registry, CACHE_TIMEOUT)
+    return registry
+
+
+def get_setting(key: str, field: str):
+    """
+    This method is used to get a single general setting value
+    """
+    return get_registry()[key][field]
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=OffboardingGeneralSetting)
+@receiver(post_delete, sender=OffboardingGeneralSetting)
+@receiver(post_save, sender=AttendanceGeneralSetting)
+@receiver(post_delete, sender=AttendanceGeneralSetting)
+@receiver(post_save, sender=PayrollGeneralSetting)
+@receiver(post_delete, sender=PayrollGeneralSetting)
+@receiver(post_save, sender=RecruitmentGeneralSetting)
+@receiver(post_delete, sender=RecruitmentGeneralSetting)
+@receiver(post_save, sender=EmployeeGeneralSetting)
+@receiver(post_delete, sender=EmployeeGeneralSetting)
+def general_settings_changed(sender, instance, **kwargs):
+    """
+    This method is used to invalidate the registry when a setting changes
+    """
+    invalidate_registry()
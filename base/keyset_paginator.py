@@ -0,0 +1,298 @@
+"""
+keyset_paginator.py
+
+This module is used to paginate large sorted lists by keyset (cursor) instead
+of OFFSET, the cost of a page does not grow with its depth.
+
+The cursor holds the ordering values of the first or the last row of the
+current page, the next page is the rows after it in the queryset ordering
+(with the pk as tie breaker) and the previous page the rows before it.
+"""
+
+import base64
+import hashlib
+import json
+import math
+
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q, QuerySet
+from django.db.models.expressions import OrderBy
+
+from base.thread_local_middleware import _thread_locals
+
+CURSOR_PARAM = "cursor"
+# numbered page from which the next page link switches to the cursor mode
+KEYSET_DEPTH = 10
+KEYSET_PREFIX = "_keyset_"
+
+
+def encode_cursor(label, direction, values):
+    """
+    This method is used to encode the model label, direction and ordering
+    values as cursor
+    """
+    payload = json.dumps([label, direction, values], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(label, cursor):
+    """
+    This method is used to decode the cursor, returns (None, None) for the
+    first page or an invalid cursor or a cursor of another model
+    """
+    try:
+        cursor_label, direction, values = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+    except (ValueError, TypeError, AttributeError):
+        return None, None
+    if (
+        cursor_label != label
+        or direction not in ("next", "previous")
+        or not isinstance(values, list)
+    ):
+        return None, None
+    return direction, values
+
+
+def cursor_label(queryset):
+    """
+    This method is used to get the label the cursors of the queryset are
+    bound to, the model label and a digest of the query so the cursor of a
+    list is not applied to the other lists of the same model in the page
+    """
+    label = queryset.model._meta.label_lower
+    try:
+        query = str(queryset.query)
+    except EmptyResultSet:
+        return label
+    return f"{label}:{hashlib.md5(query.encode()).hexdigest()[:12]}"
+
+
+def ordering_terms(queryset):
+    """
+    This method is used to return the ordering of the queryset as
+    [(expression, descending)] with the pk as tie breaker
+    """
+    if queryset.query.order_by:
+        ordering = list(queryset.query.order_by)
+    elif queryset.query.default_ordering:
+        ordering = list(queryset.model._meta.ordering)
+    else:
+        ordering = []
+
+    terms = []
+    for order in ordering:
+        if isinstance(order, str):
+            if order == "?":
+                continue
+            terms.append((F(order.lstrip("-")), order.startswith("-")))
+        elif isinstance(order, OrderBy):
+            terms.append((order.expression, order.descending))
+        else:
+            terms.append((order, False))
+    terms.append((F("pk"), False))
+    return terms
+
+
+def after_condition(terms, values, forward=True):
+    """
+    This method is used to build the condition of the rows after (or before
+    when not forward) the values, nulls are ordered last
+    """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for index, ((_expression, descending), value) in enumerate(zip(terms, values)):
+        key = f"{KEYSET_PREFIX}{index}"
+        if value is None:
+            after = Q(pk__in=[]) if forward else Q(**{f"{key}__isnull": False})
+            same = Q(**{f"{key}__isnull": True})
+        else:
+            lookup = "lt" if descending == forward else "gt"
+            after = Q(**{f"{key}__{lookup}": value})
+            if forward:
+                after |= Q(**{f"{key}__isnull": True})
+            same = Q(**{key: value})
+        condition |= equal & after
+        equal &= same
+    return condition
+
+
+class KeysetPage(Page):
+    """
+    Page of a keyset paginator, the page number is not known so the
+    navigation is made by cursors, the templates render it with
+    keyset_pagination.html
+    """
+
+    keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, 1, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        # the numbered page templates only link to the page after the first
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number
+
+
+class KeysetPaginator:
+    """
+    Paginator splitting the queryset by keyset on its ordering
+    """
+
+    def __init__(self, queryset, per_page):
+        self.per_page = int(per_page)
+        self.label = cursor_label(queryset)
+        self.terms = ordering_terms(queryset)
+        self.queryset = queryset.annotate(
+            **{
+                f"{KEYSET_PREFIX}{index}": expression
+                for index, (expression, _descending) in enumerate(self.terms)
+            }
+        )
+
+    @property
+    def count(self):
+        """
+        Total number of records, only evaluated when the template asks for it
+        """
+        return self.queryset.count()
+
+    @property
+    def num_pages(self):
+        """
+        Number of pages of per_page records, for the numbered page templates
+        """
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def validate_number(self, number):
+        """
+        This method is used to validate the page number of the numbered page
+        templates, the keyset pages are not numbered
+        """
+        return max(int(number), 1)
+
+    def ordered(self, forward=True):
+        """
+        This method is used to order the annotated queryset, reversed when
+        not forward
+        """
+        nulls = {"nulls_last": True} if forward else {"nulls_first": True}
+        return self.queryset.order_by(
+            *[
+                (
+                    F(f"{KEYSET_PREFIX}{index}").desc(**nulls)
+                    if descending == forward
+                    else F(f"{KEYSET_PREFIX}{index}").asc(**nulls)
+                )
+                for index, (_expression, descending) in enumerate(self.terms)
+            ]
+        )
+
+    def row_values(self, record):
+        """
+        This method is used to get the ordering values of the record
+        """
+        return [
+            getattr(record, f"{KEYSET_PREFIX}{index}")
+            for index in range(len(self.terms))
+        ]
+
+    def cursor_after(self, record):
+        """
+        This method is used to get the cursor of the rows after the record
+        """
+        values = self.row_values(self.queryset.get(pk=record.pk))
+        return encode_cursor(self.label, "next", values)
+
+    def get_page(self, cursor=None):
+        """
+        This method is used to return the page of the cursor, the first page
+        for an empty or invalid cursor
+        """
+        direction, values = (
+            decode_cursor(self.label, cursor) if cursor else (None, None)
+        )
+        if values is not None and len(values) != len(self.terms):
+            direction, values = None, None
+        forward = direction != "previous"
+
+        queryset = self.ordered(forward)
+        if values is not None:
+            queryset = queryset.filter(after_condition(self.terms, values, forward))
+        records = list(queryset[: self.per_page + 1])
+        has_more = len(records) > self.per_page
+        records = records[: self.per_page]
+        if not forward:
+            records.reverse()
+
+        next_cursor = previous_cursor = None
+        if records:
+            if has_more or not forward:
+                next_cursor = encode_cursor(
+                    self.label, "next", self.row_values(records[-1])
+                )
+            if values is not None and (forward or has_more):
+                previous_cursor = encode_cursor(
+                    self.label, "previous", self.row_values(records[0])
+                )
+        return KeysetPage(records, self, next_cursor, previous_cursor)
+
+
+def keyset_page(queryset, per_page):
+    """
+    This method is used to return the keyset page when the current request
+    asks for the cursor mode (a cursor parameter, empty for the first page),
+    otherwise None, the lists are always paginated by number
+    """
+    request = getattr(_thread_locals, "request", None)
+    if (
+        request is None
+        or CURSOR_PARAM not in request.GET
+        or not isinstance(queryset, QuerySet)
+    ):
+        return None
+    page = KeysetPaginator(queryset, per_page).get_page(request.GET[CURSOR_PARAM])
+    query = request.GET.copy()
+    query.pop(CURSOR_PARAM)
+    # the query string the navigation links append the cursor to
+    page.query_string = query.urlencode()
+    return page
+
+
+def paginate(queryset, per_page, page_number):
+    """
+    This method is used to paginate the list, by keyset in the cursor mode,
+    otherwise by number; from the KEYSET_DEPTH page on, the numbered page
+    gets the next_cursor its next page link continues with in cursor mode
+    """
+    page = keyset_page(queryset, per_page)
+    if page is not None:
+        return page
+    page = Paginator(queryset, per_page).get_page(page_number)
+    if (
+        isinstance(queryset, QuerySet)
+        and page.number >= KEYSET_DEPTH
+        and page.has_next()
+    ):
+        page.object_list = list(page.object_list)
+        page.next_cursor = KeysetPaginator(queryset, per_page).cursor_after(
+            page.object_list[-1]
+        )
+    return page
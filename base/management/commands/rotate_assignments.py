@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.rotation import rotate
+
+
+class Command(BaseCommand):
+    help = "Rotates the shift and work type of the rotating assignments due"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=str,
+            help="Date of the rotation (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show the changes without saving them",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError as error:
+                raise CommandError(error)
+
+        for kind in ["shift", "work_type"]:
+            changes = rotate(kind, today=today, dry_run=options["dry_run"])
+            for change in changes:
+                self.stdout.write(
+                    f"{kind}: {change.assign.employee_id} -> {change.current_id}, "
+                    f"next {change.next_id} on {change.next_change_date}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(changes)} {kind} assignment(s) "
+                    f"{'to rotate' if options['dry_run'] else 'rotated'}"
+                )
+            )
@@ -3,8 +3,10 @@ import io
 import json
 import random
 import pandas as pd
+from functools import lru_cache
 
 from django.apps import apps
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import ForeignKey, ManyToManyField, OneToOneField
 from django.forms.models import ModelChoiceField
@@ -12,7 +14,9 @@ from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils.translation import gettext as _
 from django.db import models
-from django.db.models import F
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.db.models.functions import Lower
 
 from xhtml2pdf import pisa
@@ -115,32 +119,12 @@ def choosesubordinatesemployeemodel(request, form, perm):
     return form
 
 
-orderingList = [
-    {
-        "id": "",
-        "field": "",
-        "ordering": "",
-    }
-]
-
-
 def sortby(request, queryset, key):
     """
-    This method is used to sort query set by asc or desc
+    This method is used to sort query set by asc or desc, the sort state is
+    carried by the query string: the key repeated an odd number of times
+    sorts ascending
     """
-    global orderingList
-    id = request.user.id
-    # here will create dictionary object to the global orderingList if not exists,
-    # if exists then method will switch corresponding object ordering.
-    filtered_list = [x for x in orderingList if x["id"] == id]
-    ordering = filtered_list[0] if filtered_list else None
-    if ordering is None:
-        ordering = {
-            "id": id,
-            "field": None,
-            "ordering": "-",
-        }
-        orderingList.append(ordering)
     sortby = request.GET.get(key)
     sort_count = request.GET.getlist(key).count(sortby)
     order = None
@@ -150,28 +134,22 @@ def sortby(request, queryset, key):
 
         model_meta = queryset.model._meta
 
-        # here will update the orderingList
-        ordering["field"] = sortby
-        if sort_count % 2 == 0:
-            ordering["ordering"] = "-"
-            order = sortby
-        else:
-            ordering["ordering"] = ""
-            order = f"-{sortby}"
+        descending = sort_count % 2 == 0
+        order = sortby if descending else f"-{sortby}"
 
         for part in field_parts:
             field = model_meta.get_field(part)
             if isinstance(field, models.ForeignKey):
                 model_meta = field.related_model._meta
             else:
-                if isinstance(field, models.CharField):
-                    queryset = queryset.annotate(lower_title=Lower(sortby))
-                    queryset = queryset.order_by(f"{ordering['ordering']}lower_title")
-                else:
-                    queryset = queryset.order_by(f'{ordering["ordering"]}{sortby}')
-
-        orderingList = [item for item in orderingList if item["id"] != id]
-        orderingList.append(ordering)
+                # ordered by the expression itself so that a LOWER() functional
+                # index on the field can serve the ordering
+                expression = (
+                    Lower(sortby) if isinstance(field, models.CharField) else F(sortby)
+                )
+                queryset = queryset.order_by(
+                    expression.desc() if descending else expression.asc()
+                )
     setattr(request, "sort_option", {})
     request.sort_option["order"] = order
 
@@ -212,102 +190,139 @@ def generate_colors(num_colors):
     return colors
 
 
-def get_key_instances(model, data_dict):
-    # Get all the models in the Django project
-    all_models = apps.get_models()
-
-    # Initialize a list to store related models include the function argument model as foreignkey
-    related_models = []
-
-    # Iterate through all models
-    for other_model in all_models:
-        # Iterate through fields of the model
-        for field in other_model._meta.fields:
-            # Check if the field is a ForeignKey and related to the function argument model
-            if isinstance(field, ForeignKey) and field.related_model == model:
-                related_models.append(other_model)
-                break
-
-    # Iterate through related models to filter instances
-    for related_model in related_models:
-        # Get all fields of the related model
-        related_model_fields = related_model._meta.get_fields()
-
-        # Iterate through fields to find ForeignKey fields
-        for field in related_model_fields:
-            if isinstance(field, ForeignKey):
-                # Get the related name and field name
-                related_name = field.related_query_name()
-                field_name = field.name
-
-                # Check if the related name exists in data_dict
-                if related_name in data_dict:
-                    # Get the related_id from data_dict
-                    related_id_list = data_dict[related_name]
-                    related_id = int(related_id_list[0])
+# small reference tables whose display names are cached for a short time
+CACHED_DISPLAY_NAME_MODELS = {
+    "base.department",
+    "base.jobposition",
+    "base.jobrole",
+    "base.worktype",
+    "base.employeeshift",
+    "base.employeetype",
+    "base.company",
+}
+DISPLAY_NAME_CACHE_TIMEOUT = 60 * 5
 
-                    # Filter instances based on the field and related_id
-                    filtered_instance = related_model.objects.filter(
-                        **{field_name: related_id}
-                    ).first()
 
-                    # Store the filtered instance back in data_dict
-                    data_dict[related_name] = [str(filtered_instance)]
+@lru_cache(maxsize=None)
+def get_relationship_graph(model):
+    """
+    This method is used to find the relations of the model once per process,
+    the graph is used by get_key_instances to build the filter badges
+
+    Returns:
+        dict: {
+            "reverse": {related query name: (related model, field name)},
+            "foreign_keys": {field name: related model},
+            "many_to_many": {field name: related model},
+        }
+    """
+    reverse = {}
+    # models having a ForeignKey to the model
+    for other_model in apps.get_models():
+        if not any(
+            isinstance(field, ForeignKey) and field.related_model == model
+            for field in other_model._meta.fields
+        ):
+            continue
+        for field in other_model._meta.get_fields():
+            if isinstance(field, ForeignKey):
+                reverse.setdefault(
+                    field.related_query_name(), (other_model, field.name)
+                )
 
-    # Get all the fields in the argument model
     model_fields = model._meta.get_fields()
-    foreign_key_field_names = [
-        field.name
-        for field in model_fields
-        if isinstance(field, ForeignKey or OneToOneField)
-    ]
-    # Create a list of field names that are present in data_dict
-    present_foreign_key_field_names = [
-        key for key in foreign_key_field_names if key in data_dict
-    ]
+    return {
+        "reverse": reverse,
+        "foreign_keys": {
+            field.name: field.remote_field.model
+            for field in model_fields
+            if isinstance(field, ForeignKey)
+        },
+        "many_to_many": {
+            field.name: field.remote_field.model
+            for field in model_fields
+            if isinstance(field, ManyToManyField)
+        },
+    }
 
-    for field_name in present_foreign_key_field_names:
-        try:
-            # Get the list of integer values from data_dict for the field
-            field_values = [int(value) for value in data_dict[field_name]]
 
-            # Get the related model of the ForeignKey field
-            related_model = model._meta.get_field(field_name).remote_field.model
+def get_display_names(model, object_ids):
+    """
+    This method is used to get the string representation of the objects with
+    one id__in query, names of the small reference tables are cached
 
-            # Get the instances of the related model using the field values
-            related_instances = related_model.objects.filter(id__in=field_values)
+    Returns:
+        dict: {id: display name}
+    """
+    object_ids = set(object_ids)
+    if not object_ids:
+        return {}
+    cached = model._meta.label_lower in CACHED_DISPLAY_NAME_MODELS
+    names = {}
+    if cached:
+        prefix = f"base:display_name:{model._meta.label_lower}:"
+        names = {
+            int(key[len(prefix) :]): name
+            for key, name in cache.get_many(
+                [f"{prefix}{object_id}" for object_id in object_ids]
+            ).items()
+        }
+    missing = object_ids - set(names)
+    if missing:
+        fetched = {
+            instance.id: str(instance)
+            for instance in model.objects.filter(id__in=missing)
+        }
+        if cached:
+            cache.set_many(
+                {f"{prefix}{key}": name for key, name in fetched.items()},
+                DISPLAY_NAME_CACHE_TIMEOUT,
+            )
+        names.update(fetched)
+    return names
 
-            # Create a list of string representations of the instances
-            related_strings = [str(instance) for instance in related_instances]
 
-            # Update data_dict with the list of string representations
-            data_dict[field_name] = related_strings
-        except (ObjectDoesNotExist, ValueError):
+def get_nested_model(model, field_names):
+    """
+    This method is used to follow the field names to the last related model
+    """
+    related_model = model
+    for field_name in field_names:
+        try:
+            related_field = related_model._meta.get_field(field_name)
+        except:
             pass
-
-    # Create a list of field names that are ManyToManyField
-    many_to_many_field_names = [
-        field.name for field in model_fields if isinstance(field, ManyToManyField)
-    ]
-    # Create a list of field names that are present in data_dict for ManyToManyFields
-    present_many_to_many_field_names = [
-        key for key in many_to_many_field_names if key in data_dict
-    ]
-
-    for field_name in present_many_to_many_field_names:
         try:
-            # Get the related model of the ManyToMany field
-            related_model = model._meta.get_field(field_name).remote_field.model
-            # Get a list of integer values from data_dict for the field
-            field_values = [int(value) for value in data_dict[field_name]]
+            related_model = related_field.remote_field.model
+        except:
+            pass
+    return related_model
 
-            # Filter instances of the related model based on the field values
-            related_instances = related_model.objects.filter(id__in=field_values)
 
-            # Update data_dict with the string representations of related instances
-            data_dict[field_name] = [str(instance) for instance in related_instances]
-        except (ObjectDoesNotExist, ValueError):
-            pass
+def get_key_instances(model, data_dict):
+    graph = get_relationship_graph(model)
+
+    # Reverse ForeignKeys, the key is replaced with the first related instance
+    for related_name, (related_model, field_name) in graph["reverse"].items():
+        if related_name in data_dict:
+            related_id = int(data_dict[related_name][0])
+            filtered_instance = related_model.objects.filter(
+                **{field_name: related_id}
+            ).first()
+            data_dict[related_name] = [str(filtered_instance)]
+
+    # Collect the ids of every key to resolve them with one query per model
+    lookups = []
+    for field_name, related_model in {
+        **graph["foreign_keys"],
+        **graph["many_to_many"],
+    }.items():
+        if field_name in data_dict:
+            try:
+                field_values = [int(value) for value in data_dict[field_name]]
+            except ValueError:
+                continue
+            lookups.append((field_name, related_model, field_values, False))
 
     nested_fields = [
         key
@@ -315,16 +330,38 @@ def get_key_instances(model, data_dict):
         if "__" in key and not key.endswith("gte") and not key.endswith("lte")
     ]
     for key in nested_fields:
-        field_names = key.split("__")
         field_values = data_dict[key]
         if (
             field_values != ["unknown"]
             and field_values != ["true"]
             and field_values != ["false"]
         ):
-            nested_instance = get_nested_instances(model, field_names, field_values)
-            if nested_instance is not None:
-                data_dict[key] = nested_instance
+            try:
+                object_ids = [
+                    int(value) for value in field_values if value != "not_set"
+                ]
+            except ValueError:
+                continue
+            related_model = get_nested_model(model, key.split("__"))
+            lookups.append((key, related_model, object_ids, "not_set" in field_values))
+
+    ids_by_model = {}
+    for _key, related_model, object_ids, _not_set in lookups:
+        ids_by_model.setdefault(related_model, set()).update(object_ids)
+    names_by_model = {
+        related_model: get_display_names(related_model, object_ids)
+        for related_model, object_ids in ids_by_model.items()
+    }
+    for key, related_model, object_ids, not_set in lookups:
+        names = names_by_model[related_model]
+        result = [
+            names[object_id]
+            for object_id in dict.fromkeys(object_ids)
+            if object_id in names
+        ]
+        if not_set:
+            result.insert(0, "not_set")
+        data_dict[key] = result
 
     if "id" in data_dict:
         id = data_dict["id"][0]
@@ -365,28 +402,6 @@ def get_key_instances(model, data_dict):
     return data_dict
 
 
-def get_nested_instances(model, field_names, field_values):
-    try:
-        related_model = model
-        for field_name in field_names:
-            try:
-                related_field = related_model._meta.get_field(field_name)
-            except:
-                pass
-            try:
-                related_model = related_field.remote_field.model
-            except:
-                pass
-        object_ids = [int(value) for value in field_values if value != "not_set"]
-        related_instances = related_model.objects.filter(id__in=object_ids)
-        result = [str(instance) for instance in related_instances]
-        if "not_set" in field_values:
-            result.insert(0, "not_set")
-        return result
-    except (ObjectDoesNotExist, ValueError):
-        return None
-
-
 def closest_numbers(numbers: list, input_number: int) -> tuple:
     """
     This method is used to find previous and next of numbers
@@ -629,32 +644,65 @@ def generate_pdf(template_path, context, path=True, title=None):
 
 
 def filter_conditional_leave_request(request):
-    approval_manager = Employee.objects.filter(employee_user_id=request.user).first()
-    leave_request_ids = []
-    multiple_approval_requests = LeaveRequestConditionApproval.objects.filter(
-        manager_id=approval_manager
+    """
+    This method is used to filter the leave requests the request user has to
+    approve as conditional approval manager, the first approval step or a step
+    whose previous one is approved, with one query
+    """
+    previous_step_approved = LeaveRequestConditionApproval.objects.filter(
+        leave_request_id=OuterRef("leave_request_id"),
+        sequence=OuterRef("sequence") - 1,
+        is_approved=True,
     )
-    for instance in multiple_approval_requests:
-        if instance.sequence > 1:
-            pre_sequence = instance.sequence - 1
-            leave_request_id = instance.leave_request_id
-            instance = LeaveRequestConditionApproval.objects.filter(
-                leave_request_id=leave_request_id, sequence=pre_sequence
-            ).first()
-            if instance.is_approved:
-                leave_request_ids.append(instance.leave_request_id.id)
-        else:
-            leave_request_ids.append(instance.leave_request_id.id)
-    return LeaveRequest.objects.filter(pk__in=leave_request_ids)
+    manager_steps = LeaveRequestConditionApproval.objects.filter(
+        Q(sequence__lte=1) | Exists(previous_step_approved),
+        leave_request_id=OuterRef("pk"),
+        manager_id__employee_user_id=request.user,
+    )
+    return LeaveRequest.objects.filter(Exists(manager_steps))
+
+
+PAGINATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _pagination_cache_key(user_id):
+    return f"base:pagination:{user_id}"
 
 
 def get_pagination():
+    """
+    This method is used to get the page size of the request user, it is loaded
+    once per request (kept as request.pagination for the nested paginators)
+    and cached per user until the user's DynamicPagination changes
+    """
     from base.thread_local_middleware import _thread_locals
 
     request = getattr(_thread_locals, "request", None)
+    count = getattr(request, "pagination", None)
+    if count is not None:
+        return count
     user = request.user
-    page = DynamicPagination.objects.filter(user_id=user).first()
-    count = 50
-    if page:
-        count = page.pagination
+    key = _pagination_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        page = DynamicPagination.objects.filter(user_id=user).first()
+        count = 50
+        if page:
+            count = page.pagination
+        cache.set(key, count, PAGINATION_CACHE_TIMEOUT)
+    request.pagination = count
     return count
+
+
+@receiver(post_save, sender=DynamicPagination)
+@receiver(post_delete, sender=DynamicPagination)
+def dynamic_pagination_changed(sender, instance, **kwargs):
+    """
+    This method is used to drop the cached page size of the user
+    """
+    from base.thread_local_middleware import _thread_locals
+
+    cache.delete(_pagination_cache_key(instance.user_id_id))
+    request = getattr(_thread_locals, "request", None)
+    if request is not None and hasattr(request, "pagination"):
+        del request.pagination
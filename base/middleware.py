@@ -2,9 +2,7 @@
 middleware.py
 """
 
-from django.apps import apps
-from django.db.models import Q
-from base.Mibs_company_manager import MibsCompanyManager
+from base.Mibs_company_manager import reset_current_company, set_current_company
 from base.models import Company
 from base.context_processors import AllCompany
 
@@ -19,8 +17,8 @@ class CompanyMiddleware:
 
     def __call__(self, request):
         # Get the current user's company_id from the request
+        company_id = None
         if getattr(request, "user", False) and not request.user.is_anonymous:
-            company_id = None
             try:
 
                 company_id = getattr(
@@ -52,50 +50,15 @@ class CompanyMiddleware:
                     "text": all_company.text,
                     "id": all_company.id,
                 }
+            if request.session.get("selected_company") == "all":
+                company_id = None
 
-            # for testing here only get recruitment models
-            app_labels = [
-                "recruitment",
-                "employee",
-                "onboarding",
-                "attendance",
-                "leave",
-                "payroll",
-                "asset",
-                "pms",
-                "base",
-                "helpdesk",
-                "offboarding",
-                "Mibs_documents",
-            ]
-            app_models = [
-                model
-                for model in apps.get_models()
-                if model._meta.app_label in app_labels
-            ]
-            # Add company filter to every query
-            if company_id:
-                for (
-                    model
-                ) in app_models:  # Replace YourModels with the actual models you have
-                    if getattr(model, "company_id", None):
-                        model.add_to_class(
-                            "company_filter",
-                            Q(company_id=company_id) | Q(company_id__isnull=True),
-                        )
-                    elif (
-                        isinstance(model.objects, MibsCompanyManager)
-                        and model.objects.related_company_field
-                    ):
-                        model.add_to_class(
-                            "company_filter",
-                            Q(**{model.objects.related_company_field: company_id})
-                            | Q(
-                                **{
-                                    f"{model.objects.related_company_field}__isnull": True
-                                }
-                            ),
-                        )
-
-        response = self.get_response(request)
+        # Scope the queries of the MibsCompanyManager to the selected company,
+        # the scope is held in a context variable so it never leaks to the
+        # other threads or requests
+        token = set_current_company(company_id.id if company_id else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_current_company(token)
         return response
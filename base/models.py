@@ -338,6 +338,13 @@ class RotatingWorkTypeAssign(MibsModel):
         verbose_name = _("Rotating Work Type Assign")
         verbose_name_plural = _("Rotating Work Type Assigns")
         ordering = ["-next_change_date", "-employee_id__employee_first_name"]
+        indexes = [
+            # serves the daily rotation of the assignments due
+            models.Index(
+                fields=["next_change_date", "is_active"],
+                name="rotating_work_type_due",
+            )
+        ]
 
     def clean(self):
         if self.is_active and self.employee_id is not None:
@@ -635,6 +642,13 @@ class RotatingShiftAssign(MibsModel):
         verbose_name = _("Rotating Shift Assign")
         verbose_name_plural = _("Rotating Shift Assigns")
         ordering = ["-next_change_date", "-employee_id__employee_first_name"]
+        indexes = [
+            # serves the daily rotation of the assignments due
+            models.Index(
+                fields=["next_change_date", "is_active"],
+                name="rotating_shift_due",
+            )
+        ]
 
     def clean(self):
         if self.is_active and self.employee_id is not None:
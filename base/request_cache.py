@@ -0,0 +1,64 @@
+"""
+request_cache.py
+
+This module is used to memoize values for the duration of the current request,
+the template filters use it to run their queries once per request instead of
+once per table row.
+"""
+
+from base.thread_local_middleware import _thread_locals
+
+REQUEST_CACHE_ATTRIBUTE = "_Mibs_request_cache"
+
+
+def request_cached(key, loader):
+    """
+    This method is used to return the value of the key for the current request,
+    the loader is called only on the first access. Without a request the loader
+    is called every time.
+
+    Args:
+        key: hashable key of the value
+        loader: callable returning the value
+    """
+    request = getattr(_thread_locals, "request", None)
+    if request is None:
+        return loader()
+    cache = request.__dict__.setdefault(REQUEST_CACHE_ATTRIBUTE, {})
+    if key not in cache:
+        cache[key] = loader()
+    return cache[key]
+
+
+def subordinate_ids(employee):
+    """
+    This method is used to get the ids of the employees reporting to the
+    employee, loaded once per request
+    """
+    from employee.models import EmployeeWorkInformation
+
+    if employee is None:
+        return frozenset()
+    return request_cached(
+        ("subordinate_ids", employee.pk),
+        lambda: frozenset(
+            EmployeeWorkInformation.objects.filter(
+                reporting_manager_id=employee
+            ).values_list("employee_id", flat=True)
+        ),
+    )
+
+
+def approval_manager_ids():
+    """
+    This method is used to get the ids of the employees assigned as approving
+    manager in the multiple approval conditions, loaded once per request
+    """
+    from base.models import MultipleApprovalManagers
+
+    return request_cached(
+        "approval_manager_ids",
+        lambda: frozenset(
+            MultipleApprovalManagers.objects.values_list("employee_id", flat=True)
+        ),
+    )
@@ -0,0 +1,224 @@
+"""
+rotation.py
+
+This module is used to rotate the shift and work type of the employees with an
+active rotating assignment.
+
+The assignments due are loaded with one query on the next change date, the
+next shift or work type and the next change date are computed in memory and
+the changes are written with bulk updates (with their history) in a single
+transaction.
+"""
+
+import calendar
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.db import transaction
+from simple_history.utils import bulk_update_with_history
+
+from notifications.signals import notify
+
+WEEK_DAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+Rotation = namedtuple(
+    "Rotation",
+    [
+        "model",
+        "rotating_field",
+        "first_field",
+        "second_field",
+        "current_field",
+        "next_field",
+        "work_info_field",
+        "verbs",
+    ],
+)
+
+RotationChange = namedtuple(
+    "RotationChange", ["assign", "current_id", "next_id", "next_change_date"]
+)
+
+
+def get_rotation(kind):
+    """
+    This method is used to get the rotation of the kind, shift or work_type
+    """
+    from base.models import RotatingShiftAssign, RotatingWorkTypeAssign
+
+    return {
+        "shift": Rotation(
+            RotatingShiftAssign,
+            "rotating_shift_id",
+            "shift1",
+            "shift2",
+            "current_shift",
+            "next_shift",
+            "shift_id",
+            {
+                "verb": "Your shift has been changed.",
+                "verb_ar": "تم تغيير التحول الخاص بك.",
+                "verb_de": "Ihre Schicht wurde geändert.",
+                "verb_es": "Tu turno ha sido cambiado.",
+                "verb_fr": "Votre quart de travail a été modifié.",
+            },
+        ),
+        "work_type": Rotation(
+            RotatingWorkTypeAssign,
+            "rotating_work_type_id",
+            "work_type1",
+            "work_type2",
+            "current_work_type",
+            "next_work_type",
+            "work_type_id",
+            {
+                "verb": "Your Work Type has been changed.",
+                "verb_ar": "لقد تغير نوع عملك.",
+                "verb_de": "Ihre Art der Arbeit hat sich geändert.",
+                "verb_es": "Su tipo de trabajo ha sido cambiado.",
+                "verb_fr": "Votre type de travail a été modifié.",
+            },
+        ),
+    }[kind]
+
+
+def next_monthly_date(today, rotate_every):
+    """
+    This method is used to get the first rotation day after today, the day is
+    moved to the last day of the shorter months
+
+    Args:
+        today: the date of the rotation
+        rotate_every: day of the month, "1" to "31" or "last"
+    """
+    year, month = today.year, today.month
+    while True:
+        last_day = calendar.monthrange(year, month)[1]
+        day = last_day if rotate_every == "last" else min(int(rotate_every), last_day)
+        next_date = date(year, month, day)
+        if next_date > today:
+            return next_date
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def next_change_date(assign, today):
+    """
+    This method is used to get the next switch date of the rotating assignment
+    rotated today
+    """
+    if assign.based_on == "weekly":
+        target_day = WEEK_DAYS.index(assign.rotate_every_weekend or "monday")
+        return today + timedelta(days=(target_day - today.weekday() - 1) % 7 + 1)
+    if assign.based_on == "monthly":
+        return next_monthly_date(today, assign.rotate_every or "1")
+    return today + timedelta(days=max(int(assign.rotate_after_day or 1), 1))
+
+
+def plan_rotation(kind, today):
+    """
+    This method is used to compute the changes of the rotating assignments due
+    on or before today, nothing is saved
+
+    Returns:
+        list: RotationChange of the assignments due
+    """
+    rotation = get_rotation(kind)
+    assigns = rotation.model.objects.filter(
+        is_active=True, next_change_date__lte=today
+    ).select_related(rotation.rotating_field, "employee_id__employee_work_info")
+
+    changes = []
+    for assign in assigns:
+        rotating = getattr(assign, rotation.rotating_field)
+        current_id = getattr(assign, f"{rotation.next_field}_id")
+        next_id = getattr(rotating, f"{rotation.second_field}_id")
+        if current_id == next_id:
+            next_id = getattr(rotating, f"{rotation.first_field}_id")
+        changes.append(
+            RotationChange(assign, current_id, next_id, next_change_date(assign, today))
+        )
+    return changes
+
+
+def apply_rotation(kind, changes):
+    """
+    This method is used to save the planned changes, the assignments and the
+    employee work informations are updated in bulk in one transaction and the
+    employees are notified once it is committed
+    """
+    from django.contrib.auth.models import User
+    from employee.models import EmployeeWorkInformation
+
+    rotation = get_rotation(kind)
+    assigns = []
+    work_infos = []
+    user_ids = []
+    for change in changes:
+        assign = change.assign
+        setattr(assign, f"{rotation.current_field}_id", change.current_id)
+        setattr(assign, f"{rotation.next_field}_id", change.next_id)
+        assign.next_change_date = change.next_change_date
+        assigns.append(assign)
+        employee = assign.employee_id
+        if employee is None:
+            continue
+        work_info = getattr(employee, "employee_work_info", None)
+        if work_info is not None:
+            setattr(work_info, f"{rotation.work_info_field}_id", change.current_id)
+            work_infos.append(work_info)
+        user_ids.append(employee.employee_user_id_id)
+
+    if not assigns:
+        return
+
+    def send_notifications():
+        bot = User.objects.filter(username="Mibs Bot").first()
+        recipients = User.objects.filter(id__in=user_ids)
+        if bot is not None and user_ids:
+            notify.send(
+                bot,
+                recipient=recipients,
+                icon="infinite",
+                redirect="/employee/employee-profile",
+                **rotation.verbs,
+            )
+
+    with transaction.atomic():
+        bulk_update_with_history(
+            assigns,
+            rotation.model,
+            [rotation.current_field, rotation.next_field, "next_change_date"],
+        )
+        if work_infos:
+            bulk_update_with_history(
+                work_infos, EmployeeWorkInformation, [rotation.work_info_field]
+            )
+        transaction.on_commit(send_notifications)
+
+
+def rotate(kind, today=None, dry_run=False):
+    """
+    This method is used to rotate the shift or the work type of the rotating
+    assignments due today
+
+    Args:
+        kind: "shift" or "work_type"
+        today: the date of the rotation, the current date by default
+        dry_run: only compute the changes without saving them
+
+    Returns:
+        list: RotationChange of the rotated assignments
+    """
+    today = today or date.today()
+    changes = plan_rotation(kind, today)
+    if not dry_run:
+        apply_rotation(kind, changes)
+    return changes
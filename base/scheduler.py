@@ -1,221 +1,94 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta, date
-import calendar
+from datetime import datetime, date
+from django.db import transaction
+from django.db.models import Q
+from simple_history.utils import bulk_update_with_history
 from notifications.signals import notify
 
 
-def update_rotating_work_type_assign(rotating_work_type, new_date):
-    """
-    Here will update the employee work information details and send notification
-    """
-    from django.contrib.auth.models import User
-
-    employee = rotating_work_type.employee_id
-    employee_work_info = employee.employee_work_info
-    work_type1 = rotating_work_type.rotating_work_type_id.work_type1
-    work_type2 = rotating_work_type.rotating_work_type_id.work_type2
-    new = rotating_work_type.next_work_type
-    next = work_type2
-    if new == next:
-        next = work_type1
-    employee_work_info.work_type_id = new
-    employee_work_info.save()
-    rotating_work_type.next_change_date = new_date
-    rotating_work_type.current_work_type = new
-    rotating_work_type.next_work_type = next
-    rotating_work_type.save()
-    bot = User.objects.filter(username="Mibs Bot").first()
-    if bot is not None:
-        employee = rotating_work_type.employee_id
-        notify.send(
-            bot,
-            recipient=employee.employee_user_id,
-            verb="Your Work Type has been changed.",
-            verb_ar="لقد تغير نوع عملك.",
-            verb_de="Ihre Art der Arbeit hat sich geändert.",
-            verb_es="Su tipo de trabajo ha sido cambiado.",
-            verb_fr="Votre type de travail a été modifié.",
-            icon="infinite",
-            redirect="/employee/employee-profile",
-        )
-    return
-
-
-def work_type_rotate_after(rotating_work_work_type):
+def rotate_work_type():
     """
-    This method for rotate work type based on after day
+    This method is used to rotate the work type of the rotating work type
+    assignments due today
     """
-    date_today = datetime.now()
-    switch_date = rotating_work_work_type.next_change_date
-    if switch_date.strftime("%Y-%m-%d") == date_today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        new_date = date_today + timedelta(days=rotating_work_work_type.rotate_after_day)
-        update_rotating_work_type_assign(rotating_work_work_type, new_date)
-    return
-
+    from base.rotation import rotate
 
-def work_type_rotate_weekend(rotating_work_type):
-    """
-    This method for rotate work type based on weekend
-    """
-    date_today = datetime.now()
-    switch_date = rotating_work_type.next_change_date
-    if switch_date.strftime("%Y-%m-%d") == date_today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        day = datetime.now().strftime("%A").lower()
-        switch_day = rotating_work_type.rotate_every_weekend
-        if day == switch_day:
-            new_date = date_today + timedelta(days=7)
-            update_rotating_work_type_assign(rotating_work_type, new_date)
+    rotate("work_type")
     return
 
 
-def work_type_rotate_every(rotating_work_type):
+def rotate_shift():
     """
-    This method for rotate work type based on every month
+    This method is used to rotate the shift of the rotating shift assignments
+    due today
     """
-    date_today = datetime.now()
-    switch_date = rotating_work_type.next_change_date
-    day_date = rotating_work_type.rotate_every
-    if switch_date.strftime("%Y-%m-%d") == date_today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        if day_date == switch_date.strftime("%d").lstrip("0"):
-            new_date = date_today.replace(month=date_today.month + 1)
-            update_rotating_work_type_assign(rotating_work_type, new_date)
-        elif day_date == "last":
-            year = date_today.strftime("%Y")
-            month = date_today.strftime("%m")
-            last_day = calendar.monthrange(int(year), int(month) + 1)[1]
-            new_date = datetime(int(year), int(month) + 1, last_day)
-            update_rotating_work_type_assign(rotating_work_type, new_date)
-    return
-
+    from base.rotation import rotate
 
-def rotate_work_type():
-    """
-    This method will identify the based on condition to the rotating shift assign
-    and redirect to the chunk method to execute.
-    """
-    from base.models import RotatingWorkTypeAssign
-
-    rotating_work_types = RotatingWorkTypeAssign.objects.filter(is_active=True)
-    for rotating_work_type in rotating_work_types:
-        based_on = rotating_work_type.based_on
-        if based_on == "after":
-            work_type_rotate_after(rotating_work_type)
-        elif based_on == "weekly":
-            work_type_rotate_weekend(rotating_work_type)
-        elif based_on == "monthly":
-            work_type_rotate_every(rotating_work_type)
+    rotate("shift")
     return
 
 
-def update_rotating_shift_assign(rotating_shift, new_date):
+def apply_requests(
+    queryset, work_info_field, request_field, request_values, notification
+):
     """
-    Here will update the employee work information and send notification
+    This method is used to apply the shift or work type requests to the employee
+    work informations.
+
+    The requests are locked and flagged in the same transaction as the work
+    information updates, so a rerun (or another scheduler process) never applies
+    a request twice and a failed run leaves the requests to the next one.
+
+    Args:
+        queryset: requests to apply
+        work_info_field: field of the work information to update
+        request_field: field of the request holding the new value
+        request_values: values set on the applied requests
+        notification: verbs and icon of the notification sent to the employees
     """
     from django.contrib.auth.models import User
+    from employee.models import EmployeeWorkInformation
 
-    employee = rotating_shift.employee_id
-    employee_work_info = employee.employee_work_info
-    shift1 = rotating_shift.rotating_shift_id.shift1
-    shift2 = rotating_shift.rotating_shift_id.shift2
-    new = rotating_shift.next_shift
-    next = shift2
-    if new == next:
-        next = shift1
-    employee_work_info.shift_id = new
-    employee_work_info.save()
-    rotating_shift.next_change_date = new_date
-    rotating_shift.current_shift = new
-    rotating_shift.next_shift = next
-    rotating_shift.save()
-    bot = User.objects.filter(username="Mibs Bot").first()
-    if bot is not None:
-        employee = rotating_shift.employee_id
-        notify.send(
-            bot,
-            recipient=employee.employee_user_id,
-            verb="Your shift has been changed.",
-            verb_ar="تم تغيير التحول الخاص بك.",
-            verb_de="Ihre Schicht wurde geändert.",
-            verb_es="Tu turno ha sido cambiado.",
-            verb_fr="Votre quart de travail a été modifié.",
-            icon="infinite",
-            redirect="/employee/employee-profile",
+    with transaction.atomic():
+        requests = list(
+            queryset.select_related("employee_id__employee_work_info")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")
         )
-    return
-
-
-def shift_rotate_after_day(rotating_shift, today=datetime.now()):
-    """
-    This method for rotate shift based on after day
-    """
-    switch_date = rotating_shift.next_change_date
-    if switch_date.strftime("%Y-%m-%d") == today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        new_date = today + timedelta(days=rotating_shift.rotate_after_day)
-        update_rotating_shift_assign(rotating_shift, new_date)
-    return
-
-
-def shift_rotate_weekend(rotating_shift, today=datetime.now()):
-    """
-    This method for rotate shift based on weekend
-    """
-    switch_date = rotating_shift.next_change_date
-    if switch_date.strftime("%Y-%m-%d") == today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        day = today.strftime("%A").lower()
-        switch_day = rotating_shift.rotate_every_weekend
-        if day == switch_day:
-            new_date = today + timedelta(days=7)
-            update_rotating_shift_assign(rotating_shift, new_date)
-    return
-
-
-def shift_rotate_every(rotating_shift, today=datetime.now()):
-    """
-    This method for rotate shift based on every month
-    """
-    switch_date = rotating_shift.next_change_date
-    day_date = rotating_shift.rotate_every
-    if switch_date.strftime("%Y-%m-%d") == today.strftime("%Y-%m-%d"):
-        # calculate the next work type switch date
-        if day_date == switch_date.strftime("%d").lstrip("0"):
-            new_date = today.replace(month=today.month + 1)
-            update_rotating_shift_assign(rotating_shift, new_date)
-        elif day_date == "last":
-            year = today.strftime("%Y")
-            month = today.strftime("%m")
-            last_day = calendar.monthrange(int(year), int(month) + 1)[1]
-            new_date = datetime(int(year), int(month) + 1, last_day)
-            update_rotating_shift_assign(rotating_shift, new_date)
-    return
-
-
-def rotate_shift():
-    """
-    This method will identify the based on condition to the rotating shift assign
-    and redirect to the chunk method to execute.
-    """
-    from base.models import RotatingShiftAssign
-
-    rotating_shifts = RotatingShiftAssign.objects.filter(is_active=True)
-    today = datetime.date
-    for rotating_shift in rotating_shifts:
-        based_on = rotating_shift.based_on
-        # after day condition
-        if based_on == "after":
-            shift_rotate_after_day(rotating_shift)
-        # weekly condition
-        elif based_on == "weekly":
-            shift_rotate_weekend(rotating_shift)
-        # monthly condition
-        elif based_on == "monthly":
-            shift_rotate_every(rotating_shift)
+        if not requests:
+            return []
+
+        work_infos = {}
+        user_ids = set()
+        for request in requests:
+            for field, value in request_values.items():
+                setattr(request, field, value)
+            employee = request.employee_id
+            work_info = getattr(employee, "employee_work_info", None)
+            if work_info is None:
+                continue
+            setattr(
+                work_info,
+                f"{work_info_field}_id",
+                getattr(request, f"{request_field}_id"),
+            )
+            # the latest request of the employee wins
+            work_infos[work_info.pk] = work_info
+            user_ids.add(employee.employee_user_id_id)
 
-    return
+        bulk_update_with_history(requests, queryset.model, list(request_values))
+        bulk_update_with_history(
+            list(work_infos.values()), EmployeeWorkInformation, [work_info_field]
+        )
+        bot = User.objects.filter(username="Mibs Bot").first()
+        if bot is not None and user_ids:
+            notify.send(
+                bot,
+                recipient=User.objects.filter(id__in=user_ids),
+                redirect="/employee/employee-profile",
+                **notification,
+            )
+    return requests
 
 
 def switch_shift():
@@ -223,36 +96,30 @@ def switch_shift():
     This method change employees shift information regards to the shift request
     """
     from base.models import ShiftRequest
-    from django.contrib.auth.models import User
 
     today = date.today()
-
+    # the requests missed by a previous run are applied too, unless expired
     shift_requests = ShiftRequest.objects.filter(
-        canceled=False, approved=True, requested_date__exact=today, shift_changed=False
+        Q(requested_till__isnull=True) | Q(requested_till__gte=today),
+        canceled=False,
+        approved=True,
+        requested_date__lte=today,
+        shift_changed=False,
+    )
+    apply_requests(
+        shift_requests,
+        "shift_id",
+        "shift_id",
+        {"shift_changed": True},
+        {
+            "verb": "Shift Changes notification",
+            "verb_ar": "التحول تغيير الإخطار",
+            "verb_de": "Benachrichtigung über Schichtänderungen",
+            "verb_es": "Notificación de cambios de turno",
+            "verb_fr": "Notification des changements de quart de travail",
+            "icon": "refresh",
+        },
     )
-    if shift_requests:
-        for request in shift_requests:
-            work_info = request.employee_id.employee_work_info
-            # updating requested shift to the employee work information.
-            work_info.shift_id = request.shift_id
-            work_info.save()
-            request.approved = True
-            request.shift_changed = True
-            request.save()
-            bot = User.objects.filter(username="Mibs Bot").first()
-            if bot is not None:
-                employee = request.employee_id
-                notify.send(
-                    bot,
-                    recipient=employee.employee_user_id,
-                    verb="Shift Changes notification",
-                    verb_ar="التحول تغيير الإخطار",
-                    verb_de="Benachrichtigung über Schichtänderungen",
-                    verb_es="Notificación de cambios de turno",
-                    verb_fr="Notification des changements de quart de travail",
-                    icon="refresh",
-                    redirect="/employee/employee-profile",
-                )
     return
 
 
@@ -261,7 +128,6 @@ def undo_shift():
     This method undo previous employees shift information regards to the shift request
     """
     from base.models import ShiftRequest
-    from django.contrib.auth.models import User
 
     today = date.today()
     # here will get all the active shift requests
@@ -272,28 +138,21 @@ def undo_shift():
         is_active=True,
         shift_changed=True,
     )
-    if shift_requests:
-        for request in shift_requests:
-            work_info = request.employee_id.employee_work_info
-            work_info.shift_id = request.previous_shift_id
-            work_info.save()
-            # making the instance in-active
-            request.is_active = False
-            request.save()
-            bot = User.objects.filter(username="Mibs Bot").first()
-            if bot is not None:
-                employee = request.employee_id
-                notify.send(
-                    bot,
-                    recipient=employee.employee_user_id,
-                    verb="Shift changes notification, Requested date expired.",
-                    verb_ar="التحول يغير الإخطار ، التاريخ المطلوب انتهت صلاحيته.",
-                    verb_de="Benachrichtigung über Schichtänderungen, gewünschtes Datum abgelaufen.",
-                    verb_es="Notificación de cambios de turno, Fecha solicitada vencida.",
-                    verb_fr="Notification de changement d'équipe, la date demandée a expiré.",
-                    icon="refresh",
-                    redirect="/employee/employee-profile",
-                )
+    # making the instances in-active
+    apply_requests(
+        shift_requests,
+        "shift_id",
+        "previous_shift_id",
+        {"is_active": False},
+        {
+            "verb": "Shift changes notification, Requested date expired.",
+            "verb_ar": "التحول يغير الإخطار ، التاريخ المطلوب انتهت صلاحيته.",
+            "verb_de": "Benachrichtigung über Schichtänderungen, gewünschtes Datum abgelaufen.",
+            "verb_es": "Notificación de cambios de turno, Fecha solicitada vencida.",
+            "verb_fr": "Notification de changement d'équipe, la date demandée a expiré.",
+            "icon": "refresh",
+        },
+    )
     return
 
 
@@ -301,38 +160,31 @@ def switch_work_type():
     """
     This method change employees work type information regards to the work type request
     """
-    from django.contrib.auth.models import User
     from base.models import WorkTypeRequest
 
     today = date.today()
+    # the requests missed by a previous run are applied too, unless expired
     work_type_requests = WorkTypeRequest.objects.filter(
+        Q(requested_till__isnull=True) | Q(requested_till__gte=today),
         canceled=False,
         approved=True,
-        requested_date__exact=today,
+        requested_date__lte=today,
         work_type_changed=False,
     )
-    for request in work_type_requests:
-        work_info = request.employee_id.employee_work_info
-        # updating requested work type to the employee work information.
-        work_info.work_type_id = request.work_type_id
-        work_info.save()
-        request.approved = True
-        request.work_type_changed = True
-        request.save()
-        bot = User.objects.filter(username="Mibs Bot").first()
-        if bot is not None:
-            employee = request.employee_id
-            notify.send(
-                bot,
-                recipient=employee.employee_user_id,
-                verb="Work Type Changes notification",
-                verb_ar="إخطار تغييرات نوع العمل",
-                verb_de="Benachrichtigung über Änderungen des Arbeitstyps",
-                verb_es="Notificación de cambios de tipo de trabajo",
-                verb_fr="Notification de changement de type de travail",
-                icon="swap-horizontal",
-                redirect="/employee/employee-profile",
-            )
+    apply_requests(
+        work_type_requests,
+        "work_type_id",
+        "work_type_id",
+        {"work_type_changed": True},
+        {
+            "verb": "Work Type Changes notification",
+            "verb_ar": "إخطار تغييرات نوع العمل",
+            "verb_de": "Benachrichtigung über Änderungen des Arbeitstyps",
+            "verb_es": "Notificación de cambios de tipo de trabajo",
+            "verb_fr": "Notification de changement de type de travail",
+            "icon": "swap-horizontal",
+        },
+    )
     return
 
 
@@ -341,7 +193,6 @@ def undo_work_type():
     This method undo previous employees work type information regards to the work type request
     """
     from base.models import WorkTypeRequest
-    from django.contrib.auth.models import User
 
     today = date.today()
     # here will get all the active work type requests
@@ -352,28 +203,22 @@ def undo_work_type():
         is_active=True,
         work_type_changed=True,
     )
-    for request in work_type_requests:
-        work_info = request.employee_id.employee_work_info
-        # updating employee work information's work type to previous work type
-        work_info.work_type_id = request.previous_work_type_id
-        work_info.save()
-        # making the instance is in-active
-        request.is_active = False
-        request.save()
-        bot = User.objects.filter(username="Mibs Bot").first()
-        if bot is not None:
-            employee = request.employee_id
-            notify.send(
-                bot,
-                recipient=employee.employee_user_id,
-                verb="Work type changes notification, Requested date expired.",
-                verb_ar="إعلام بتغيير نوع العمل ، انتهاء صلاحية التاريخ المطلوب.",
-                verb_de="Benachrichtigung über Änderungen des Arbeitstyps, angefordertes Datum abgelaufen.",
-                verb_es="Notificación de cambios de tipo de trabajo, fecha solicitada vencida.",
-                verb_fr="Notification de changement de type de travail, la date demandée a expiré.",
-                icon="swap-horizontal",
-                redirect="/employee/employee-profile",
-            )
+    # updating employee work information's work type to previous work type and
+    # making the instances in-active
+    apply_requests(
+        work_type_requests,
+        "work_type_id",
+        "previous_work_type_id",
+        {"is_active": False},
+        {
+            "verb": "Work type changes notification, Requested date expired.",
+            "verb_ar": "إعلام بتغيير نوع العمل ، انتهاء صلاحية التاريخ المطلوب.",
+            "verb_de": "Benachrichtigung über Änderungen des Arbeitstyps, angefordertes Datum abgelaufen.",
+            "verb_es": "Notificación de cambios de tipo de trabajo, fecha solicitada vencida.",
+            "verb_fr": "Notification de changement de type de travail, la date demandée a expiré.",
+            "icon": "swap-horizontal",
+        },
+    )
     return
 
 
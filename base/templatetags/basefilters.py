@@ -2,8 +2,8 @@ import json
 from django.template.defaultfilters import register
 from django import template
 from base.methods import get_pagination
-from base.models import MultipleApprovalManagers
-from employee.models import Employee, EmployeeWorkInformation
+from base.request_cache import approval_manager_ids, request_cached, subordinate_ids
+from employee.models import Employee
 from django.core.paginator import Page, Paginator
 
 
@@ -22,12 +22,11 @@ register = template.Library()
 @register.filter(name="cancel_request")
 def cancel_request(user, request):
     employee = user.employee_get
-    employee_manages = employee.reporting_manager.all()
     return bool(
         request.employee_id == employee
         or user.has_perm("perms.base.cancel_worktyperequest")
         or user.has_perm("perms.base.cancel_shiftrequest")
-        or employee_manages.exists()
+        or subordinate_ids(employee)
     )
 
 
@@ -51,10 +50,11 @@ def is_reportingmanager(user):
 
     This method will return true if the user employee profile is reporting manager to any employee
     """
-    employee = Employee.objects.filter(employee_user_id=user).first()
-    return EmployeeWorkInformation.objects.filter(
-        reporting_manager_id=employee
-    ).exists()
+    employee = request_cached(
+        ("user_employee", user.pk),
+        lambda: Employee.objects.filter(employee_user_id=user).first(),
+    )
+    return bool(subordinate_ids(employee))
 
 
 @register.filter(name="is_leave_approval_manager")
@@ -62,19 +62,22 @@ def is_leave_approval_manager(user):
     """
     This method will return true if the user is comes in MultipleApprovalCondition model as approving manager
     """
-    employee = Employee.objects.filter(employee_user_id=user).first()
-    return MultipleApprovalManagers.objects.filter(employee_id=employee.id).exists()
+    employee = request_cached(
+        ("user_employee", user.pk),
+        lambda: Employee.objects.filter(employee_user_id=user).first(),
+    )
+    return employee.id in approval_manager_ids()
 
 
 @register.filter(name="check_manager")
 def check_manager(user, instance):
     try:
         if isinstance(instance, Employee):
-            return instance.employee_work_info.reporting_manager_id == user.employee_get
-        return (
-            user.employee_get
-            == instance.employee_id.employee_work_info.reporting_manager_id
-        )
+            return instance.pk in subordinate_ids(user.employee_get)
+        employee_id = getattr(instance, "employee_id_id", None)
+        if employee_id is None:
+            employee_id = instance.employee_id.pk
+        return employee_id in subordinate_ids(user.employee_get)
     except:
         return False
 
@@ -87,8 +90,7 @@ def filtersubordinates(user):
         user    : request.user
     """
     employee = user.employee_get
-    employee_manages = employee.reporting_manager.all()
-    return employee_manages.exists()
+    return bool(subordinate_ids(employee))
 
 
 @register.filter(name="filter_field")
@@ -130,4 +132,4 @@ def config_perms(user):
     ]
     for perm in permissions:
         if user.has_perm(perm):
-            return True
\ No newline at end of file
+            return True
@@ -1,3 +1,227 @@
-from django.test import TestCase
+from datetime import date
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from base.keyset_paginator import KeysetPaginator, keyset_page
+from base.models import EmployeeShift, RotatingShift, RotatingShiftAssign
+from base.thread_local_middleware import _thread_locals
+from base.rotation import next_change_date, rotate
+from employee.models import Employee, EmployeeWorkInformation
+
+
+def assign(based_on, **kwargs):
+    """
+    This method is used to build a rotating assignment for the date rules
+    """
+    values = {
+        "rotate_after_day": 7,
+        "rotate_every_weekend": "monday",
+        "rotate_every": "1",
+    }
+    values.update(kwargs)
+    return SimpleNamespace(based_on=based_on, **values)
+
+
+class NextChangeDateTests(SimpleTestCase):
+    """
+    Next switch date of the rotating assignments
+    """
+
+    def test_after_day(self):
+        self.assertEqual(
+            next_change_date(assign("after", rotate_after_day=5), date(2024, 3, 1)),
+            date(2024, 3, 6),
+        )
+
+    def test_after_day_across_month_and_year(self):
+        self.assertEqual(
+            next_change_date(assign("after"), date(2024, 2, 26)), date(2024, 3, 4)
+        )
+        self.assertEqual(
+            next_change_date(assign("after"), date(2024, 12, 29)), date(2025, 1, 5)
+        )
+
+    def test_weekly(self):
+        # 2024-12-30 is a monday
+        self.assertEqual(
+            next_change_date(assign("weekly"), date(2024, 12, 30)), date(2025, 1, 6)
+        )
+        self.assertEqual(
+            next_change_date(
+                assign("weekly", rotate_every_weekend="friday"), date(2024, 12, 30)
+            ),
+            date(2025, 1, 3),
+        )
+
+    def test_monthly(self):
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="15"), date(2024, 5, 15)),
+            date(2024, 6, 15),
+        )
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="15"), date(2024, 12, 15)),
+            date(2025, 1, 15),
+        )
+
+    def test_monthly_on_a_day_missing_in_the_next_month(self):
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="31"), date(2024, 1, 31)),
+            date(2024, 2, 29),
+        )
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="31"), date(2025, 1, 31)),
+            date(2025, 2, 28),
+        )
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="31"), date(2025, 2, 28)),
+            date(2025, 3, 31),
+        )
+
+    def test_monthly_last_day(self):
+        self.assertEqual(
+            next_change_date(assign("monthly", rotate_every="last"), date(2024, 1, 31)),
+            date(2024, 2, 29),
+        )
+        self.assertEqual(
+            next_change_date(
+                assign("monthly", rotate_every="last"), date(2024, 12, 31)
+            ),
+            date(2025, 1, 31),
+        )
+
+
+class RotateShiftTests(TestCase):
+    """
+    Rotation of the rotating shift assignments
+    """
+
+    def setUp(self):
+        self.morning = EmployeeShift(employee_shift="Morning")
+        self.morning.save()
+        self.night = EmployeeShift(employee_shift="Night")
+        self.night.save()
+        self.rotating_shift = RotatingShift(
+            name="Morning / Night", shift1=self.morning, shift2=self.night
+        )
+        self.rotating_shift.save()
+        self.today = date(2024, 12, 31)
+
+    def create_assign(self, badge_id, next_change_date, **kwargs):
+        employee = Employee.objects.create(
+            employee_first_name=badge_id,
+            email=f"{badge_id}@example.com",
+            phone="1",
+            badge_id=badge_id,
+        )
+        EmployeeWorkInformation.objects.bulk_create(
+            [EmployeeWorkInformation(employee_id=employee, shift_id=self.morning)]
+        )
+        return RotatingShiftAssign.objects.create(
+            employee_id=employee,
+            rotating_shift_id=self.rotating_shift,
+            start_date=self.today,
+            next_change_date=next_change_date,
+            current_shift=self.morning,
+            next_shift=self.night,
+            **kwargs,
+        )
+
+    def test_dry_run_saves_nothing(self):
+        rotating_assign = self.create_assign("EMP1", self.today, based_on="after")
+        changes = rotate("shift", today=self.today, dry_run=True)
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0].current_id, self.night.id)
+        self.assertEqual(changes[0].next_id, self.morning.id)
+        self.assertEqual(changes[0].next_change_date, date(2025, 1, 7))
+        rotating_assign.refresh_from_db()
+        self.assertEqual(rotating_assign.current_shift, self.morning)
+        self.assertEqual(rotating_assign.next_change_date, self.today)
+
+    def test_rotate_due_assignments(self):
+        due = self.create_assign(
+            "EMP1", self.today, based_on="monthly", rotate_every="last"
+        )
+        overdue = self.create_assign("EMP2", date(2024, 12, 30), based_on="weekly")
+        later = self.create_assign("EMP3", date(2025, 1, 1), based_on="after")
+        inactive = self.create_assign(
+            "EMP4", self.today, based_on="after", is_active=False
+        )
+
+        changes = rotate("shift", today=self.today)
+
+        self.assertEqual({change.assign.id for change in changes}, {due.id, overdue.id})
+        for rotating_assign in [due, overdue]:
+            rotating_assign.refresh_from_db()
+            self.assertEqual(rotating_assign.current_shift, self.night)
+            self.assertEqual(rotating_assign.next_shift, self.morning)
+            self.assertEqual(
+                rotating_assign.employee_id.employee_work_info.shift_id, self.night
+            )
+        self.assertEqual(due.next_change_date, date(2025, 1, 31))
+        self.assertEqual(overdue.next_change_date, date(2025, 1, 6))
+        self.assertEqual(due.history_set.count(), 2)
+        for rotating_assign in [later, inactive]:
+            rotating_assign.refresh_from_db()
+            self.assertEqual(rotating_assign.current_shift, self.morning)
+
+    def test_rotate_back_to_the_first_shift(self):
+        rotating_assign = self.create_assign("EMP1", self.today, based_on="after")
+        rotate("shift", today=self.today)
+        rotate("shift", today=date(2025, 1, 7))
+
+        rotating_assign.refresh_from_db()
+        self.assertEqual(rotating_assign.current_shift, self.morning)
+        self.assertEqual(rotating_assign.next_shift, self.night)
+        self.assertEqual(rotating_assign.next_change_date, date(2025, 1, 14))
+
+
+class KeysetPaginatorTests(TestCase):
+    """
+    Keyset pagination of the lists
+    """
+
+    def setUp(self):
+        EmployeeShift.objects.bulk_create(
+            [EmployeeShift(employee_shift=f"Shift {index:02}") for index in range(5)]
+        )
+        self.queryset = EmployeeShift.objects.order_by("employee_shift")
+
+    def tearDown(self):
+        _thread_locals.request = None
+
+    def test_navigation(self):
+        paginator = KeysetPaginator(self.queryset, 2)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual([shift.employee_shift for shift in third], ["Shift 04"])
+        self.assertFalse(third.has_next())
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(
+            [shift.employee_shift for shift in back], ["Shift 02", "Shift 03"]
+        )
+
+    def test_numbered_templates_do_not_fail(self):
+        page = KeysetPaginator(self.queryset, 2).get_page()
+        rendered = Template(
+            "{{ page.next_page_number }} {{ page.paginator.num_pages }}"
+        ).render(Context({"page": page}))
+        self.assertEqual(rendered, "2 3")
+
+    def test_cursor_links(self):
+        _thread_locals.request = RequestFactory().get(
+            "/search", {"field": "", "cursor": ""}
+        )
+        page = keyset_page(self.queryset, 2)
+        self.assertTrue(page.keyset)
+        rendered = render_to_string(
+            "keyset_pagination.html",
+            {"page": page, "url": "/search", "target": "#list"},
+        )
+        self.assertIn("/search?field=&cursor=", rendered)
+        self.assertIn(page.next_cursor.replace("=", "%3D"), rendered)
+        self.assertIsNone(keyset_page(list(self.queryset), 2))
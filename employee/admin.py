@@ -15,6 +15,7 @@ from employee.models import (
     PolicyMultipleFile,
     Policy,
     DisciplinaryAction,
+    DisciplinaryBlockWindow,
     Actiontype,
 )
 from simple_history.admin import SimpleHistoryAdmin
@@ -26,4 +27,4 @@ admin.site.register(Employee)
 admin.site.register(EmployeeBankDetails)
 admin.site.register(EmployeeWorkInformation, SimpleHistoryAdmin)
 admin.site.register([EmployeeNote, EmployeeTag, PolicyMultipleFile, Policy, BonusPoint])
-admin.site.register([DisciplinaryAction, Actiontype])
+admin.site.register([DisciplinaryAction, DisciplinaryBlockWindow, Actiontype])
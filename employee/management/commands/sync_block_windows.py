@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from employee.models import DisciplinaryAction
+
+
+class Command(BaseCommand):
+    help = (
+        "Saves the login block windows of the disciplinary actions, the windows "
+        "already in sync are not changed"
+    )
+
+    def handle(self, *args, **options):
+        actions = DisciplinaryAction._base_manager.filter(
+            action__block_option=True,
+            action__action_type__in=["suspension", "dismissal"],
+            start_date__isnull=False,
+        ).select_related("action")
+        count = 0
+        for action in actions.iterator():
+            action.sync_block_windows()
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} disciplinary action(s) synchronized")
+        )
@@ -0,0 +1,625 @@
+"""
+employee/methods/bulk_import.py
+
+This module is used to import the employees of an excel sheet with their users
+and work informations.
+
+The import is made in stages: the rows are validated, the departments, job
+positions, job roles, work types, shifts, employee types and companies of the
+sheet are resolved with one query per table (the missing ones are bulk
+created), the passwords are hashed in a spawned process pool, then the users,
+the employees and the work informations are bulk created in one transaction.
+The reporting managers are resolved once the employees of the sheet exist.
+"""
+
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import partial
+
+import pandas as pd
+from django.apps import apps
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from simple_history.utils import bulk_create_with_history
+
+from base.models import (
+    Company,
+    Department,
+    EmployeeShift,
+    EmployeeType,
+    JobPosition,
+    JobRole,
+    WorkType,
+)
+from employee.methods.experience import experience_years
+from employee.models import BonusPoint, Employee, EmployeeWorkInformation
+
+BATCH_SIZE = 1000
+# below this number of passwords the process pool costs more than it saves
+POOL_THRESHOLD = 200
+EMAIL_PATTERN = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
+
+COLUMNS = [
+    "Badge id",
+    "First Name",
+    "Last Name",
+    "Phone",
+    "Email",
+    "Gender",
+    "Department",
+    "Job Position",
+    "Job Role",
+    "Work Type",
+    "Shift",
+    "Employee Type",
+    "Reporting Manager",
+    "Company",
+    "Location",
+    "Date joining",
+    "Contract End Date",
+    "Basic Salary",
+    "Salary Hour",
+]
+ERROR_COLUMNS = [
+    "Email Error",
+    "First Name error",
+    "Phone error",
+    "Gender Error",
+    "Job Position Error",
+    "Joining Date Error",
+    "Contract Error",
+    "Badge ID Error",
+    "Basic Salary Error",
+    "Salary Hour Error",
+    "User ID Error",
+]
+
+
+def clean_value(value):
+    """
+    This method is used to convert the empty cells to None and to strip the
+    texts
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if value is None or pd.isna(value):
+        return None
+    return value
+
+
+def to_text(value):
+    """
+    This method is used to get the text of a cell, the integers read as float
+    are written without decimal part
+    """
+    value = clean_value(value)
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def to_date(value):
+    """
+    This method is used to get the date of a cell, raises ValueError for an
+    invalid date
+    """
+    value = clean_value(value)
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        # the format guessing of pandas is slow, most cells are iso dates
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return pd.to_datetime(value).date()
+
+
+def to_amount(value):
+    """
+    This method is used to get the amount of a cell, raises ValueError for an
+    invalid number
+    """
+    value = clean_value(value)
+    if value is None:
+        return 0
+    return int(float(value))
+
+
+def validate_row(row):
+    """
+    This method is used to validate a row of the sheet
+
+    Returns:
+        tuple: the values of the row and its errors by error column
+    """
+    errors = {}
+    data = {
+        "badge_id": to_text(row.get("Badge id")),
+        "first_name": to_text(row.get("First Name")),
+        "last_name": to_text(row.get("Last Name")),
+        "phone": to_text(row.get("Phone")),
+        "email": to_text(row.get("Email")),
+        "gender": (to_text(row.get("Gender")) or "male").lower(),
+        "location": to_text(row.get("Location")),
+    }
+    for field, column in [
+        ("department", "Department"),
+        ("job_position", "Job Position"),
+        ("job_role", "Job Role"),
+        ("work_type", "Work Type"),
+        ("shift", "Shift"),
+        ("employee_type", "Employee Type"),
+        ("reporting_manager", "Reporting Manager"),
+        ("company", "Company"),
+    ]:
+        data[field] = to_text(row.get(column))
+
+    if data["email"] is None or not re.match(EMAIL_PATTERN, data["email"]):
+        errors["Email Error"] = "Invalid Email address"
+    if data["first_name"] is None:
+        errors["First Name error"] = "First Name can't be empty"
+    if data["phone"] is None:
+        errors["Phone error"] = "Phone Number can't be empty"
+    if data["gender"] not in dict(Employee.choice_gender):
+        errors["Gender Error"] = "Gender must be male, female or other"
+    for field, column, error_column, message in [
+        (
+            "date_joining",
+            "Date joining",
+            "Joining Date Error",
+            "Invalid Date format. Please use the format YYYY-MM-DD",
+        ),
+        (
+            "contract_end_date",
+            "Contract End Date",
+            "Contract Error",
+            "Invalid Date format. Please use the format YYYY-MM-DD",
+        ),
+    ]:
+        try:
+            data[field] = to_date(row.get(column))
+        except (ValueError, TypeError, OverflowError):
+            errors[error_column] = message
+    for field, column, error_column, message in [
+        (
+            "basic_salary",
+            "Basic Salary",
+            "Basic Salary Error",
+            "Basic Salary must be a number",
+        ),
+        (
+            "salary_hour",
+            "Salary Hour",
+            "Salary Hour Error",
+            "Salary Hour must be a number",
+        ),
+    ]:
+        try:
+            data[field] = to_amount(row.get(column))
+        except (ValueError, TypeError, OverflowError):
+            errors[error_column] = message
+    return data, errors
+
+
+def check_unique(rows):
+    """
+    This method is used to check the emails and badge ids of the valid rows
+    against the existing users and employees (one query each) and the other
+    rows of the sheet
+
+    Args:
+        rows: list of (row, data, errors) of the valid rows, the errors are
+            completed
+    """
+    emails = {data["email"] for _row, data, _errors in rows}
+    badge_ids = {data["badge_id"] for _row, data, _errors in rows if data["badge_id"]}
+    # the email and the badge id are checked across the companies
+    existing_emails = set(
+        User.objects.filter(username__in=emails).values_list("username", flat=True)
+    ) | set(
+        Employee._base_manager.filter(email__in=emails).values_list("email", flat=True)
+    )
+    existing_badge_ids = set(
+        Employee._base_manager.filter(badge_id__in=badge_ids).values_list(
+            "badge_id", flat=True
+        )
+    )
+    for _row, data, errors in rows:
+        if data["email"] in existing_emails:
+            errors["User ID Error"] = "User with the email ID already exists"
+        existing_emails.add(data["email"])
+        if data["badge_id"] and data["badge_id"] in existing_badge_ids:
+            errors["Badge ID Error"] = "An Employee with the badge ID already exists"
+        existing_badge_ids.add(data["badge_id"])
+
+
+def check_job_positions(rows):
+    """
+    This method is used to check the job positions of the valid rows, a job
+    position missing from the database (one query) is created in the
+    department of a row of the sheet, the rows of a new job position without
+    department are invalid when no other row gives it one
+
+    Args:
+        rows: list of (row, data, errors) of the valid rows, the errors are
+            completed
+    """
+    names = {data["job_position"] for _row, data, _errors in rows}
+    names.discard(None)
+    existing = set(
+        JobPosition._base_manager.filter(job_position__in=names).values_list(
+            "job_position", flat=True
+        )
+    )
+    with_department = {
+        data["job_position"] for _row, data, _errors in rows if data["department"]
+    }
+    for _row, data, errors in rows:
+        name = data["job_position"]
+        if name and name not in existing and name not in with_department:
+            errors["Job Position Error"] = (
+                "Department is required for a new job position"
+            )
+
+
+def hash_passwords(passwords):
+    """
+    This method is used to hash the passwords, in a process pool when there
+    are enough of them
+    """
+    # the hasher instance is sent to the workers, they need no settings
+    hash_password = partial(make_password, hasher=get_hasher())
+    if len(passwords) < POOL_THRESHOLD:
+        return [hash_password(password) for password in passwords]
+    # spawned workers, forking the threads of the web worker (schedulers,
+    # search index queue) could deadlock the children on their locks
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=50))
+
+
+def resolve(model, field, values, created_by=None, **extra):
+    """
+    This method is used to get the records of the names, with one query, the
+    missing ones are bulk created
+
+    Returns:
+        dict: name: record
+    """
+    values = {value for value in values if value}
+    if not values:
+        return {}
+    records = {}
+    for record in model.objects.filter(**{f"{field}__in": values}):
+        records.setdefault(getattr(record, field), record)
+    missing = [value for value in values if value not in records]
+    if missing:
+        model.objects.bulk_create(
+            [
+                model(**{field: value}, created_by=created_by, **extra)
+                for value in missing
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for record in model.objects.filter(**{f"{field}__in": missing}):
+            records.setdefault(getattr(record, field), record)
+    return records
+
+
+def resolve_references(datas, created_by=None):
+    """
+    This method is used to resolve the departments, job positions, job roles,
+    work types, shifts, employee types and companies of the rows
+
+    Returns:
+        dict: field: {name: record}
+    """
+    references = {
+        "department": resolve(
+            Department,
+            "department",
+            [data["department"] for data in datas],
+            created_by,
+        ),
+        "work_type": resolve(
+            WorkType, "work_type", [data["work_type"] for data in datas], created_by
+        ),
+        "shift": resolve(
+            EmployeeShift,
+            "employee_shift",
+            [data["shift"] for data in datas],
+            created_by,
+        ),
+        "employee_type": resolve(
+            EmployeeType,
+            "employee_type",
+            [data["employee_type"] for data in datas],
+            created_by,
+        ),
+    }
+    companies = {}
+    for company in Company.objects.filter(
+        company__in={data["company"] for data in datas if data["company"]}
+    ):
+        companies.setdefault(company.company, company)
+    references["company"] = companies
+
+    # the job position is unique across the companies, a missing one is created
+    # in the department of its first row
+    job_positions = {}
+    for record in JobPosition._base_manager.filter(
+        job_position__in={
+            data["job_position"] for data in datas if data["job_position"]
+        }
+    ):
+        job_positions[record.job_position] = record
+    missing = {}
+    for data in datas:
+        name = data["job_position"]
+        if name and name not in job_positions and data["department"]:
+            missing.setdefault(name, references["department"][data["department"]])
+    if missing:
+        JobPosition.objects.bulk_create(
+            [
+                JobPosition(
+                    job_position=name, department_id=department, created_by=created_by
+                )
+                for name, department in missing.items()
+            ]
+        )
+        for record in JobPosition._base_manager.filter(job_position__in=missing):
+            job_positions[record.job_position] = record
+    references["job_position"] = job_positions
+
+    # the job role is unique by job position across the companies
+    pairs = {
+        (job_positions[data["job_position"]].id, data["job_role"])
+        for data in datas
+        if data["job_role"] and data["job_position"]
+    }
+    job_roles = {
+        (record.job_position_id_id, record.job_role): record
+        for record in JobRole._base_manager.filter(
+            job_position_id__in={position_id for position_id, _role in pairs},
+            job_role__in={role for _position_id, role in pairs},
+        )
+    }
+    missing = [pair for pair in pairs if pair not in job_roles]
+    if missing:
+        JobRole.objects.bulk_create(
+            [
+                JobRole(
+                    job_position_id_id=position_id,
+                    job_role=role,
+                    created_by=created_by,
+                )
+                for position_id, role in missing
+            ]
+        )
+        job_roles.update(
+            {
+                (record.job_position_id_id, record.job_role): record
+                for record in JobRole._base_manager.filter(
+                    job_position_id__in={position_id for position_id, _role in missing},
+                    job_role__in={role for _position_id, role in missing},
+                )
+            }
+        )
+    references["job_role"] = job_roles
+    return references
+
+
+def split_name(full_name):
+    """
+    This method is used to split the full name in first and last name
+    """
+    first_name, _space, last_name = (full_name or "").partition(" ")
+    return first_name, last_name.strip()
+
+
+def resolve_managers(datas):
+    """
+    This method is used to get the reporting managers of the rows by their
+    full name, with one query, the employees of the sheet included
+
+    Returns:
+        dict: (first name, last name): employee
+    """
+    names = {split_name(data["reporting_manager"]) for data in datas}
+    names.discard(("", ""))
+    if not names:
+        return {}
+    managers = {}
+    for employee in Employee.objects.filter(
+        employee_first_name__in={first_name for first_name, _last_name in names}
+    ).order_by("id"):
+        managers.setdefault(
+            (employee.employee_first_name, employee.employee_last_name or ""), employee
+        )
+    return managers
+
+
+def create_employees(datas, created_by=None):
+    """
+    This method is used to bulk create the users and the employees of the
+    rows, the users get the phone number as password
+
+    Returns:
+        list: the created employees, in the order of the rows
+    """
+    passwords = hash_passwords([data["phone"] for data in datas])
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=data["email"],
+                email=data["email"],
+                password=password,
+                is_superuser=False,
+            )
+            for data, password in zip(datas, passwords)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    if any(user.pk is None for user in users):
+        # the database does not return the primary keys of a bulk insert
+        user_ids = dict(
+            User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list("username", "id")
+        )
+        for user in users:
+            user.pk = user_ids[user.username]
+
+    employees = Employee.objects.bulk_create(
+        [
+            Employee(
+                employee_user_id=user,
+                badge_id=data["badge_id"],
+                employee_first_name=data["first_name"],
+                employee_last_name=data["last_name"],
+                email=data["email"],
+                phone=data["phone"],
+                gender=data["gender"],
+            )
+            for data, user in zip(datas, users)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    if any(employee.pk is None for employee in employees):
+        employee_ids = dict(
+            Employee._base_manager.filter(
+                email__in=[employee.email for employee in employees]
+            ).values_list("email", "id")
+        )
+        for employee in employees:
+            employee.pk = employee_ids[employee.email]
+
+    bulk_create_with_history(
+        [
+            BonusPoint(employee_id=employee, created_by=created_by)
+            for employee in employees
+        ],
+        BonusPoint,
+        batch_size=BATCH_SIZE,
+        default_user=created_by,
+    )
+    return employees
+
+
+def create_work_infos(datas, employees, created_by=None):
+    """
+    This method is used to bulk create the work informations of the created
+    employees and their first contract
+    """
+    from payroll.models.models import Contract
+
+    references = resolve_references(datas, created_by)
+    managers = resolve_managers(datas)
+    today = date.today()
+    work_infos = []
+    for data, employee in zip(datas, employees):
+        job_position = references["job_position"].get(data["job_position"])
+        date_joining = data["date_joining"] or today
+        work_infos.append(
+            EmployeeWorkInformation(
+                employee_id=employee,
+                email=data["email"],
+                department_id=references["department"].get(data["department"]),
+                job_position_id=job_position,
+                job_role_id=(
+                    references["job_role"].get((job_position.id, data["job_role"]))
+                    if job_position
+                    else None
+                ),
+                work_type_id=references["work_type"].get(data["work_type"]),
+                shift_id=references["shift"].get(data["shift"]),
+                employee_type_id=references["employee_type"].get(data["employee_type"]),
+                reporting_manager_id=managers.get(
+                    split_name(data["reporting_manager"])
+                ),
+                company_id=references["company"].get(data["company"]),
+                location=data["location"],
+                date_joining=date_joining,
+                contract_end_date=data["contract_end_date"],
+                basic_salary=data["basic_salary"],
+                salary_hour=data["salary_hour"],
+                experience=experience_years(date_joining, today),
+            )
+        )
+    bulk_create_with_history(
+        work_infos,
+        EmployeeWorkInformation,
+        batch_size=BATCH_SIZE,
+        default_user=created_by,
+    )
+    bulk_create_with_history(
+        [
+            Contract(
+                contract_name=f"{work_info.employee_id}'s Contract",
+                employee_id=work_info.employee_id,
+                contract_start_date=today,
+                wage=work_info.basic_salary,
+                created_by=created_by,
+            )
+            for work_info in work_infos
+        ],
+        Contract,
+        batch_size=BATCH_SIZE,
+        default_user=created_by,
+    )
+
+
+def index_employees(employees):
+    """
+    This method is used to queue the created employees for the search index,
+    the bulk inserts do not send the save signals
+    """
+    signal_processor = apps.get_app_config("haystack").signal_processor
+    for employee in employees:
+        signal_processor.handle_save(Employee, employee)
+
+
+def import_employees(
+    rows, create_work_info=True, import_valid_rows=True, created_by=None
+):
+    """
+    This method is used to import the employees of the rows
+
+    Args:
+        rows: the rows of the sheet, as dicts of the COLUMNS
+        create_work_info: create the work informations of the employees
+        import_valid_rows: import the valid rows when some rows are invalid,
+            otherwise nothing is imported
+        created_by: the user importing the employees
+
+    Returns:
+        tuple: the number of imported employees and the invalid rows, with
+            their errors
+    """
+    checked = []
+    for row in rows:
+        data, errors = validate_row(row)
+        checked.append((row, data, errors))
+    check_unique([item for item in checked if not item[2]])
+    if create_work_info:
+        check_job_positions([item for item in checked if not item[2]])
+
+    error_rows = [{**row, **errors} for row, _data, errors in checked if errors]
+    datas = [data for _row, data, errors in checked if not errors]
+    if not datas or (error_rows and not import_valid_rows):
+        return 0, error_rows
+
+    with transaction.atomic():
+        employees = create_employees(datas, created_by)
+        if create_work_info:
+            create_work_infos(datas, employees, created_by)
+        transaction.on_commit(lambda: index_employees(employees))
+    return len(employees), error_rows
@@ -0,0 +1,86 @@
+"""
+employee/methods/experience.py
+
+This module is used to compute the company experience of the employees from
+their joining date. The experience is stored on the work information (read as
+an attribute by the payroll conditions) and refreshed daily with a single
+update computing it in the database.
+"""
+
+from datetime import date
+
+from django.db.models import DateField, F, FloatField, Func, IntegerField, Value
+from django.db.models.functions import Cast
+
+DAYS_IN_YEAR = 365.0
+
+
+class DaysBetween(Func):
+    """
+    Number of days from the second date to the first one
+    """
+
+    arity = 2
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS integer)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="DATEDIFF(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+def experience_years(date_joining, today=None):
+    """
+    This method is used to compute the experience in years from the joining
+    date, 0 without joining date
+    """
+    if date_joining is None:
+        return 0
+    return ((today or date.today()) - date_joining).days / DAYS_IN_YEAR
+
+
+def experience_expression(today=None):
+    """
+    This method is used to get the experience in years as a database
+    expression of the joining date
+
+    Args:
+        today: date the experience is computed at, the current date by default
+    """
+    return Cast(
+        DaysBetween(
+            Value(today or date.today(), output_field=DateField()), F("date_joining")
+        )
+        / Value(DAYS_IN_YEAR),
+        output_field=FloatField(),
+    )
+
+
+def refresh_experience(today=None):
+    """
+    This method is used to refresh the stored experience of the active
+    employees with one update, the history signals are not fired
+
+    Returns:
+        int: number of updated work informations
+    """
+    from employee.models import EmployeeWorkInformation
+
+    return EmployeeWorkInformation.objects.filter(
+        employee_id__is_active=True, date_joining__isnull=False
+    ).update(experience=experience_expression(today))
@@ -5,12 +5,14 @@ This module is used to register models for employee app
 
 """
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User, Permission
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed, post_save
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as trans
 from django.utils.translation import gettext as _
 from django.core.exceptions import ValidationError
@@ -31,6 +33,7 @@ from base.models import (
 )
 from base.Mibs_company_manager import MibsCompanyManager
 from employee.methods.duration_methods import strtime_seconds, format_time
+from employee.methods.experience import experience_years
 
 # create your model
 
@@ -379,6 +382,12 @@ class Employee(models.Model):
                 name="unique_badge_id",
             )
         ]
+        indexes = [
+            # serves the case insensitive sorting of the lists by employee name
+            models.Index(
+                Lower("employee_first_name"), name="employee_first_name_lower"
+            ),
+        ]
 
     def days_until_birthday(self):
         """
@@ -556,6 +565,7 @@ class EmployeeWorkInformation(models.Model):
         return f"{self.employee_id} - {self.job_position_id}"
 
     def save(self, *args, **kwargs):
+        self.experience = experience_years(self.date_joining)
         self.full_clean()
         super().save(*args, **kwargs)
 
@@ -571,23 +581,14 @@ class EmployeeWorkInformation(models.Model):
 
     def experience_calculator(self):
         """
-        This method is to calculate the default value for experience field
+        This method is to calculate the default value for experience field, the
+        value is stored with an update so no history entry is added
         """
-        joining_date = self.date_joining
-        if joining_date is None:
-            return 0
-        current_date = datetime.now().date()
-
-        # Calculate the difference between the current date and joining date
-        delta = current_date - joining_date
-
-        # Calculate the total number of days
-        total_days = delta.days
-
-        # Calculate the number of experience as a float
-        experience = total_days / 365.0
-        self.experience = experience
-        self.save()
+        self.experience = experience_years(self.date_joining)
+        if self.pk:
+            EmployeeWorkInformation.objects.filter(pk=self.pk).update(
+                experience=self.experience
+            )
         return self
 
 
@@ -812,6 +813,179 @@ class DisciplinaryAction(MibsModel):
     class Meta:
         ordering = ["-id"]
 
+    def block_windows(self):
+        """
+        This method is used to compute the login block window of each employee
+        of the action, {employee id: (starts at, ends at)}, the end is None for
+        a dismissal
+        """
+        from base.models import EmployeeShiftSchedule
+
+        action = self.action
+        if (
+            not action.block_option
+            or action.action_type not in ("suspension", "dismissal")
+            or self.start_date is None
+        ):
+            return {}
+
+        start = timezone.make_aware(datetime.combine(self.start_date, time.min))
+        employees = self.employee_id.select_related("employee_work_info")
+        if action.action_type == "dismissal":
+            return {employee.id: (start, None) for employee in employees}
+        if self.unit_in == "days":
+            end = start + timedelta(days=self.days or 0)
+            return {employee.id: (start, end) for employee in employees}
+
+        # hour based suspensions start with the shift of the employee that day
+        hours, minutes = (self.hours or "00:00").split(":")
+        duration = timedelta(hours=int(hours), minutes=int(minutes))
+        shift_ids = {
+            getattr(getattr(employee, "employee_work_info", None), "shift_id_id", None)
+            for employee in employees
+        }
+        shift_starts = dict(
+            EmployeeShiftSchedule.objects.filter(
+                shift_id__in=shift_ids,
+                day__day=self.start_date.strftime("%A").lower(),
+            ).values_list("shift_id", "start_time")
+        )
+        windows = {}
+        for employee in employees:
+            work_info = getattr(employee, "employee_work_info", None)
+            shift_start = shift_starts.get(getattr(work_info, "shift_id_id", None))
+            starts_at = start
+            if shift_start is not None:
+                starts_at = timezone.make_aware(
+                    datetime.combine(self.start_date, shift_start)
+                )
+            windows[employee.id] = (starts_at, starts_at + duration)
+        return windows
+
+    def sync_block_windows(self):
+        """
+        This method is used to save the login block windows of the action, the
+        windows of the employees removed from the action are deleted and the
+        users they were blocking are unblocked
+        """
+        windows = self.block_windows()
+        removed = self.block_window_set.exclude(employee_id__in=windows)
+        released = list(
+            removed.filter(
+                blocked_at__isnull=False, unblocked_at__isnull=True
+            ).values_list("employee_id", flat=True)
+        )
+        removed.delete()
+        existing = {
+            window.employee_id_id: window for window in self.block_window_set.all()
+        }
+        now = timezone.now()
+        for employee_id, (starts_at, ends_at) in windows.items():
+            window = existing.get(employee_id)
+            if window is None:
+                DisciplinaryBlockWindow.objects.create(
+                    disciplinary_action=self,
+                    employee_id_id=employee_id,
+                    starts_at=starts_at,
+                    ends_at=ends_at,
+                )
+            elif (window.starts_at, window.ends_at) != (starts_at, ends_at):
+                window.starts_at = starts_at
+                window.ends_at = ends_at
+                blocking = window.blocked_at is not None and window.unblocked_at is None
+                if starts_at > now:
+                    # the scheduler blocks the user again when the window starts
+                    if blocking:
+                        released.append(employee_id)
+                    window.blocked_at = None
+                    window.unblocked_at = None
+                elif window.unblocked_at is not None and (
+                    ends_at is None or ends_at > now
+                ):
+                    # running again after the user was unblocked
+                    window.blocked_at = None
+                    window.unblocked_at = None
+                window.save()
+        if released:
+            DisciplinaryBlockWindow.unblock(released)
+
+
+class DisciplinaryBlockWindow(models.Model):
+    """
+    Login block window of an employee under a disciplinary action, the
+    scheduler blocks the user when the window starts and unblocks it when the
+    window ends, the times it did are kept in blocked_at and unblocked_at
+    """
+
+    disciplinary_action = models.ForeignKey(
+        DisciplinaryAction, on_delete=models.CASCADE, related_name="block_window_set"
+    )
+    employee_id = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="block_window_set"
+    )
+    starts_at = models.DateTimeField(db_index=True)
+    ends_at = models.DateTimeField(null=True, db_index=True)
+    blocked_at = models.DateTimeField(null=True)
+    unblocked_at = models.DateTimeField(null=True)
+    objects = models.Manager()
+
+    class Meta:
+        unique_together = ("disciplinary_action", "employee_id")
+
+    def __str__(self) -> str:
+        return f"{self.employee_id} - {self.starts_at} / {self.ends_at}"
+
+    @staticmethod
+    def running_filter(now=None):
+        """
+        This method is used to get the condition of the windows running now
+        """
+        now = now or timezone.now()
+        return models.Q(starts_at__lte=now) & (
+            models.Q(ends_at__isnull=True) | models.Q(ends_at__gt=now)
+        )
+
+    @staticmethod
+    def unblock(employee_ids):
+        """
+        This method is used to unblock the users of the employees, the users
+        still inside a running window stay blocked
+        """
+        still_running = DisciplinaryBlockWindow.objects.filter(
+            DisciplinaryBlockWindow.running_filter()
+        )
+        User.objects.filter(employee_get__id__in=employee_ids).exclude(
+            employee_get__block_window_set__in=still_running
+        ).update(is_active=True)
+
+    @property
+    def is_active_now(self):
+        """
+        Whether the window is running now
+        """
+        now = timezone.now()
+        return self.starts_at <= now and (self.ends_at is None or now < self.ends_at)
+
+
+@receiver(post_save, sender=DisciplinaryAction)
+def disciplinary_action_post_save(sender, instance, **_kwargs):
+    """
+    This method is used to keep the login block windows of the action in sync
+    """
+    instance.sync_block_windows()
+
+
+@receiver(m2m_changed, sender=DisciplinaryAction.employee_id.through)
+def disciplinary_action_employees_changed(sender, instance, action, **_kwargs):
+    """
+    This method is used to keep the login block windows in sync with the
+    employees of the action
+    """
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(
+        instance, DisciplinaryAction
+    ):
+        instance.sync_block_windows()
+
 
 class EmployeeGeneralSetting(MibsModel):
     """
@@ -0,0 +1,13 @@
+from haystack import indexes
+from .models import Employee
+
+
+class EmployeeIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, use_template=True)
+    badge_id = indexes.CharField(model_attr="badge_id", null=True)
+
+    def get_model(self):
+        return Employee
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.filter(is_active=True)
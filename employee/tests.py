@@ -1,3 +1,339 @@
-from django.test import TestCase
+import os
+import time
+from datetime import date, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import DateField, F, Value
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from base.models import Department, JobPosition
+from employee.methods.bulk_import import (
+    POOL_THRESHOLD,
+    hash_passwords,
+    import_employees,
+)
+from employee.methods.experience import (
+    DaysBetween,
+    experience_expression,
+    experience_years,
+    refresh_experience,
+)
+from employee.models import (
+    Actiontype,
+    BonusPoint,
+    DisciplinaryAction,
+    DisciplinaryBlockWindow,
+    Employee,
+    EmployeeWorkInformation,
+)
+from employee.scheduler import block_unblock_disciplinary
+
+
+def import_row(index, **kwargs):
+    """
+    This method is used to build a row of the work information import sheet
+    """
+    row = {
+        "Badge id": f"EMP{index:05}",
+        "First Name": f"First{index}",
+        "Last Name": f"Last{index}",
+        "Phone": 9000000000 + index,
+        "Email": f"employee{index}@example.com",
+        "Gender": "Male",
+        "Department": f"Department{index % 5}",
+        "Job Position": f"Position{index % 10}",
+        "Job Role": f"Role{index % 10}",
+        "Work Type": "Office",
+        "Shift": "Morning",
+        "Employee Type": "Permanent",
+        "Reporting Manager": None,
+        "Company": None,
+        "Location": "Kochi",
+        "Date joining": "2024-01-15",
+        "Contract End Date": None,
+        "Basic Salary": 30000,
+        "Salary Hour": 200,
+    }
+    row.update(kwargs)
+    return row
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EmployeeImportTests(TestCase):
+    """
+    Import of the employees with their users and work informations
+    """
+
+    def test_import(self):
+        rows = [import_row(index) for index in range(20)]
+        rows[5]["Reporting Manager"] = "First0 Last0"
+
+        imported, error_rows = import_employees(rows)
+
+        self.assertEqual(imported, 20)
+        self.assertEqual(error_rows, [])
+        self.assertEqual(Department.objects.count(), 5)
+        self.assertEqual(JobPosition.objects.count(), 10)
+        employee = Employee.objects.get(badge_id="EMP00005")
+        self.assertEqual(employee.employee_user_id.username, "employee5@example.com")
+        self.assertTrue(employee.employee_user_id.check_password("9000000005"))
+        self.assertEqual(employee.gender, "male")
+        work_info = employee.employee_work_info
+        self.assertEqual(work_info.department_id.department, "Department0")
+        self.assertEqual(
+            work_info.job_role_id.job_position_id.job_position, "Position5"
+        )
+        self.assertEqual(work_info.reporting_manager_id.badge_id, "EMP00000")
+        self.assertEqual(work_info.date_joining, date(2024, 1, 15))
+        self.assertEqual(work_info.history_set.count(), 1)
+        self.assertEqual(BonusPoint.objects.count(), 20)
+
+    def test_error_report(self):
+        Employee.objects.create(
+            employee_first_name="Existing",
+            email="existing@example.com",
+            phone="1",
+            badge_id="EMP00001",
+        )
+        rows = [
+            import_row(0),
+            import_row(1),
+            import_row(2, Email="invalid"),
+            import_row(3, **{"Date joining": "not a date", "Basic Salary": "x"}),
+            import_row(4, Email="employee0@example.com", **{"Badge id": "EMP00004"}),
+        ]
+
+        imported, error_rows = import_employees(rows)
+
+        self.assertEqual(imported, 1)
+        errors = {row["Badge id"]: row for row in error_rows}
+        self.assertIn("Badge ID Error", errors["EMP00001"])
+        self.assertIn("Email Error", errors["EMP00002"])
+        self.assertIn("Joining Date Error", errors["EMP00003"])
+        self.assertIn("Basic Salary Error", errors["EMP00003"])
+        self.assertIn("User ID Error", errors["EMP00004"])
+
+    def test_new_job_position_requires_department(self):
+        rows = [
+            import_row(0),
+            import_row(1, Department=None, **{"Job Position": "New Position"}),
+            import_row(2, Department=None, **{"Job Position": "Position0"}),
+        ]
+
+        imported, error_rows = import_employees(rows)
+
+        self.assertEqual(imported, 2)
+        self.assertEqual(len(error_rows), 1)
+        self.assertEqual(
+            error_rows[0]["Job Position Error"],
+            "Department is required for a new job position",
+        )
+        self.assertFalse(JobPosition.objects.filter(job_position="New Position"))
+
+    def test_invalid_rows_stop_the_import(self):
+        rows = [import_row(0), import_row(1, **{"First Name": None})]
+
+        imported, error_rows = import_employees(rows, import_valid_rows=False)
+
+        self.assertEqual(imported, 0)
+        self.assertEqual(len(error_rows), 1)
+        self.assertFalse(User.objects.exists())
+
+    def test_passwords_hashed_in_the_pool(self):
+        passwords = [f"password{index}" for index in range(POOL_THRESHOLD)]
+
+        hashes = hash_passwords(passwords)
+
+        # the workers use the hasher of this process (MD5 in the tests)
+        self.assertTrue(all(hashed.startswith("md5$") for hashed in hashes))
+        user = User(username="pooled")
+        for index in (0, POOL_THRESHOLD - 1):
+            user.password = hashes[index]
+            self.assertTrue(user.check_password(passwords[index]))
+
+    def test_queries_do_not_grow_with_the_rows(self):
+        # the references of the sheet are created by the first import
+        import_employees([import_row(index) for index in range(10)])
+        with CaptureQueriesContext(connection) as small:
+            import_employees([import_row(index) for index in range(10, 20)])
+        with CaptureQueriesContext(connection) as large:
+            import_employees([import_row(index) for index in range(20, 50)])
+        self.assertEqual(len(small), len(large))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EmployeeImportBenchmark(TestCase):
+    """
+    Benchmark of a 10k rows import, run with MIBS_BENCHMARK=1
+    """
+
+    def setUp(self):
+        if not os.environ.get("MIBS_BENCHMARK"):
+            self.skipTest("set MIBS_BENCHMARK=1 to run the benchmark")
+
+    def run(self, result=None):
+        # the timing is written to the stream of the test runner
+        self.result = result
+        return super().run(result)
+
+    def report(self, message):
+        stream = getattr(self.result, "stream", None)
+        if stream is not None:
+            stream.writeln(message)
+
+    def test_import_10k_rows(self):
+        rows = [import_row(index) for index in range(10000)]
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            imported, _error_rows = import_employees(rows)
+            duration = time.perf_counter() - start
+        self.report(f"\n10k rows imported in {duration:.2f}s, {len(queries)} queries")
+        self.assertEqual(imported, 10000)
+        self.assertEqual(EmployeeWorkInformation.objects.count(), 10000)
+
+
+class DisciplinaryBlockWindowTests(TestCase):
+    """
+    Login block windows of the disciplinary suspensions
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("suspended", password="password")
+        self.employee = Employee.objects.create(
+            employee_user_id=self.user,
+            employee_first_name="Suspended",
+            email="suspended@example.com",
+            phone="1",
+        )
+        self.action_type = Actiontype.objects.create(
+            title="Suspension", action_type="suspension", block_option=True
+        )
+
+    def create_action(self, start_date, days):
+        action = DisciplinaryAction.objects.create(
+            action=self.action_type,
+            description="Suspension",
+            unit_in="days",
+            days=days,
+            start_date=start_date,
+        )
+        action.employee_id.add(self.employee)
+        return action
+
+    def is_active(self):
+        self.user.refresh_from_db()
+        return self.user.is_active
+
+    def test_extended_window_blocks_again(self):
+        today = timezone.localdate()
+        action = self.create_action(today - timedelta(days=3), 2)
+        window = action.block_window_set.get()
+        window.blocked_at = window.unblocked_at = timezone.now()
+        window.save()
+
+        action.days = 5
+        action.save()
+        block_unblock_disciplinary()
+        self.assertFalse(self.is_active())
+
+    def test_moved_window_unblocks_until_it_starts(self):
+        action = self.create_action(timezone.localdate(), 2)
+        block_unblock_disciplinary()
+        self.assertFalse(self.is_active())
+
+        action.start_date = timezone.localdate() + timedelta(days=3)
+        action.save()
+        self.assertTrue(self.is_active())
+        self.assertIsNone(action.block_window_set.get().blocked_at)
+
+    def test_command_backfills_windows(self):
+        action = self.create_action(timezone.localdate(), 2)
+        DisciplinaryBlockWindow.objects.all().delete()
+        call_command("sync_block_windows", stdout=StringIO())
+        self.assertEqual(action.block_window_set.count(), 1)
+        block_unblock_disciplinary()
+        self.assertFalse(self.is_active())
+
+
+class ExperienceTests(TestCase):
+    """
+    Experience computed by the database against the python computation
+    """
+
+    today = date(2024, 3, 1)
+    joining_dates = [
+        date(2024, 3, 1),
+        date(2024, 2, 28),
+        date(2023, 3, 1),
+        date(2020, 2, 29),
+        date(2011, 12, 31),
+    ]
+
+    def setUp(self):
+        employees = Employee.objects.bulk_create(
+            [
+                Employee(
+                    employee_first_name=f"Employee{index}",
+                    email=f"employee{index}@example.com",
+                    phone="1",
+                )
+                for index in range(len(self.joining_dates) + 2)
+            ]
+        )
+        employees[-1].is_active = False
+        employees[-1].save()
+        EmployeeWorkInformation.objects.bulk_create(
+            [
+                EmployeeWorkInformation(
+                    employee_id=employee, date_joining=date_joining, experience=-1
+                )
+                for employee, date_joining in zip(
+                    employees, self.joining_dates + [None, date(2020, 1, 1)]
+                )
+            ]
+        )
+
+    def test_days_between(self):
+        days = EmployeeWorkInformation.objects.filter(
+            date_joining__isnull=False
+        ).annotate(
+            days=DaysBetween(
+                Value(self.today, output_field=DateField()), F("date_joining")
+            )
+        )
+        for work_info in days:
+            self.assertEqual(work_info.days, (self.today - work_info.date_joining).days)
+
+    def test_expression_matches_experience_years(self):
+        work_infos = EmployeeWorkInformation.objects.filter(
+            date_joining__isnull=False
+        ).annotate(computed=experience_expression(self.today))
+        for work_info in work_infos:
+            self.assertAlmostEqual(
+                work_info.computed,
+                experience_years(work_info.date_joining, self.today),
+            )
+
+    def test_refresh_experience(self):
+        history_count = EmployeeWorkInformation.history.count()
+
+        updated = refresh_experience(self.today)
+
+        self.assertEqual(updated, len(self.joining_dates))
+        for work_info in EmployeeWorkInformation.objects.filter(
+            employee_id__is_active=True, date_joining__isnull=False
+        ):
+            self.assertAlmostEqual(
+                work_info.experience,
+                experience_years(work_info.date_joining, self.today),
+            )
+        # no joining date or inactive employee: left as stored
+        self.assertEqual(
+            EmployeeWorkInformation.objects.filter(experience=-1).count(), 2
+        )
+        self.assertEqual(EmployeeWorkInformation.history.count(), history_count)
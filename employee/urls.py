@@ -13,6 +13,11 @@ from Mibs_documents.models import DocumentRequest
 
 urlpatterns = [
     path("get-language-code/", views.get_language_code, name="get-language-code"),
+    path(
+        "employee-autocomplete/",
+        views.employee_autocomplete,
+        name="employee-autocomplete",
+    ),
     path("employee-profile/", views.employee_profile, name="employee-profile"),
     path(
         "employee-view/<int:obj_id>/",
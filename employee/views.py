@@ -37,6 +37,7 @@ from asset.models import AssetAssignment, AssetRequest
 from django.utils.translation import gettext_lazy as _
 from attendance.methods.group_by import group_by_queryset
 from attendance.models import Attendance, AttendanceOverTime
+from employee.methods.bulk_import import import_employees, split_name, to_text
 from employee.methods.methods import get_ordered_badge_ids
 from Mibs.filters import MibsPaginator
 from Mibs_audit.models import AccountBlockUnblock
@@ -53,14 +54,10 @@ from Mibs.decorators import (
 from base.models import (
     Department,
     EmailLog,
-    JobPosition,
     JobRole,
     RotatingShiftAssign,
     RotatingWorkTypeAssign,
     ShiftRequest,
-    WorkType,
-    EmployeeShift,
-    EmployeeType,
     Company,
     WorkTypeRequest,
     clear_messages,
@@ -166,6 +163,55 @@ def get_language_code(request):
     return JsonResponse({"language_code": language_code})
 
 
+EMPLOYEE_AUTOCOMPLETE_PAGE_SIZE = 20
+
+
+@login_required
+def employee_autocomplete(request):
+    """
+    This method is used to search the active employees for the select2 filter
+    widgets, returns one page of {"id", "text"} results
+
+    Args:
+        term: the searched name or badge id
+        page: the page of the results
+    """
+    term = request.GET.get("term", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    employees = Employee.objects.filter(is_active=True)
+    for part in term.split():
+        employees = employees.filter(
+            Q(employee_first_name__icontains=part)
+            | Q(employee_last_name__icontains=part)
+            | Q(badge_id__icontains=part)
+        )
+    start = (page - 1) * EMPLOYEE_AUTOCOMPLETE_PAGE_SIZE
+    rows = list(
+        employees.order_by("employee_first_name", "pk").values_list(
+            "id", "employee_first_name", "employee_last_name", "badge_id"
+        )[start : start + EMPLOYEE_AUTOCOMPLETE_PAGE_SIZE + 1]
+    )
+    results = [
+        {
+            "id": employee_id,
+            "text": f"{first_name} {last_name or ''} "
+            + (f"({badge_id})" if badge_id is not None else ""),
+        }
+        for employee_id, first_name, last_name, badge_id in rows[
+            :EMPLOYEE_AUTOCOMPLETE_PAGE_SIZE
+        ]
+    ]
+    return JsonResponse(
+        {
+            "results": results,
+            "pagination": {"more": len(rows) > EMPLOYEE_AUTOCOMPLETE_PAGE_SIZE},
+        }
+    )
+
+
 @login_required
 def employee_profile(request):
     """
@@ -2282,38 +2328,20 @@ def employee_import(request):
         data_frame = pd.read_excel(file)
         # Convert the DataFrame to a list of dictionaries
         employee_dicts = data_frame.to_dict("records")
-        # Create or update Employee objects from the list of dictionaries
-        error_list = []
+        rows = []
         for employee_dict in employee_dicts:
-            try:
-                phone = employee_dict["phone"]
-                email = employee_dict["email"]
-                employee_full_name = employee_dict["employee_full_name"]
-                existing_user = User.objects.filter(username=email).first()
-                if existing_user is None:
-                    employee_first_name = employee_full_name
-                    employee_last_name = ""
-                    if " " in employee_full_name:
-                        (
-                            employee_first_name,
-                            employee_last_name,
-                        ) = employee_full_name.split(" ", 1)
-
-                    user = User.objects.create_user(
-                        username=email,
-                        email=email,
-                        password=str(phone).strip(),
-                        is_superuser=False,
-                    )
-                    employee = Employee()
-                    employee.employee_user_id = user
-                    employee.employee_first_name = employee_first_name
-                    employee.employee_last_name = employee_last_name
-                    employee.email = email
-                    employee.phone = phone
-                    employee.save()
-            except Exception:
-                error_list.append(employee_dict)
+            first_name, last_name = split_name(
+                to_text(employee_dict.get("employee_full_name"))
+            )
+            rows.append(
+                {
+                    "First Name": first_name or None,
+                    "Last Name": last_name,
+                    "Email": employee_dict.get("email"),
+                    "Phone": employee_dict.get("phone"),
+                }
+            )
+        import_employees(rows, create_work_info=False, created_by=request.user)
         return HttpResponse(
             """
     <div class='alert-success p-3 border-rounded'>
@@ -2356,18 +2384,6 @@ def employee_export(_):
     return response
 
 
-def convert_nan(field, dicts):
-    """
-    This method is returns None or field value
-    """
-    field_value = dicts.get(field)
-    try:
-        float(field_value)
-        return None
-    except ValueError:
-        return field_value
-
-
 @login_required
 @permission_required("employee.add_employee")
 def work_info_import(request):
@@ -2420,6 +2436,8 @@ def work_info_import(request):
         "Email Error": [],
         "First Name error": [],
         "Phone error": [],
+        "Gender Error": [],
+        "Job Position Error": [],
         "Joining Date Error": [],
         "Contract Error": [],
         "Badge ID Error": [],
@@ -2441,231 +2459,21 @@ def work_info_import(request):
         data_frame = pd.read_excel(file)
         work_info_dicts = data_frame.to_dict("records")
         error_lists = []
-        success_lists = []
         total_count = 0
-        error_occured = False
-        for work_info in work_info_dicts:
-            error = False
-            try:
-                email = work_info["Email"]
-                phone = work_info["Phone"]
-                first_name = convert_nan("First Name", work_info)
-                last_name = work_info["Last Name"]
-                badge_id = convert_nan("Badge id", work_info)
-                department = convert_nan("Department", work_info)
-                job_position = convert_nan("Job Position", work_info)
-                job_role = convert_nan("Job Role", work_info)
-                work_type = convert_nan("Work Type", work_info)
-                employee_type = convert_nan("Employee Type", work_info)
-                reporting_manager = convert_nan("Reporting Manager", work_info)
-                company = convert_nan("Company", work_info)
-                location = convert_nan("Location", work_info)
-                shift = convert_nan("Shift", work_info)
-                date_joining = work_info["Date joining"]
-                contract_end_date = work_info["Contract End Date"]
-                basic_salary = convert_nan("Basic Salary", work_info)
-                salary_hour = convert_nan("Salary Hour", work_info)
-                gender = work_info.get("Gender")
-
-                pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-
-                if pd.isna(email) or not re.match(pattern, email):
-                    work_info["Email Error"] = f"Invalid Email address"
-                    error = True
-
-                # try:
-                #     pd.to_numeric(phone)
-                # except:
-                #     work_info["Phone Error"] = "Phone number must be a number"
-                #     error = True
-
-                try:
-                    pd.to_numeric(basic_salary)
-                except ValueError:
-                    work_info["Basic Salary Error"] = f"Basic Salary must be a number"
-                    error = True
-
-                try:
-                    pd.to_numeric(salary_hour)
-                except ValueError:
-                    work_info["Salary Hour Error"] = f"Salary Hour must be a number"
-                    error = True
-
-                if pd.isna(first_name):
-                    work_info["First Name error"] = f"First Name can't be empty"
-                    error = True
-
-                if pd.isna(phone):
-                    work_info["Phone error"] = f"Phone Number can't be empty"
-                    error = True
-
-                try:
-                    pd.to_datetime(date_joining).date()
-                except:
-                    work_info["Joining Date Error"] = (
-                        f"Invalid Date format. Please use the format YYYY-MM-DD"
-                    )
-                    error = True
-
-                try:
-                    pd.to_datetime(contract_end_date).date()
-                except:
-                    work_info["Contract Error"] = (
-                        f"Invalid Date format. Please use the format YYYY-MM-DD"
-                    )
-                    error = True
-
-                if Employee.objects.filter(badge_id=badge_id).exists():
-                    work_info["Badge ID Error"] = (
-                        f"An Employee with the badge ID already exists"
-                    )
-                    error = True
-
-                user = User.objects.filter(username=email).first()
-                if user:
-                    work_info["User ID Error"] = (
-                        f"User with the email ID already exists"
-                    )
-                    error = True
-
-                if error:
-                    error_lists.append(work_info)
-                else:
-                    success_lists.append(work_info)
-
-            except Exception as e:
-                error_occured = True
-                logger.error(e)
-
-        if create_work_info or not error_lists:
+        error_occured = not {
+            "Email",
+            "Phone",
+            "Last Name",
+            "Date joining",
+            "Contract End Date",
+        }.issubset(data_frame.columns)
+        if not error_occured:
             try:
-                for work_info in success_lists:
-                    email = work_info["Email"]
-                    phone = work_info["Phone"]
-                    first_name = convert_nan("First Name", work_info)
-                    last_name = work_info["Last Name"]
-                    badge_id = convert_nan("Badge id", work_info)
-                    department = convert_nan("Department", work_info)
-                    job_position = convert_nan("Job Position", work_info)
-                    job_role = convert_nan("Job Role", work_info)
-                    work_type = convert_nan("Work Type", work_info)
-                    employee_type = convert_nan("Employee Type", work_info)
-                    reporting_manager = convert_nan("Reporting Manager", work_info)
-                    company = convert_nan("Company", work_info)
-                    location = convert_nan("Location", work_info)
-                    shift = convert_nan("Shift", work_info)
-                    date_joining = work_info["Date joining"]
-                    contract_end_date = work_info["Contract End Date"]
-                    basic_salary = convert_nan("Basic Salary", work_info)
-                    salary_hour = convert_nan("Salary Hour", work_info)
-                    gender = work_info.get("Gender")
-
-                    if User.objects.filter(username=email).first():
-                        continue
-
-                    user = User.objects.create_user(
-                        username=email,
-                        email=email,
-                        password=str(phone).strip(),
-                        is_superuser=False,
-                    )
-
-                    employee_obj = Employee()
-                    employee_obj.employee_user_id = user
-                    employee_obj.badge_id = badge_id
-                    employee_obj.employee_first_name = first_name
-                    employee_obj.employee_last_name = last_name
-                    employee_obj.email = email
-                    employee_obj.phone = phone
-                    employee_obj.gender = gender.lower()
-                    employee_obj.save()
-
-                    department_obj = Department.objects.filter(
-                        department=department
-                    ).first()
-                    if department_obj is None and department is not None:
-                        department_obj = Department()
-                        department_obj.department = department
-                        department_obj.save()
-
-                    job_position_obj = JobPosition.objects.filter(
-                        department_id=department_obj, job_position=job_position
-                    ).first()
-                    if job_position_obj is None and job_position is not None:
-                        job_position_obj = JobPosition()
-                        job_position_obj.department_id = department_obj
-                        job_position_obj.job_position = job_position
-                        job_position_obj.save()
-
-                    job_role_obj = JobRole.objects.filter(
-                        job_role=job_role, job_position_id=job_position_obj
-                    ).first()
-                    if job_role_obj is None and job_role is not None:
-                        job_role_obj = JobRole()
-                        job_role_obj.job_position_id = job_position_obj
-                        job_role_obj.job_role = job_role
-                        job_role_obj.save()
-
-                    work_type_obj = WorkType.objects.filter(work_type=work_type).first()
-                    if work_type_obj is None and work_type is not None:
-                        work_type_obj = WorkType()
-                        work_type_obj.work_type = work_type
-
-                    shift_obj = EmployeeShift.objects.filter(
-                        employee_shift=shift
-                    ).first()
-                    if shift_obj is None and shift is not None:
-                        shift_obj = EmployeeShift()
-                        shift_obj.employee_shift = shift
-                        shift_obj.save()
-
-                    employee_type_obj = EmployeeType.objects.filter(
-                        employee_type=employee_type
-                    ).first()
-                    if employee_type_obj is None and employee_type is not None:
-                        employee_type_obj = EmployeeType()
-                        employee_type_obj.employee_type = employee_type
-                        employee_type_obj.save()
-
-                    manager_fname, manager_lname = "", ""
-                    if isinstance(reporting_manager, str) and " " in reporting_manager:
-                        manager_fname, manager_lname = reporting_manager.split(" ", 1)
-                    reporting_manager_obj = Employee.objects.filter(
-                        employee_first_name=manager_fname,
-                        employee_last_name=manager_lname,
-                    ).first()
-                    company_obj = Company.objects.filter(company=company).first()
-                    employee_work_info = EmployeeWorkInformation.objects.filter(
-                        employee_id=employee_obj
-                    ).first()
-                    if employee_work_info is None:
-                        employee_work_info = EmployeeWorkInformation()
-                    employee_work_info.employee_id = employee_obj
-                    employee_work_info.email = email
-                    employee_work_info.department_id = department_obj
-                    employee_work_info.job_position_id = job_position_obj
-                    employee_work_info.job_role_id = job_role_obj
-                    employee_work_info.employee_type_id = employee_type_obj
-                    employee_work_info.reporting_manager_id = reporting_manager_obj
-                    employee_work_info.company_id = company_obj
-                    employee_work_info.shift_id = shift_obj
-                    employee_work_info.location = location
-                    employee_work_info.date_joining = (
-                        date_joining if date_joining == "nan" else datetime.today()
-                    )
-                    employee_work_info.contract_end_date = (
-                        contract_end_date if contract_end_date == "nan" else None
-                    )
-                    employee_work_info.basic_salary = (
-                        basic_salary if type(basic_salary) is int else 0
-                    )
-                    employee_work_info.salary_hour = (
-                        salary_hour if type(salary_hour) is int else 0
-                    )
-                    employee_work_info.save()
-
-                    total_count += 1
-
+                total_count, error_lists = import_employees(
+                    work_info_dicts,
+                    import_valid_rows=create_work_info,
+                    created_by=request.user,
+                )
             except Exception as e:
                 error_occured = True
                 logger.error(e)
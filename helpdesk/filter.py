@@ -5,11 +5,17 @@ This page is used to register filter for employee models
 
 """
 
+import logging
+
 from django import forms
+from django.db.models import Case, IntegerField, When
 from django_filters import CharFilter, DateFilter
 from helpdesk.models import FAQ, FAQCategory, Ticket
+from helpdesk.search import ticket_search_ids
 from Mibs.filters import FilterSet
 
+logger = logging.getLogger(__name__)
+
 
 class FAQFilter(FilterSet):
     """
@@ -62,7 +68,7 @@ class TicketFilter(FilterSet):
         FilterSet (class): custom filter set class to apply styling
     """
 
-    search = CharFilter(field_name="title", lookup_expr="icontains")
+    search = CharFilter(method="search_method")
     from_date = DateFilter(
         field_name="deadline",
         lookup_expr="gte",
@@ -92,6 +98,31 @@ class TicketFilter(FilterSet):
             "is_active",
         ]
 
+    def search_method(self, queryset, _, value):
+        """
+        Filter the tickets by the full text search on their title, description
+        and comments, ranked by relevance, by their title when none of the
+        tickets of the queryset matches in the index (not built yet) or the
+        index is unavailable
+        """
+        try:
+            ticket_ids = ticket_search_ids(value)
+        except Exception as error:
+            logger.error("Ticket search failed: %s", error)
+            ticket_ids = []
+        scoped_ids = set(
+            queryset.filter(pk__in=ticket_ids).values_list("pk", flat=True)
+        )
+        ranked_ids = [pk for pk in ticket_ids if pk in scoped_ids]
+        if not ranked_ids:
+            return queryset.filter(title__icontains=value)
+        return queryset.filter(pk__in=ranked_ids).order_by(
+            Case(
+                *[When(pk=pk, then=rank) for rank, pk in enumerate(ranked_ids)],
+                output_field=IntegerField(),
+            )
+        )
+
 
 class TicketReGroup:
     """
@@ -8,7 +8,6 @@ from django.utils.translation import gettext_lazy as _
 from employee.models import Employee
 from base.models import Company
 from base.Mibs_company_manager import MibsCompanyManager
-from django.db.models.signals import post_save, post_delete
 from Mibs.models import MibsModel
 from Mibs_audit.methods import get_diff
 
@@ -216,24 +215,3 @@ class FAQ(MibsModel):
 
     def __str__(self):
         return self.question
-
-
-# updating the faq search index when a new faq is created or deleted
-
-
-def update_index(sender, instance, **kwargs):
-    from .search_indexes import FAQIndex
-
-    index = FAQIndex()
-    index.update_object(instance)
-
-
-def remove_from_index(sender, instance, **kwargs):
-    from .search_indexes import FAQIndex
-
-    index = FAQIndex()
-    index.remove_object(instance)
-
-
-post_save.connect(update_index, sender=FAQ)
-post_delete.connect(remove_from_index, sender=FAQ)
@@ -0,0 +1,72 @@
+"""
+search.py
+
+This module is used to query the full text search index, the results are
+ranked by relevance and can carry the highlighted matches.
+"""
+
+from haystack.query import SearchQuerySet
+
+# maximum number of search results loaded for a displayed (highlighted) query
+MAX_RESULTS = 500
+
+
+def search_results(query, *models, highlight=False, limit=MAX_RESULTS):
+    """
+    This method is used to get the search results of the query ranked by
+    relevance
+
+    Args:
+        query: text typed by the user
+        models: indexed models to search in
+        highlight: whether to attach the highlighted matches
+        limit: maximum number of results, None for all of them
+    """
+    results = SearchQuerySet().models(*models).auto_query(query)
+    if highlight:
+        results = results.highlight()
+    if limit is not None:
+        results = results[:limit]
+    return list(results)
+
+
+def search_ids(query, model):
+    """
+    This method is used to get the ids of the model matching the query, in
+    ranked order
+    """
+    return [int(result.pk) for result in search_results(query, model, limit=None)]
+
+
+def ranked_objects(queryset, query):
+    """
+    This method is used to get the records of the queryset matching the query
+    in ranked order, each record gets the highlighted match as `highlighted`
+    """
+    results = search_results(query, queryset.model, highlight=True)
+    highlights = {
+        int(result.pk): (result.highlighted or {}).get("text", [""])[0]
+        for result in results
+    }
+    records = queryset.filter(pk__in=highlights).in_bulk()
+    ranked = []
+    for pk, highlighted in highlights.items():
+        if pk in records:
+            records[pk].highlighted = highlighted
+            ranked.append(records[pk])
+    return ranked
+
+
+def ticket_search_ids(query):
+    """
+    This method is used to get the ids of the tickets matching the query in
+    their title, description or comments, in ranked order, all the matches
+    are returned so that the caller can scope them
+    """
+    from helpdesk.models import Comment, Ticket
+
+    ticket_ids = {}
+    for result in search_results(query, Ticket, Comment, limit=None):
+        ticket_id = result.ticket_id if result.model is Comment else int(result.pk)
+        ticket_ids.setdefault(ticket_id, None)
+    return list(ticket_ids)
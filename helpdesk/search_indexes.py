@@ -1,5 +1,5 @@
 from haystack import indexes
-from .models import FAQ
+from .models import FAQ, Comment, Ticket
 
 
 class FAQIndex(indexes.SearchIndex, indexes.Indexable):
@@ -9,3 +9,29 @@ class FAQIndex(indexes.SearchIndex, indexes.Indexable):
 
     def get_model(self):
         return FAQ
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.filter(is_active=True)
+
+
+class TicketIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, use_template=True)
+    title = indexes.CharField(model_attr="title")
+    status = indexes.CharField(model_attr="status")
+
+    def get_model(self):
+        return Ticket
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.filter(is_active=True)
+
+
+class CommentIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, use_template=True)
+    ticket_id = indexes.IntegerField(model_attr="ticket_id")
+
+    def get_model(self):
+        return Comment
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.filter(is_active=True, ticket__is_active=True)
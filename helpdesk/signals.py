@@ -0,0 +1,209 @@
+"""
+signals.py
+
+This module is used to keep the search index in sync with the indexed models.
+
+The saves and deletes are not written to the index on the request path, they
+are queued once the transaction is committed and a background thread applies
+them in batches, opening the index writer once per batch and model. The
+changes of a failed batch (a locked index for instance) are queued again a
+few times before they are dropped.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections, transaction
+from django.db.models import signals
+from haystack.exceptions import NotHandled
+from haystack.signals import BaseSignalProcessor
+from haystack.utils import get_identifier
+
+logger = logging.getLogger(__name__)
+
+# maximum number of queued changes applied in one batch
+BATCH_SIZE = 200
+# seconds the thread waits for more changes before applying a batch
+FLUSH_INTERVAL = 2
+# number of times the changes of a failed batch are queued again
+MAX_RETRIES = 3
+# seconds the thread waits after a failed batch
+RETRY_DELAY = 5
+
+
+class IndexUpdateThread(threading.Thread):
+    """
+    Thread applying the queued index changes in batches
+    """
+
+    def __init__(self, processor):
+        super().__init__(name="search-index-update", daemon=True)
+        self.processor = processor
+
+    def run(self):
+        while True:
+            batch = [self.processor.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.processor.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            close_old_connections()
+            failed = self.processor.apply(batch)
+            close_old_connections()
+            if failed:
+                self.processor.retry(failed)
+                time.sleep(RETRY_DELAY)
+
+
+class SignalProcessor(BaseSignalProcessor):
+    """
+    Signal processor queuing the changes of the indexed models, the queue is
+    applied by the IndexUpdateThread
+    """
+
+    def setup(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread_lock = threading.Lock()
+        self.thread = None
+        # failed attempts of the changes queued again, by identifier
+        self.retries = {}
+        signals.post_save.connect(self.handle_save)
+        signals.post_delete.connect(self.handle_delete)
+        atexit.register(self.flush)
+
+    def teardown(self):
+        signals.post_save.disconnect(self.handle_save)
+        signals.post_delete.disconnect(self.handle_delete)
+
+    def is_indexed(self, model):
+        """
+        This method is used to check the model has a search index
+        """
+        unified_index = self.connections["default"].get_unified_index()
+        return model in unified_index.get_indexed_models()
+
+    def enqueue(self, change):
+        """
+        This method is used to queue the change once the transaction is
+        committed and to start the thread on the first change
+        """
+
+        def put():
+            self.queue.put(change)
+            if self.thread is None or not self.thread.is_alive():
+                with self.thread_lock:
+                    if self.thread is None or not self.thread.is_alive():
+                        self.thread = IndexUpdateThread(self)
+                        self.thread.start()
+
+        transaction.on_commit(put)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            self.enqueue((get_identifier(instance), sender, instance.pk, "update"))
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            self.enqueue((get_identifier(instance), sender, instance.pk, "remove"))
+
+    def apply(self, batch):
+        """
+        This method is used to write a batch of queued changes to the index,
+        the updated records are loaded with one query per model, the records
+        no longer part of the index queryset are removed from the index
+
+        Returns:
+            list: the changes of the batch when it failed, otherwise empty
+        """
+        # the last change of a record wins
+        latest = {identifier: change for identifier, *change in batch}
+        updates = {}
+        for identifier, (model, pk, action) in latest.items():
+            if action == "update":
+                updates.setdefault(model, set()).add(pk)
+
+        failed = False
+        with self.lock:
+            for using in self.connection_router.for_write():
+                backend = self.connections[using].get_backend()
+                unified_index = self.connections[using].get_unified_index()
+                removes = [
+                    identifier
+                    for identifier, (_model, _pk, action) in latest.items()
+                    if action == "remove"
+                ]
+                try:
+                    for model, pks in updates.items():
+                        try:
+                            index = unified_index.get_index(model)
+                        except NotHandled:
+                            continue
+                        instances = list(
+                            index.index_queryset(using=using).filter(pk__in=pks)
+                        )
+                        if instances:
+                            # an update without records leaves the writer locked
+                            backend.update(index, instances)
+                        indexed = {instance.pk for instance in instances}
+                        removes += [
+                            f"{model._meta.label_lower}.{pk}" for pk in pks - indexed
+                        ]
+                    for identifier in removes:
+                        backend.remove(identifier)
+                except Exception as error:
+                    logger.error("Search index update failed: %s", error)
+                    failed = True
+            if not failed:
+                for identifier in latest:
+                    self.retries.pop(identifier, None)
+        if failed:
+            return [(identifier, *change) for identifier, change in latest.items()]
+        return []
+
+    def retry(self, changes):
+        """
+        This method is used to queue the changes of a failed batch again, a
+        change failing more than MAX_RETRIES times is dropped
+        """
+        with self.lock:
+            for change in changes:
+                identifier = change[0]
+                attempts = self.retries.get(identifier, 0) + 1
+                if attempts > MAX_RETRIES:
+                    self.retries.pop(identifier, None)
+                    logger.error(
+                        "Search index change of %s dropped after %s retries",
+                        identifier,
+                        MAX_RETRIES,
+                    )
+                    continue
+                self.retries[identifier] = attempts
+                self.queue.put(change)
+
+    def flush(self):
+        """
+        This method is used to apply the changes still queued, in the calling
+        thread
+        """
+        while True:
+            batch = []
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            failed = self.apply(batch)
+            if failed:
+                self.retry(failed)
+                time.sleep(RETRY_DELAY)
@@ -1,3 +1,126 @@
+from unittest import mock
+
 from django.test import TestCase
+from haystack import connection_router, connections
+
+from employee.models import Employee
+from helpdesk import signals
+from helpdesk.filter import TicketFilter
+from helpdesk.models import Ticket, TicketType
+from helpdesk.search import MAX_RESULTS, ticket_search_ids
+
+
+class TicketSearchTests(TestCase):
+    """
+    Search of the ticket filter
+    """
+
+    def setUp(self):
+        self.ticket_type = TicketType.objects.create(
+            title="Hardware", type="suggestion", prefix="HW"
+        )
+        self.owner = self.create_employee("owner")
+        self.laptop = self.create_ticket(self.owner, "Laptop screen broken")
+        self.printer = self.create_ticket(self.owner, "Printer jam")
+        other = self.create_employee("other")
+        self.other_ids = [
+            self.create_ticket(other, f"Laptop {index}").id for index in range(3)
+        ]
+
+    def create_employee(self, name):
+        return Employee.objects.create(
+            employee_first_name=name, email=f"{name}@example.com", phone="1"
+        )
+
+    def create_ticket(self, employee, title):
+        return Ticket.objects.create(
+            title=title,
+            employee_id=employee,
+            ticket_type=self.ticket_type,
+            description=title,
+            assigning_type="department",
+            raised_on="1",
+        )
+
+    def search(self, value, ticket_ids):
+        with mock.patch("helpdesk.filter.ticket_search_ids", return_value=ticket_ids):
+            return list(
+                TicketFilter(
+                    {"search": value},
+                    queryset=Ticket.objects.filter(employee_id=self.owner),
+                ).qs.values_list("title", flat=True)
+            )
+
+    def test_ranked_matches_of_the_queryset(self):
+        ticket_ids = self.other_ids + [self.printer.id, self.laptop.id]
+        self.assertEqual(
+            self.search("laptop", ticket_ids), ["Printer jam", "Laptop screen broken"]
+        )
+
+    def test_title_search_without_match_in_the_queryset(self):
+        self.assertEqual(self.search("laptop", []), ["Laptop screen broken"])
+        self.assertEqual(
+            self.search("laptop", self.other_ids), ["Laptop screen broken"]
+        )
+
+    def test_title_search_when_index_fails(self):
+        with mock.patch(
+            "helpdesk.filter.ticket_search_ids", side_effect=OSError("no index")
+        ):
+            self.assertEqual(
+                list(
+                    TicketFilter(
+                        {"search": "printer"}, queryset=Ticket.objects.all()
+                    ).qs.values_list("title", flat=True)
+                ),
+                ["Printer jam"],
+            )
+
+    def test_index_matches_are_not_capped(self):
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    title=f"Laptop {index}",
+                    employee_id=self.owner,
+                    ticket_type=self.ticket_type,
+                    description="Laptop",
+                    assigning_type="department",
+                    raised_on="1",
+                )
+                for index in range(MAX_RESULTS)
+            ]
+        )
+        backend = connections["default"].get_backend()
+        index = connections["default"].get_unified_index().get_index(Ticket)
+        backend.clear()
+        backend.update(index, Ticket.objects.all())
+        self.addCleanup(backend.clear)
+
+        self.assertEqual(len(ticket_search_ids("laptop")), Ticket.objects.count() - 1)
+
+
+class SignalProcessorRetryTests(TestCase):
+    """
+    Retry of the failed search index batches
+    """
+
+    def setUp(self):
+        self.processor = signals.SignalProcessor(connections, connection_router)
+        self.processor.teardown()
+        self.change = ("helpdesk.ticket.1", Ticket, 1, "update")
+
+    def test_failed_batch_is_returned(self):
+        backend = mock.Mock()
+        backend.remove.side_effect = OSError("index locked")
+        with mock.patch.object(self.processor, "connections") as connections_:
+            connections_.__getitem__.return_value.get_backend.return_value = backend
+            failed = self.processor.apply([("helpdesk.ticket.1", Ticket, 1, "remove")])
+        self.assertEqual(failed, [("helpdesk.ticket.1", Ticket, 1, "remove")])
 
-# Create your tests here.
+    def test_change_dropped_after_retries(self):
+        for _attempt in range(signals.MAX_RETRIES):
+            self.processor.retry([self.change])
+            self.assertEqual(self.processor.queue.get_nowait(), self.change)
+        self.processor.retry([self.change])
+        self.assertTrue(self.processor.queue.empty())
+        self.assertNotIn(self.change[0], self.processor.retries)
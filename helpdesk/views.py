@@ -10,6 +10,7 @@ from base.methods import filtersubordinates, get_key_instances, get_pagination,
 from base.models import Department, JobPosition, Tags
 from employee.models import Employee
 from helpdesk.filter import FAQCategoryFilter, FAQFilter, TicketFilter, TicketReGroup
+from helpdesk.search import ranked_objects
 from helpdesk.forms import (
     AttachmentForm,
     CommentForm,
@@ -25,7 +26,6 @@ from helpdesk.forms import (
 from django.utils.translation import gettext as _
 from django.contrib import messages
 from django.db.models import ProtectedError
-from haystack.query import SearchQuerySet
 from django.db.models import Q
 from django.core.paginator import Paginator
 from helpdesk.threading import AddAssigneeThread, RemoveAssigneeThread, TicketSendThread
@@ -272,23 +272,13 @@ def faq_search(request):
     data_dict = parse_qs(previous_data)
     get_key_instances(FAQ, data_dict)
 
-    if query:
-        results_list = (
-            SearchQuerySet()
-            .filter(Q(question__icontains=query) | Q(answer__icontains=query))
-            .using("default")
-        )
-        result_pks = [result.pk for result in results_list]
-        faqs = FAQ.objects.filter(pk__in=result_pks)
-
-    else:
-        faqs = FAQ.objects.filter(is_active=True)
-        if category:
-            return redirect(faq_category_search)
-
+    if not query and category:
+        return redirect(faq_category_search)
     if id:
         data_dict.pop("cat_id")
         faqs = faqs.filter(category=id)
+    if query:
+        faqs = ranked_objects(faqs, query)
     if category:
         data_dict.pop("category")
     context = {
@@ -364,8 +354,9 @@ def ticket_view(request):
     tickets = Ticket.objects.filter(is_active=True)
 
     previous_data = request.GET.urlencode()
+    ticket_filter = TicketFilter(request.GET)
     if request.method == "GET":
-        tickets = TicketFilter(request.GET).qs
+        tickets = ticket_filter.qs
     my_page_number = request.GET.get("my_page")
     all_page_number = request.GET.get("all_page")
     allocated_page_number = request.GET.get("allocated_page")
@@ -404,7 +395,7 @@ def ticket_view(request):
         "my_tickets": paginator_qry(my_tickets, my_page_number),
         "all_tickets": paginator_qry(all_tickets, all_page_number),
         "allocated_tickets": paginator_qry(allocated_tickets, allocated_page_number),
-        "f": TicketFilter(request.GET),
+        "f": ticket_filter,
         "gp_fields": TicketReGroup.fields,
         "ticket_status": TICKET_STATUS,
         "view": request.GET.get("view"),
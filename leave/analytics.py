@@ -0,0 +1,85 @@
+"""
+analytics.py
+
+This module is used to aggregate the approved leave requests for the
+dashboard charts in the database.
+
+Each aggregate is made with one query whatever the number of leave requests,
+the leave ranges are matched against the days with range conditions instead
+of expanding the requested dates of every leave request in python.
+"""
+
+from django.db.models import Count, Q, Sum
+
+from leave.models import LeaveRequest
+
+
+def approved_leave_requests():
+    """
+    This method is used to get the approved leave requests
+    """
+    return LeaveRequest.objects.filter(status="approved")
+
+
+def leave_days_by(group_field, month):
+    """
+    This method is used to sum the requested days of the approved leave
+    requests starting in the month, grouped by the field
+
+    Args:
+        group_field: path of the label the leave requests are grouped by
+        month: any date of the month
+
+    Returns:
+        list: (label, days) of the labels with leave days, ordered by label
+    """
+    return list(
+        approved_leave_requests()
+        .filter(
+            start_date__year=month.year,
+            start_date__month=month.month,
+            **{f"{group_field}__isnull": False},
+        )
+        .values(group_field)
+        .annotate(days=Sum("requested_days"))
+        .filter(days__gt=0)
+        .order_by(group_field)
+        .values_list(group_field, "days")
+    )
+
+
+def on_leave_condition(day):
+    """
+    This method is used to build the condition of the leave requests
+    including the day
+    """
+    return Q(start_date__lte=day) & (
+        Q(end_date__gte=day) | Q(end_date__isnull=True, start_date=day)
+    )
+
+
+def leave_count_per_day(days):
+    """
+    This method is used to count the approved leave requests including each
+    of the days
+
+    Returns:
+        list: the number of leave requests of each day, in the order of days
+    """
+    if not days:
+        return []
+    counts = (
+        approved_leave_requests()
+        .filter(start_date__lte=max(days))
+        .filter(
+            Q(end_date__gte=min(days))
+            | Q(end_date__isnull=True, start_date__gte=min(days))
+        )
+        .aggregate(
+            **{
+                f"day_{index}": Count("id", filter=on_leave_condition(day))
+                for index, day in enumerate(days)
+            }
+        )
+    )
+    return [counts[f"day_{index}"] for index in range(len(days))]
@@ -0,0 +1,123 @@
+"""
+assign.py
+
+This module is used to assign leave types to employees in bulk.
+
+The assignments already made are found with one query, the missing ones are
+built from one precomputed assignment per leave type (reset and expire dates)
+and created with bulk inserts (with their history), the employees are then
+notified once.
+"""
+
+import contextlib
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from simple_history.utils import bulk_create_with_history
+
+from leave.models import AvailableLeave
+from notifications.signals import notify
+
+BATCH_SIZE = 500
+
+# fields of the precomputed assignment of a leave type copied to each employee
+ASSIGN_FIELDS = [
+    "available_days",
+    "carryforward_days",
+    "total_leave_days",
+    "assigned_date",
+    "reset_date",
+    "expired_date",
+]
+
+
+def assigned_pairs(employees, leave_types):
+    """
+    This method is used to get the (employee id, leave type id) pairs already
+    assigned, with one query
+    """
+    return set(
+        AvailableLeave.objects.filter(
+            employee_id__in=employees, leave_type_id__in=leave_types
+        ).values_list("employee_id", "leave_type_id")
+    )
+
+
+def notify_assigned(sender, user_ids):
+    """
+    This method is used to notify the employees of their new leave types, with
+    one notification per employee
+    """
+    if sender is None or not user_ids:
+        return
+    with contextlib.suppress(Exception):
+        notify.send(
+            sender,
+            recipient=User.objects.filter(id__in=user_ids),
+            verb="New leave type is assigned to you",
+            verb_ar="تم تعيين نوع إجازة جديد لك",
+            verb_de="Ihnen wurde ein neuer Urlaubstyp zugewiesen",
+            verb_es="Se le ha asignado un nuevo tipo de permiso",
+            verb_fr="Un nouveau type de congé vous a été attribué",
+            icon="people-circle",
+            redirect="/leave/user-request-view",
+        )
+
+
+def assign_leave_types(pairs, assigned_by=None):
+    """
+    This method is used to assign the leave types to the employees, the pairs
+    already assigned are skipped
+
+    Args:
+        pairs: iterable of (employee, leave type)
+        assigned_by: the user making the assignment, the notifications are
+            sent from its employee
+
+    Returns:
+        tuple: the created available leaves and the skipped pairs
+    """
+    pairs = list(dict.fromkeys(pairs))
+    existing = assigned_pairs(
+        {employee.id for employee, _leave_type in pairs},
+        {leave_type.id for _employee, leave_type in pairs},
+    )
+
+    templates = {}
+    available_leaves = []
+    skipped = []
+    for employee, leave_type in pairs:
+        if (employee.id, leave_type.id) in existing:
+            skipped.append((employee, leave_type))
+            continue
+        template = templates.get(leave_type.id)
+        if template is None:
+            template = AvailableLeave(
+                leave_type_id=leave_type, available_days=leave_type.total_days
+            )
+            template.update_leave_fields()
+            templates[leave_type.id] = template
+        available_leaves.append(
+            AvailableLeave(
+                employee_id=employee,
+                leave_type_id=leave_type,
+                created_by=assigned_by,
+                **{field: getattr(template, field) for field in ASSIGN_FIELDS},
+            )
+        )
+
+    if available_leaves:
+        sender = getattr(assigned_by, "employee_get", None)
+        user_ids = {
+            available_leave.employee_id.employee_user_id_id
+            for available_leave in available_leaves
+        } - {None}
+        with transaction.atomic():
+            available_leaves = bulk_create_with_history(
+                available_leaves,
+                AvailableLeave,
+                batch_size=BATCH_SIZE,
+                default_user=assigned_by,
+            )
+            transaction.on_commit(lambda: notify_assigned(sender, user_ids))
+    return available_leaves, skipped
@@ -398,6 +398,14 @@ class AvailableLeave(MibsModel):
         return expired_date
 
     def save(self, *args, **kwargs):
+        self.update_leave_fields()
+        super().save(*args, **kwargs)
+
+    def update_leave_fields(self):
+        """
+        This method is used to set the reset and expire dates of a new
+        assignment and the total leave days, nothing is saved
+        """
         # if self.assigned_date == datetime.now().date() or self.assigned_date.date() == datetime.now().date():
         if self.reset_date is None:
             # Check whether the reset is enabled
@@ -415,7 +423,6 @@ class AvailableLeave(MibsModel):
 
         self.total_leave_days = max(self.available_days + self.carryforward_days, 0)
         self.carryforward_days = max(self.carryforward_days, 0)
-        super().save(*args, **kwargs)
 
 
 def restrict_leaves(restri):
@@ -905,6 +912,18 @@ class LeaveRequestConditionApproval(models.Model):
     leave_request_id = models.ForeignKey(LeaveRequest, on_delete=models.CASCADE)
     manager_id = models.ForeignKey(Employee, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["manager_id", "leave_request_id", "sequence"],
+                name="leave_condition_manager_step",
+            ),
+            models.Index(
+                fields=["leave_request_id", "sequence"],
+                name="leave_condition_step",
+            ),
+        ]
+
 
 class RestrictLeave(MibsModel):
     title = models.CharField(max_length = 20)
@@ -9,10 +9,10 @@ from datetime import datetime, timedelta, date
 from collections import defaultdict
 from urllib.parse import parse_qs
 from django.db.models import Q
+from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404, render, redirect
 from django.db.models import ProtectedError
 from django.utils.translation import gettext as __
-from django.core.paginator import Paginator
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
@@ -28,7 +28,10 @@ from base.methods import (
     filter_conditional_leave_request,
     get_pagination,
 )
+from leave.analytics import leave_count_per_day, leave_days_by
+from leave.assign import assign_leave_types
 from leave.threading import LeaveMailSendThread
+from base.keyset_paginator import paginate
 from base.models import *
 from base.methods import (
     filtersubordinates,
@@ -104,9 +107,7 @@ def paginator_qry(qryset, page_number):
     """
     function used to paginate query set
     """
-    paginator = Paginator(qryset, get_pagination())
-    qryset = paginator.get_page(page_number)
-    return qryset
+    return paginate(qryset, get_pagination(), page_number)
 
 
 @login_required
@@ -404,7 +405,7 @@ def leave_request_view(request):
     excel_column = LeaveRequestExportForm()
     export_filter = LeaveRequestFilter()
     requests = queryset.filter(status="requested").count()
-    requests_ids = json.dumps(list(page_obj.object_list.values_list("id", flat=True)))
+    requests_ids = json.dumps([instance.id for instance in page_obj.object_list])
     approved_requests = queryset.filter(status="approved").count()
     rejected_requests = queryset.filter(status="cancelled").count()
     previous_data = request.GET.urlencode()
@@ -917,34 +918,17 @@ def leave_assign_one(request, id):
     form = choosesubordinates(request, form, "leave.add_availableleave")
     if request.method == "POST":
         leave_type = LeaveType.objects.get(id=id)
-        employee_ids = request.POST.getlist("employee_id")
-        for employee_id in employee_ids:
-            employee = Employee.objects.get(id=employee_id)
-            if not AvailableLeave.objects.filter(
-                leave_type_id=leave_type, employee_id=employee
-            ).exists():
-                AvailableLeave(
-                    leave_type_id=leave_type,
-                    employee_id=employee,
-                    available_days=leave_type.total_days,
-                ).save()
-                messages.success(request, _("Leave type assign is successfull.."))
-                with contextlib.suppress(Exception):
-                    notify.send(
-                        request.user.employee_get,
-                        recipient=employee.employee_user_id,
-                        verb="New leave type is assigned to you",
-                        verb_ar="تم تعيين نوع إجازة جديد لك",
-                        verb_de="Ihnen wurde ein neuer Urlaubstyp zugewiesen",
-                        verb_es="Se le ha asignado un nuevo tipo de permiso",
-                        verb_fr="Un nouveau type de congé vous a été attribué",
-                        icon="people-circle",
-                        redirect="/leave/user-request-view",
-                    )
-            else:
-                messages.info(
-                    request, _("leave type is already assigned to the employee..")
-                )
+        employees = Employee.objects.filter(id__in=request.POST.getlist("employee_id"))
+        available_leaves, skipped = assign_leave_types(
+            [(employee, leave_type) for employee in employees],
+            assigned_by=request.user,
+        )
+        if available_leaves:
+            messages.success(request, _("Leave type assign is successfull.."))
+        if skipped:
+            messages.info(
+                request, _("leave type is already assigned to the employee..")
+            )
         response = render(
             request,
             "leave/leave_assign/leave_assign_one_form.html",
@@ -1107,37 +1091,27 @@ def leave_assign(request):
     form = choosesubordinates(request, form, "leave.add_availableleave")
 
     if request.method == "POST":
-        leave_type_ids = request.POST.getlist("leave_type_id")
-        employee_ids = request.POST.getlist("employee_id")
-        for employee_id in employee_ids:
-            if employee_id != "":
-                for leave_type_id in leave_type_ids:
-                    if leave_type_id != "":
-                        employee = Employee.objects.get(id=employee_id)
-                        leave_type = LeaveType.objects.get(id=leave_type_id)
-                        if not AvailableLeave.objects.filter(
-                            leave_type_id=leave_type, employee_id=employee
-                        ).exists():
-                            AvailableLeave(
-                                leave_type_id=leave_type,
-                                employee_id=employee,
-                                available_days=leave_type.total_days,
-                            ).save()
-                            messages.success(
-                                request, _("Leave type assign is successful..")
-                            )
-                            with contextlib.suppress(Exception):
-                                notify.send(
-                                    request.user.employee_get,
-                                    recipient=employee.employee_user_id,
-                                    verb="New leave type is assigned to you",
-                                    # ... (remaining notify.send parameters)
-                                )
-                        else:
-                            messages.info(
-                                request,
-                                _("Leave type is already assigned to the employee.."),
-                            )
+        leave_types = LeaveType.objects.filter(
+            id__in=[value for value in request.POST.getlist("leave_type_id") if value]
+        )
+        employees = Employee.objects.filter(
+            id__in=[value for value in request.POST.getlist("employee_id") if value]
+        )
+        available_leaves, skipped = assign_leave_types(
+            [
+                (employee, leave_type)
+                for employee in employees
+                for leave_type in leave_types
+            ],
+            assigned_by=request.user,
+        )
+        if available_leaves:
+            messages.success(request, _("Leave type assign is successful.."))
+        if skipped:
+            messages.info(
+                request,
+                _("Leave type is already assigned to the employee.."),
+            )
         return HttpResponse("<script>window.location.reload()</script>")
     return render(
         request, "leave/leave_assign/leave_assign_form.html", {"assign_form": form}
@@ -1289,15 +1263,31 @@ def assign_leave_type_import(request):
         file = request.FILES["assign_leave_type_import"]
         data_frame = pd.read_excel(file)
         assign_leave_dicts = data_frame.to_dict("records")
+        employees = {}
+        for employee in Employee.objects.annotate(
+            lower_badge_id=Lower("badge_id")
+        ).filter(
+            lower_badge_id__in={
+                str(assign_leave.get("Employee Badge ID")).lower()
+                for assign_leave in assign_leave_dicts
+            }
+        ):
+            employees.setdefault(employee.lower_badge_id, employee)
+        leave_types = {}
+        for leave_type in LeaveType.objects.annotate(lower_name=Lower("name")).filter(
+            lower_name__in={
+                str(assign_leave.get("Leave Type")).lower()
+                for assign_leave in assign_leave_dicts
+            }
+        ):
+            leave_types.setdefault(leave_type.lower_name, leave_type)
+
+        pairs = {}
         for assign_leave in assign_leave_dicts:
             try:
                 save = True
-                assign_leave_type = assign_leave["Leave Type"]
-                badge_id = assign_leave["Employee Badge ID"]
-                employee = Employee.objects.filter(badge_id__iexact=badge_id).first()
-                leave_type = LeaveType.objects.filter(
-                    name__iexact=assign_leave_type
-                ).first()
+                employee = employees.get(str(assign_leave["Employee Badge ID"]).lower())
+                leave_type = leave_types.get(str(assign_leave["Leave Type"]).lower())
                 if employee is None:
                     save = False
                     assign_leave["Error1"] = _("This badge id does not exist.")
@@ -1305,24 +1295,25 @@ def assign_leave_type_import(request):
                 if leave_type is None:
                     save = False
                     assign_leave["Error2"] = _("This leave type does not exist.")
-                if AvailableLeave.objects.filter(
-                    leave_type_id=leave_type, employee_id=employee
-                ).exists():
+                if save and (employee, leave_type) in pairs:
                     save = False
                     assign_leave["Error3"] = _(
                         "Leave type has already been assigned to the employee."
                     )
                 if save:
-                    AvailableLeave(
-                        leave_type_id=leave_type,
-                        employee_id=employee,
-                        available_days=leave_type.total_days,
-                    ).save()
+                    pairs[(employee, leave_type)] = assign_leave
                 else:
                     error_list.append(assign_leave)
             except Exception as exception:
                 assign_leave["Error4"] = f"{str(exception)}"
                 error_list.append(assign_leave)
+        _available_leaves, skipped = assign_leave_types(pairs, assigned_by=request.user)
+        for pair in skipped:
+            assign_leave = pairs[pair]
+            assign_leave["Error3"] = _(
+                "Leave type has already been assigned to the employee."
+            )
+            error_list.append(assign_leave)
         if error_list:
             response = generate_error_report(error_list, error_data, file_name)
             return response
@@ -2273,9 +2264,7 @@ def user_request_view(request):
         page_number = request.GET.get("page")
         user_request_filter = UserLeaveRequestFilter(request.GET, queryset=queryset)
         page_obj = paginator_qry(user_request_filter.qs.order_by("-id"), page_number)
-        request_ids = json.dumps(
-            list(page_obj.object_list.values_list("id", flat=True))
-        )
+        request_ids = json.dumps([instance.id for instance in page_obj.object_list])
 
         user_leave = AvailableLeave.objects.filter(employee_id=user.id)
 
@@ -2705,27 +2694,11 @@ def department_leave_chart(request):
         day = request.GET.get("date")
         day = datetime.strptime(day, "%Y-%m")
 
-    departments = Department.objects.all()
-    department_counts = {dep.department: 0 for dep in departments}
-    leave_request = LeaveRequest.objects.filter(status="approved")
-    leave_request = leave_request.filter(
-        start_date__month=day.month, start_date__year=day.year
+    department_days = leave_days_by(
+        "employee_id__employee_work_info__department_id__department", day
     )
-    leave_dates = []
-    labels = []
-    for leave in leave_request:
-        for leave_date in leave.requested_dates():
-            leave_dates.append(leave_date.strftime("%Y-%m-%d"))
-
-        for dep in departments:
-            if dep == leave.employee_id.employee_work_info.department_id:
-                department_counts[dep.department] += leave.requested_days
-
-    for department, count in department_counts.items():
-        if count != 0:
-            labels.append(department)
-    values = list(department_counts.values())
-    values = [value for value in values if value != 0]
+    labels = [department for department, _days in department_days]
+    values = [days for _department, days in department_days]
     dataset = [
         {
             "label": _(""),
@@ -2756,24 +2729,9 @@ def leave_type_chart(request):
         day = request.GET.get("date")
         day = datetime.strptime(day, "%Y-%m")
 
-    leave_types = LeaveType.objects.all()
-    leave_type_count = {types.name: 0 for types in leave_types}
-    leave_request = LeaveRequest.objects.filter(status="approved")
-    leave_request = leave_request.filter(
-        start_date__month=day.month, start_date__year=day.year
-    )
-    for leave in leave_request:
-        for lev in leave_types:
-            if lev == leave.leave_type_id:
-                leave_type_count[lev.name] += leave.requested_days
-
-    # labels = [leave_type.name for leave_type in leave_types]
-    labels = []
-    for leave_type, count in leave_type_count.items():
-        if count != 0:
-            labels.append(leave_type)
-    values = list(leave_type_count.values())
-    values = [value for value in values if value != 0]
+    leave_type_days = leave_days_by("leave_type_id__name", day)
+    labels = [leave_type for leave_type, _days in leave_type_days]
+    values = [days for _leave_type, days in leave_type_days]
 
     response = {
         "labels": labels,
@@ -2802,25 +2760,14 @@ def leave_over_period(request):
     start_of_week = today - timedelta(days=today.weekday())
     week_dates = [start_of_week + timedelta(days=i) for i in range(6)]
 
-    leave_in_week = []
-
-    leave_request = LeaveRequest.objects.filter(status="approved")
-    leave_dates = []
-    for leave in leave_request:
-        for leave_date in leave.requested_dates():
-            leave_dates.append(leave_date)
-
-    filtered_dates = [
-        day
-        for day in leave_dates
-        if day.month == today.month and day.year == today.year
+    # only the days of the current month are counted
+    month_dates = [
+        week_date
+        for week_date in week_dates
+        if week_date.month == today.month and week_date.year == today.year
     ]
-    for week_date in week_dates:
-        days = []
-        for filtered_date in filtered_dates:
-            if filtered_date == week_date:
-                days.append(filtered_date)
-        leave_in_week.append(len(days))
+    counts = dict(zip(month_dates, leave_count_per_day(month_dates)))
+    leave_in_week = [counts.get(week_date, 0) for week_date in week_dates]
 
     dataset = (
         {
@@ -2959,7 +2906,7 @@ def leave_allocation_request_view(request):
     page_number = request.GET.get("page")
     leave_allocation_requests = paginator_qry(queryset, page_number)
     requests_ids = json.dumps(
-        list(leave_allocation_requests.object_list.values_list("id", flat=True))
+        [instance.id for instance in leave_allocation_requests.object_list]
     )
     my_leave_allocation_requests = LeaveAllocationRequest.objects.filter(
         employee_id=employee.id
@@ -2972,7 +2919,7 @@ def leave_allocation_request_view(request):
         my_leave_allocation_requests, my_page_number
     )
     my_requests_ids = json.dumps(
-        list(my_leave_allocation_requests.object_list.values_list("id", flat=True))
+        [instance.id for instance in my_leave_allocation_requests.object_list]
     )
     leave_allocation_request_filter = LeaveAllocationRequestFilter()
     previous_data = request.GET.urlencode()
@@ -3145,10 +3092,10 @@ def leave_allocation_request_filter(request):
             my_leave_allocation_requests_filtered, my_page_number
         )
         requests_ids = json.dumps(
-            list(leave_allocation_requests.object_list.values_list("id", flat=True))
+            [instance.id for instance in leave_allocation_requests.object_list]
         )
         my_requests_ids = json.dumps(
-            list(my_leave_allocation_requests.object_list.values_list("id", flat=True))
+            [instance.id for instance in my_leave_allocation_requests.object_list]
         )
 
     # Parse previous data and construct context for filter tag
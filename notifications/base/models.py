@@ -296,11 +296,12 @@ def notify_handler(verb, **kwargs):
         recipients = [recipient]
 
     new_notifications = []
+    actor_content_type = ContentType.objects.get_for_model(actor)
 
     for recipient in recipients:
         newnotify = Notification(
             recipient=recipient,
-            actor_content_type=ContentType.objects.get_for_model(actor),
+            actor_content_type=actor_content_type,
             actor_object_id=actor.pk,
             verb=str(verb),
             public=public,
@@ -325,10 +326,10 @@ def notify_handler(verb, **kwargs):
             newnotify.verb_de = newnotify.data.get("verb_de", None)
             newnotify.verb_es = newnotify.data.get("verb_es", None)
             newnotify.verb_fr = newnotify.data.get("verb_fr", None)
-        newnotify.save()
         new_notifications.append(newnotify)
 
-    return new_notifications
+    # one insert for all the recipients
+    return Notification.objects.bulk_create(new_notifications)
 
 
 # connect the signal
@@ -49,58 +49,57 @@ from onboarding.filters import OnboardingStageFilter
 
 from payroll.models.models import Contract, PayrollGeneralSetting
 from attendance.methods.group_by import group_by_queryset as group_by
-from recruitment.pipeline_grouper import group_by_queryset
+from attendance.methods.group_by import group_by_groupers
 
 
 def pipeline_grouper(filters={}, offboardings=[]):
-    groups = []
+    offboardings = list(offboardings)
+    stages = PipelineStageFilter(
+        filters,
+        queryset=OffboardingStage.objects.filter(offboarding_id__in=offboardings),
+    ).qs.order_by("id")
+    offboarding_stages = {}
+    for stage in stages:
+        offboarding_stages.setdefault(stage.offboarding_id_id, []).append(stage)
+
+    stage_employees = PipelineEmployeeFilter(
+        filters,
+        OffboardingEmployee.objects.filter(
+            stage_id__in=stages, employee_id__is_active=True
+        ),
+    ).qs.order_by("stage_id__id")
+    employee_groups = group_by_groupers(
+        stage_employees,
+        "stage_id",
+        [
+            (
+                stage.id,
+                stage,
+                f"dynamic_page_page{stage.title}{stage.offboarding_id_id}{stage.id}",
+            )
+            for stage in stages
+        ],
+    )
+    stage_groups = {group["grouper"].id: group for group in employee_groups}
 
+    offboarding_employees = {}
+    for offboarding_id, employee_id in OffboardingEmployee.objects.filter(
+        stage_id__in=stages
+    ).values_list("stage_id__offboarding_id", "id"):
+        offboarding_employees.setdefault(offboarding_id, []).append(employee_id)
+
+    groups = []
     for offboarding in offboardings:
-        employees = []
-        stages = PipelineStageFilter(
-            filters, queryset=offboarding.offboardingstage_set.all()
-        ).qs.order_by("id")
-        all_stages_grouper = []
-        data = {"offboarding": offboarding, "stages": [], "employees": []}
-        for stage in stages:
-            all_stages_grouper.append({"grouper": stage, "list": []})
-            stage_employees = PipelineEmployeeFilter(
-                filters,
-                OffboardingEmployee.objects.filter(
-                    stage_id=stage, employee_id__is_active=True
-                ),
-            ).qs.order_by("stage_id__id")
-            page_name = "page" + stage.title + str(offboarding.id)
-            employee_grouper = group_by_queryset(
-                stage_employees,
-                "stage_id",
-                filters.get(page_name),
-                page_name,
-            ).object_list
-            employees = employees + [
-                employee.id for employee in stage.offboardingemployee_set.all()
-            ]
-            data["stages"] = data["stages"] + employee_grouper
-
-        ordered_data = []
-
-        # combining un used groups in to the grouper
-        groupers = data["stages"]
-        for stage in stages:
-            found = False
-            for grouper in groupers:
-                if grouper["grouper"] == stage:
-                    ordered_data.append(grouper)
-                    found = True
-                    break
-            if not found:
-                ordered_data.append({"grouper": stage})
-        data = {
-            "offboarding": offboarding,
-            "stages": ordered_data,
-            "employee_ids": employees,
-        }
-        groups.append(data)
+        groups.append(
+            {
+                "offboarding": offboarding,
+                "stages": [
+                    stage_groups[stage.id]
+                    for stage in offboarding_stages.get(offboarding.id, [])
+                ],
+                "employee_ids": offboarding_employees.get(offboarding.id, []),
+            }
+        )
 
     return groups
 
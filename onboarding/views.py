@@ -72,7 +72,7 @@ from onboarding.decorators import (
     stage_manager_can_enter,
     recruitment_manager_can_enter,
 )
-from recruitment.pipeline_grouper import group_by_queryset
+from attendance.methods.group_by import group_by_groupers
 
 
 @login_required
@@ -720,52 +720,54 @@ def onboarding_query_grouper(request, queryset):
     """
     This method is used to make group of the onboarding records
     """
+    recruitments = list(queryset)
+    stages = OnboardingStageFilter(
+        request.GET,
+        queryset=OnboardingStage.objects.filter(recruitment_id__in=recruitments),
+    ).qs.order_by("sequence")
+    recruitment_stages = {}
+    for stage in stages:
+        recruitment_stages.setdefault(stage.recruitment_id_id, []).append(stage)
+
+    stage_candidates = OnboardingCandidateFilter(
+        request.GET,
+        CandidateStage.objects.filter(
+            onboarding_stage_id__in=stages,
+            candidate_id__is_active=True,
+        ),
+    ).qs.order_by("sequence")
+    candidate_groups = group_by_groupers(
+        stage_candidates,
+        "onboarding_stage_id",
+        [
+            (
+                stage.id,
+                stage,
+                f"dynamic_page_page{stage.stage_title}{stage.recruitment_id_id}{stage.id}",
+            )
+            for stage in stages
+        ],
+    )
+    stage_groups = {group["grouper"].id: group for group in candidate_groups}
+
+    recruitment_employees = {}
+    for recruitment_id, candidate_id in CandidateStage.objects.filter(
+        onboarding_stage_id__in=stages
+    ).values_list("onboarding_stage_id__recruitment_id", "candidate_id"):
+        recruitment_employees.setdefault(recruitment_id, []).append(candidate_id)
+
     groups = []
-    for rec in queryset:
-        employees = []
-        stages = OnboardingStageFilter(
-            request.GET, queryset=rec.onboarding_stage.all()
-        ).qs.order_by("sequence")
-        all_stages_grouper = []
-        data = {"recruitment": rec, "stages": []}
-        for stage in stages:
-            all_stages_grouper.append({"grouper": stage, "list": []})
-            stage_candidates = OnboardingCandidateFilter(
-                request.GET,
-                stage.candidate.filter(
-                    candidate_id__is_active=True,
-                ),
-            ).qs.order_by("sequence")
-
-            page_name = "page" + stage.stage_title + str(rec.id)
-            grouper = group_by_queryset(
-                stage_candidates,
-                "onboarding_stage_id",
-                request.GET.get(page_name),
-                page_name,
-            ).object_list
-            data["stages"] = data["stages"] + grouper
-            employees = employees + [
-                employee.candidate_id.id for employee in stage.candidate.all()
-            ]
-        ordered_data = []
-        # combining un used groups in to the grouper
-        groupers = data["stages"]
-        for stage in stages:
-            found = False
-            for grouper in groupers:
-                if grouper["grouper"] == stage:
-                    ordered_data.append(grouper)
-                    found = True
-                    break
-            if not found:
-                ordered_data.append({"grouper": stage})
-        data = {
-            "recruitment": rec,
-            "stages": ordered_data,
-            "employee_ids": employees,
-        }
-        groups.append(data)
+    for rec in recruitments:
+        groups.append(
+            {
+                "recruitment": rec,
+                "stages": [
+                    stage_groups[stage.id]
+                    for stage in recruitment_stages.get(rec.id, [])
+                ],
+                "employee_ids": recruitment_employees.get(rec.id, []),
+            }
+        )
     return groups
 
 
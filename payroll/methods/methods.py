@@ -7,9 +7,9 @@ Payroll related module to write custom calculation methods
 import calendar
 from datetime import timedelta, datetime, date
 from django.db.models import F, Q
-from django.core.paginator import Paginator
 from dateutil.relativedelta import relativedelta
 from base.methods import get_pagination
+from base.keyset_paginator import paginate
 from leave.models import Holiday, CompanyLeave
 from attendance.models import Attendance
 from payroll.models.models import Contract, Deduction, Payslip
@@ -574,9 +574,7 @@ def paginator_qry(qryset, page_number):
     """
     This method is used to paginate queryset
     """
-    paginator = Paginator(qryset, get_pagination())
-    qryset = paginator.get_page(page_number)
-    return qryset
+    return paginate(qryset, get_pagination(), page_number)
 
 
 def calculate_employer_contribution(data):
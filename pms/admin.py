@@ -9,6 +9,7 @@ from simple_history.admin import SimpleHistoryAdmin
 from .models import (
     AnonymousFeedback,
     Comment,
+    CyclicFeedbackLog,
     EmployeeKeyResult,
     Period,
     EmployeeObjective,
@@ -36,4 +37,5 @@ admin.site.register(feedback)
 admin.site.register(KeyResult)
 admin.site.register(Objective)
 admin.site.register(KeyResultFeedback)
+admin.site.register(CyclicFeedbackLog)
 admin.site.register(Comment, SimpleHistoryAdmin)
@@ -0,0 +1,131 @@
+"""
+cyclic_feedback.py
+
+This module is used to generate the next feedback of the cyclic feedbacks.
+
+Every cyclic feedback due is cloned with its colleagues, subordinates and key
+results, the clones and their relations are created with bulk inserts and the
+generation is logged, all in one transaction.
+"""
+
+import logging
+from datetime import date
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def cyclic_title(review_cycle, start_date):
+    """
+    This method is used to get the title of the generated feedback from the
+    title of the cyclic feedback
+    """
+    title = review_cycle.split("- cyclic")[0].strip()
+    return f"{title} - cyclic {start_date}"
+
+
+def clone_feedback(feedback):
+    """
+    This method is used to build the next feedback of the cyclic feedback,
+    nothing is saved
+    """
+    from pms.models import Feedback
+
+    clone = Feedback()
+    for field in Feedback._meta.concrete_fields:
+        if not field.primary_key:
+            setattr(clone, field.attname, getattr(feedback, field.attname))
+    clone.created_at = None
+    clone.review_cycle = cyclic_title(
+        feedback.review_cycle, feedback.cyclic_next_start_date
+    )
+    clone.status = "Not Started"
+    clone.start_date = feedback.cyclic_next_start_date
+    clone.end_date = feedback.cyclic_next_end_date
+    clone.set_cyclic_next_dates()
+    return clone
+
+
+def create_feedbacks(clones):
+    """
+    This method is used to insert the generated feedbacks, saved one by one
+    when the database does not return the primary keys of a bulk insert
+    """
+    from pms.models import Feedback
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Feedback.objects.bulk_create(clones)
+    for clone in clones:
+        clone.save()
+    return clones
+
+
+def copy_relations(pairs):
+    """
+    This method is used to copy the many to many relations of the cyclic
+    feedbacks to the generated ones, one insert per relation
+
+    Args:
+        pairs: list of (cyclic feedback, generated feedback)
+    """
+    from pms.models import Feedback
+
+    clone_ids = {feedback.id: clone.id for feedback, clone in pairs}
+    for field in Feedback._meta.many_to_many:
+        through = field.remote_field.through
+        source = f"{field.m2m_field_name()}_id"
+        target = f"{field.m2m_reverse_field_name()}_id"
+        rows = through.objects.filter(**{f"{source}__in": clone_ids}).values_list(
+            source, target
+        )
+        through.objects.bulk_create(
+            [
+                through(**{source: clone_ids[feedback_id], target: target_id})
+                for feedback_id, target_id in rows
+            ]
+        )
+
+
+def generate_cyclic_feedbacks(today=None):
+    """
+    This method is used to generate the next feedback of the cyclic feedbacks
+    starting on or before today, the cyclic feedbacks are then marked as done
+    so a feedback is generated once per cycle
+
+    Args:
+        today: the date of the generation, the current date by default
+
+    Returns:
+        list: the generated feedbacks
+    """
+    from pms.models import CyclicFeedbackLog, Feedback
+
+    today = today or date.today()
+    with transaction.atomic():
+        feedbacks = list(
+            Feedback.objects.select_for_update(skip_locked=True)
+            .filter(cyclic_feedback=True, cyclic_next_start_date__lte=today)
+            .order_by("id")
+        )
+        if not feedbacks:
+            return []
+
+        clones = create_feedbacks([clone_feedback(feedback) for feedback in feedbacks])
+        pairs = list(zip(feedbacks, clones))
+        copy_relations(pairs)
+        Feedback.objects.filter(id__in=[feedback.id for feedback in feedbacks]).update(
+            cyclic_feedback=False
+        )
+        CyclicFeedbackLog.objects.bulk_create(
+            [
+                CyclicFeedbackLog(
+                    feedback_id=feedback,
+                    generated_feedback_id=clone,
+                    cycle_date=clone.start_date,
+                )
+                for feedback, clone in pairs
+            ]
+        )
+    logger.info("%s cyclic feedbacks generated", len(clones))
+    return clones
@@ -469,32 +469,49 @@ class Feedback(MibsModel):
     cyclic_next_end_date = models.DateField(null=True, blank=True)
 
     objects = MibsCompanyManager("employee_id__employee_work_info__company_id")
-    
+
     class Meta:
         ordering = ["-id"]
 
     def save(self, *args, **kwargs):
-        start_date = self.start_date
-        end_date = self.end_date
-        cyclic_feedback_period = self.cyclic_feedback_period
-        cyclic_feedback_days_count = self.cyclic_feedback_days_count
-        
-        if cyclic_feedback_period == "months":
-            self.cyclic_next_start_date = self.start_date + relativedelta(months=cyclic_feedback_days_count)
-            self.cyclic_next_end_date = end_date + relativedelta(months=cyclic_feedback_days_count)
-        elif cyclic_feedback_period == "years":
-            self.cyclic_next_start_date = start_date + relativedelta(years=cyclic_feedback_days_count)
-            self.cyclic_next_end_date = end_date + relativedelta(years=cyclic_feedback_days_count)
-        elif cyclic_feedback_period == "days":
-            self.cyclic_next_start_date = start_date + relativedelta(days=cyclic_feedback_days_count)
-            self.cyclic_next_end_date = end_date + relativedelta(days=cyclic_feedback_days_count)
-
+        self.set_cyclic_next_dates()
         super().save(*args, **kwargs)
 
+    def set_cyclic_next_dates(self):
+        """
+        This method is used to set the start and end dates of the next cycle
+        """
+        period = self.cyclic_feedback_period
+        if period not in ("days", "months", "years"):
+            return
+        delta = relativedelta(**{period: self.cyclic_feedback_days_count or 0})
+        self.cyclic_next_start_date = self.start_date + delta
+        self.cyclic_next_end_date = self.end_date + delta if self.end_date else None
+
     def __str__(self):
         return f"{self.employee_id.employee_first_name} - {self.review_cycle}"
 
 
+class CyclicFeedbackLog(models.Model):
+    """log of the feedbacks generated by the cyclic feedbacks"""
+
+    feedback_id = models.ForeignKey(
+        Feedback, on_delete=models.CASCADE, related_name="cyclic_feedback_log"
+    )
+    generated_feedback_id = models.OneToOneField(
+        Feedback, on_delete=models.CASCADE, related_name="generated_from_log"
+    )
+    cycle_date = models.DateField()
+    generated_at = models.DateTimeField(auto_now_add=True)
+    objects = models.Manager()
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.feedback_id} - {self.cycle_date}"
+
+
 class AnonymousFeedback(models.Model):
     """feedback model for creating feedback"""
 
@@ -1,44 +1,21 @@
+import logging
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
-from notifications.signals import notify
 
+logger = logging.getLogger(__name__)
 
-def cyclic_feedback_creation():
-    from pms.models import Feedback
-    
-    try:
-        feedbacks = Feedback.objects.filter(
-            cyclic_next_start_date=datetime.today().date()
-        )
-        for feedback in feedbacks:
-            if feedback.cyclic_feedback:
-                feedback_obj = Feedback()
-                for field in feedback._meta.fields:
-                    if field.name not in [
-                        "id",
-                        "cyclic_next_start_date",
-                        "cyclic_next_end_date",
-                    ]:
-                        setattr(feedback_obj, field.name, getattr(feedback, field.name))
-                title = (
-                    f"{feedback_obj.review_cycle.split('- cyclic')[0]} - cyclic {feedback_obj.start_date}"
-                    if "- cyclic" in feedback_obj.review_cycle
-                    else f"{feedback_obj.review_cycle} - cyclic {feedback_obj.start_date}"
-                )
-                feedback_obj.review_cycle = title
-                feedback_obj.status = "Not Started"
-                feedback_obj.start_date = feedback.cyclic_next_start_date
-                feedback_obj.end_date = feedback.cyclic_next_end_date
-                feedback_obj.save()
-                
-                feedback.cyclic_feedback = False
-                feedback.save()
 
-                return feedback_obj
+def cyclic_feedback_creation():
+    """
+    This method is used to generate the feedbacks of the cyclic feedbacks due
+    """
+    from pms.cyclic_feedback import generate_cyclic_feedbacks
 
-    except Exception as e:
-        print(e)
+    try:
+        generate_cyclic_feedbacks()
+    except Exception as error:
+        logger.error("Cyclic feedback generation failed: %s", error)
 
 
 scheduler = BackgroundScheduler()
@@ -1,3 +1,115 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from employee.models import Employee
+from pms.cyclic_feedback import generate_cyclic_feedbacks
+from pms.models import (
+    CyclicFeedbackLog,
+    EmployeeKeyResult,
+    EmployeeObjective,
+    Feedback,
+    QuestionTemplate,
+)
+
+
+class CyclicFeedbackTests(TestCase):
+    """
+    Generation of the feedbacks of the cyclic feedbacks
+    """
+
+    def setUp(self):
+        self.template = QuestionTemplate(question_template="Quarterly review")
+        self.template.save()
+        self.employees = [
+            Employee.objects.create(
+                employee_first_name=f"EMP{index}",
+                email=f"emp{index}@example.com",
+                phone="1",
+                badge_id=f"EMP{index}",
+            )
+            for index in range(4)
+        ]
+        objective = EmployeeObjective.objects.create(
+            objective="Sales",
+            employee_id=self.employees[1],
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+        )
+        self.key_result = EmployeeKeyResult.objects.create(
+            key_result="Sales", employee_objective_id=objective
+        )
+        self.today = date(2024, 3, 31)
+
+    def create_feedback(self, review_cycle, employee, **kwargs):
+        values = {
+            "start_date": date(2024, 1, 31),
+            "end_date": date(2024, 2, 29),
+            "cyclic_feedback": True,
+            "cyclic_feedback_days_count": 2,
+            "cyclic_feedback_period": "months",
+        }
+        values.update(kwargs)
+        feedback = Feedback(
+            review_cycle=review_cycle,
+            employee_id=employee,
+            manager_id=self.employees[0],
+            question_template_id=self.template,
+            **values,
+        )
+        feedback.save()
+        return feedback
+
+    def test_next_dates(self):
+        feedback = self.create_feedback("Q1", self.employees[1])
+        self.assertEqual(feedback.cyclic_next_start_date, date(2024, 3, 31))
+        self.assertEqual(feedback.cyclic_next_end_date, date(2024, 4, 29))
+
+    def test_generate_all_feedbacks_due_the_same_day(self):
+        feedbacks = []
+        for index, employee in enumerate(self.employees[1:], start=1):
+            feedback = self.create_feedback(f"Q{index}", employee, status="Closed")
+            feedback.colleague_id.set(self.employees[:index])
+            feedback.subordinate_id.set([self.employees[3]])
+            feedback.employee_key_results_id.set([self.key_result])
+            feedbacks.append(feedback)
+        not_due = self.create_feedback(
+            "Later", self.employees[1], start_date=date(2024, 2, 15)
+        )
+
+        # constant number of queries whatever the number of feedbacks due
+        with self.assertNumQueries(12):
+            generated = generate_cyclic_feedbacks(self.today)
+
+        self.assertEqual(len(generated), 3)
+        for index, feedback in enumerate(feedbacks, start=1):
+            log = CyclicFeedbackLog.objects.get(feedback_id=feedback)
+            clone = log.generated_feedback_id
+            self.assertEqual(log.cycle_date, self.today)
+            self.assertEqual(clone.review_cycle, f"Q{index} - cyclic 2024-03-31")
+            self.assertEqual(clone.status, "Not Started")
+            self.assertEqual(clone.employee_id, feedback.employee_id)
+            self.assertEqual(clone.question_template_id, self.template)
+            self.assertEqual(clone.start_date, date(2024, 3, 31))
+            self.assertEqual(clone.end_date, date(2024, 4, 29))
+            self.assertTrue(clone.cyclic_feedback)
+            self.assertEqual(clone.cyclic_next_start_date, date(2024, 5, 31))
+            self.assertEqual(set(clone.colleague_id.all()), set(self.employees[:index]))
+            self.assertEqual(list(clone.subordinate_id.all()), [self.employees[3]])
+            self.assertEqual(
+                list(clone.employee_key_results_id.all()), [self.key_result]
+            )
+            feedback.refresh_from_db()
+            self.assertFalse(feedback.cyclic_feedback)
+        not_due.refresh_from_db()
+        self.assertTrue(not_due.cyclic_feedback)
+
+    def test_generate_once_per_cycle(self):
+        self.create_feedback("Q1 - cyclic 2023-11-30", self.employees[1])
+
+        self.assertEqual(len(generate_cyclic_feedbacks(self.today)), 1)
+        self.assertEqual(generate_cyclic_feedbacks(self.today), [])
+        self.assertTrue(
+            Feedback.objects.filter(review_cycle="Q1 - cyclic 2024-03-31").exists()
+        )
+        self.assertEqual(CyclicFeedbackLog.objects.count(), 1)
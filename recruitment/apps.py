@@ -19,3 +19,8 @@ class RecruitmentConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "recruitment"
+
+    def ready(self):
+        super().ready()
+        # connects the stage type count cache invalidation signals
+        import recruitment.methods
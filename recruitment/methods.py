@@ -5,7 +5,14 @@ This page is used to write reusable methods.
 
 """
 
-from recruitment.models import Recruitment, RecruitmentSurvey
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from recruitment.models import Candidate, Recruitment, RecruitmentSurvey, Stage
+
+STAGE_TYPE_COUNT_CACHE_KEY = "recruitment:stage_type_counts:{}"
+STAGE_TYPE_COUNT_CACHE_TIMEOUT = 60 * 60
 
 
 def is_stagemanager(request):
@@ -70,3 +77,87 @@ def update_rec_template_grp(upt_template_ids, template_groups, rec_id):
             )
             for survey in rec_surveys_templates:
                 survey.recruitment_ids.add(recruitment_obj)
+
+
+def stage_type_candidate_counts(recruitment_ids):
+    """
+    This method is used to find the count of active candidates in each stage
+    type of the recruitments, the counts are cached per recruitment and
+    invalidated when a candidate or stage of the recruitment changes
+
+    Returns:
+        dict: {recruitment_id: {stage_type: count}}
+    """
+    keys = {
+        rec_id: STAGE_TYPE_COUNT_CACHE_KEY.format(rec_id) for rec_id in recruitment_ids
+    }
+    cached = cache.get_many(keys.values())
+    counts = {rec_id: cached[key] for rec_id, key in keys.items() if key in cached}
+    missing = [rec_id for rec_id in keys if rec_id not in counts]
+    if missing:
+        missing_counts = {
+            rec_id: {stage_type: 0 for stage_type, _label in Stage.stage_types}
+            for rec_id in missing
+        }
+        rows = (
+            Candidate.objects.filter(
+                is_active=True, stage_id__recruitment_id__in=missing
+            )
+            .values("stage_id__recruitment_id", "stage_id__stage_type")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            missing_counts[row["stage_id__recruitment_id"]][
+                row["stage_id__stage_type"]
+            ] = row["count"]
+        cache.set_many(
+            {keys[rec_id]: value for rec_id, value in missing_counts.items()},
+            STAGE_TYPE_COUNT_CACHE_TIMEOUT,
+        )
+        counts.update(missing_counts)
+    return counts
+
+
+def invalidate_stage_type_counts(*recruitment_ids):
+    """
+    This method is used to drop the cached stage type counts of the recruitments
+    """
+    cache.delete_many(
+        [
+            STAGE_TYPE_COUNT_CACHE_KEY.format(rec_id)
+            for rec_id in set(recruitment_ids)
+            if rec_id is not None
+        ]
+    )
+
+
+@receiver(pre_save, sender=Candidate)
+def candidate_pre_save_stage_counts(sender, instance, **kwargs):
+    """
+    Invalidate the counts of the recruitment the candidate is moved out of
+    """
+    if instance.pk:
+        invalidate_stage_type_counts(
+            *Candidate.objects.filter(pk=instance.pk).values_list(
+                "recruitment_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def candidate_stage_counts_changed(sender, instance, **kwargs):
+    """
+    Invalidate the counts of the candidate's recruitment
+    """
+    invalidate_stage_type_counts(instance.recruitment_id_id)
+
+
+@receiver(post_save, sender=Stage)
+@receiver(post_delete, sender=Stage)
+def stage_stage_counts_changed(sender, instance, **kwargs):
+    """
+    Invalidate the counts of the stage's recruitment
+    """
+    invalidate_stage_type_counts(instance.recruitment_id_id)
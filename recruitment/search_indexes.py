@@ -0,0 +1,16 @@
+from haystack import indexes
+from .models import Candidate
+
+
+class CandidateIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, use_template=True)
+
+    def get_model(self):
+        return Candidate
+
+    def index_queryset(self, using=None):
+        return (
+            self.get_model()
+            .objects.filter(is_active=True)
+            .select_related("job_position_id")
+        )
@@ -6,26 +6,41 @@ This module is used to write dashboard related views
 
 import datetime
 from django.core import serializers
+from django.db.models import Count
 from django.http import JsonResponse
 from django.utils.translation import gettext_lazy as _
 from django.shortcuts import render
 from Mibs.decorators import login_required
 from recruitment.decorators import manager_can_enter
+from recruitment.methods import stage_type_candidate_counts
 from recruitment.models import Candidate, Recruitment, SkillZone, Stage
 from base.models import Department, JobPosition
 from employee.models import EmployeeWorkInformation
 
 
-def stage_type_candidate_count(rec, stage_type):
+def job_position_stage_type_counts(jobs):
     """
-    This method is used find the count of candidate in recruitment
+    This method is used to find the count of candidates in each stage type for
+    the job positions with one grouped query
+
+    Returns:
+        list: [(job_position, initial, test, interview, hired, cancelled), ...]
     """
-    candidates_count = 0
-    for stage_obj in rec.stage_set.filter(stage_type=stage_type):
-        candidates_count = candidates_count + len(
-            stage_obj.candidate_set.filter(is_active=True)
-        )
-    return candidates_count
+    counts = {}
+    rows = (
+        Candidate.objects.filter(job_position_id__in=jobs)
+        .values("job_position_id", "stage_id__stage_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        counts[(row["job_position_id"], row["stage_id__stage_type"])] = row["count"]
+
+    stage_types = ["initial", "test", "interview", "hired", "cancelled"]
+    return [
+        (job.job_position, *[counts.get((job.id, type), 0) for type in stage_types])
+        for job in jobs
+    ]
 
 
 @login_required
@@ -35,72 +50,29 @@ def dashboard(request):
     This method is used to render dashboard for recruitment module
     """
     candidates = Candidate.objects.all()
-    stage_chart_count = 0
     vacancy_chart = Recruitment.objects.filter(closed=False, is_event_based=False)
-    if vacancy_chart.exists():
-        dep_vacancy = 1
-    else:
-        dep_vacancy = 0
-    employee_info = EmployeeWorkInformation.objects.all()
-    joining_list = []
-    for rec in employee_info:
-        if rec.date_joining != None:
-            joining_list.append("OK")
-    if joining_list != []:
-        joining = 1
-    else:
-        joining = 0
-
-    jobs = JobPosition.objects.all()
-    all_job = []
-    for job in jobs:
-        jobpos = job.job_position
-        all_job.append(jobpos)
-
-    initial = []
-    for job in jobs:
-        ini = Candidate.objects.filter(
-            job_position_id=job, stage_id__stage_type="initial"
-        )
-        initial.append(ini.count())
-
-    test = []
-    for job in jobs:
-        tes = Candidate.objects.filter(job_position_id=job, stage_id__stage_type="test")
-        test.append(tes.count())
+    dep_vacancy = 1 if vacancy_chart.exists() else 0
+    joining = (
+        1
+        if EmployeeWorkInformation.objects.filter(date_joining__isnull=False).exists()
+        else 0
+    )
 
-    interview = []
-    for job in jobs:
-        inter = Candidate.objects.filter(
-            job_position_id=job, stage_id__stage_type="interview"
-        )
-        interview.append(inter.count())
+    job_data = job_position_stage_type_counts(list(JobPosition.objects.all()))
 
-    hired = []
-    for job in jobs:
-        hire = Candidate.objects.filter(
-            job_position_id=job, stage_id__stage_type="hired"
-        )
-        hired.append(hire.count())
-    cancelled = []
-    for job in jobs:
-        cancelled_candidates = Candidate.objects.filter(
-            job_position_id=job, stage_id__stage_type="cancelled"
+    recruitment_obj = list(
+        Recruitment.objects.filter(closed=False).prefetch_related(
+            "recruitment_managers"
         )
-        cancelled.append(cancelled_candidates.count())
-
-    job_data = list(zip(all_job, initial, test, interview, hired, cancelled))
-
-    recruitment_obj = Recruitment.objects.filter(closed=False)
+    )
     ongoing_recruitments = len(recruitment_obj)
 
-    for rec in recruitment_obj:
-        data = [stage_type_candidate_count(rec, type[0]) for type in Stage.stage_types]
-        for i in data:
-            stage_chart_count += i
-
-        if stage_chart_count >= 1:
-            stage_chart_count = 1
+    stage_type_counts = stage_type_candidate_counts([rec.id for rec in recruitment_obj])
+    stage_chart_count = (
+        1
+        if any(sum(counts.values()) for counts in stage_type_counts.values())
+        else 0
+    )
 
     onboarding_count = Candidate.objects.filter(start_onboard=True)
     onboarding_count = onboarding_count.count()
@@ -125,8 +97,8 @@ def dashboard(request):
             total_vacancy += openings.vacancy
 
     hired_candidates = candidates.filter(hired=True)
-    total_candidates = len(candidates)
-    total_hired_candidates = len(hired_candidates)
+    total_candidates = candidates.count()
+    total_hired_candidates = hired_candidates.count()
     conversion_ratio = 0
     hired_ratio = 0
     total_candidate_ratio = 0
@@ -170,12 +142,19 @@ def dashboard_pipeline(request):
     """
     This method is used generate recruitment dataset for the dashboard
     """
-    recruitment_obj = Recruitment.objects.filter(closed=False)
+    recruitment_obj = list(Recruitment.objects.filter(closed=False))
+    recruitment_ids = [rec.id for rec in recruitment_obj]
+    stage_type_counts = stage_type_candidate_counts(recruitment_ids)
+    recruitments_with_candidates = set(
+        Candidate.objects.filter(recruitment_id__in=recruitment_ids)
+        .values_list("recruitment_id", flat=True)
+        .distinct()
+    )
     data_set = []
     labels = [type[1] for type in Stage.stage_types]
     for rec in recruitment_obj:
-        data = [stage_type_candidate_count(rec, type[0]) for type in Stage.stage_types]
-        if rec.candidate.all():
+        data = [stage_type_counts[rec.id][type[0]] for type in Stage.stage_types]
+        if rec.id in recruitments_with_candidates:
             data_set.append(
                 {
                     "label": (
@@ -20,12 +20,12 @@ import contextlib
 from urllib.parse import parse_qs
 from django.conf import settings
 from django.db.models import Q
-from django.http import JsonResponse, HttpResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponse, HttpResponseRedirect, QueryDict
 from django.db.models import ProtectedError
 from django.shortcuts import render, redirect
 from django.core import serializers
 from django.core.paginator import Paginator
-from attendance.methods.group_by import group_by_queryset
+from attendance.methods.group_by import group_by_groupers, group_by_queryset
 from base.context_processors import check_candidate_self_tracking
 from base.models import EmailLog, JobPosition
 from django.contrib import messages
@@ -69,7 +69,7 @@ from recruitment.filters import (
     SkillZoneFilter,
     StageFilter,
 )
-from recruitment.methods import recruitment_manages
+from recruitment.methods import invalidate_stage_type_counts, recruitment_manages
 from recruitment.decorators import manager_can_enter, recruitment_manager_can_enter
 from recruitment.forms import (
     AddCandidateForm,
@@ -141,49 +141,43 @@ def is_recruitmentmanager(request, rec_id=False):
 
 
 def pipeline_grouper(request, recruitments):
+    recruitments = list(recruitments)
+    stages = StageFilter(
+        request.GET, queryset=Stage.objects.filter(recruitment_id__in=recruitments)
+    ).qs.order_by("sequence")
+    recruitment_stages = {}
+    for stage in stages:
+        recruitment_stages.setdefault(stage.recruitment_id_id, []).append(stage)
+
+    stage_candidates = CandidateFilter(
+        request.GET,
+        Candidate.objects.filter(stage_id__in=stages, is_active=True),
+    ).qs.order_by("sequence")
+    candidate_groups = group_by_groupers(
+        stage_candidates,
+        "stage_id",
+        [
+            (
+                stage.id,
+                stage,
+                f"dynamic_page_page{stage.stage}{stage.recruitment_id_id}{stage.id}",
+            )
+            for stage in stages
+        ],
+    )
+    stage_groups = {group["grouper"].id: group for group in candidate_groups}
+
     groups = []
     for rec in recruitments:
-        stages = StageFilter(request.GET, queryset=rec.stage_set.all()).qs.order_by(
-            "sequence"
+        groups.append(
+            {
+                "recruitment": rec,
+                "stages": [
+                    stage_groups[stage.id]
+                    for stage in recruitment_stages.get(rec.id, [])
+                ],
+            }
         )
-        all_stages_grouper = []
-        data = {"recruitment": rec, "stages": []}
-        for stage in stages.order_by("sequence"):
-            all_stages_grouper.append({"grouper": stage, "list": []})
-            stage_candidates = CandidateFilter(
-                request.GET,
-                stage.candidate_set.filter(
-                    is_active=True,
-                ),
-            ).qs.order_by("sequence")
-
-            page_name = "page" + stage.stage + str(rec.id)
-            grouper = group_by_queryset(
-                stage_candidates,
-                "stage_id",
-                request.GET.get(page_name),
-                page_name,
-            ).object_list
-            data["stages"] = data["stages"] + grouper
-
-        ordered_data = []
-
-        # combining un used groups in to the grouper
-        groupers = data["stages"]
-        for stage in stages:
-            found = False
-            for grouper in groupers:
-                if grouper["grouper"] == stage:
-                    ordered_data.append(grouper)
-                    found = True
-                    break
-            if not found:
-                ordered_data.append({"grouper": stage})
-        data = {
-            "recruitment": rec,
-            "stages": ordered_data,
-        }
-        groups.append(data)
     return groups
 
 
@@ -338,9 +332,6 @@ def paginator_qry_recruitment_limited(qryset, page_number):
     return qryset
 
 
-user_recruitments = {}
-
-
 @login_required
 @manager_can_enter(perm="recruitment.view_recruitment")
 def recruitment_pipeline(request):
@@ -350,9 +341,6 @@ def recruitment_pipeline(request):
     view = request.GET.get("view")
     rec = Recruitment.objects.filter(is_active=True)
     filter_obj = RecruitmentFilter(request.GET, queryset=rec)
-    # user_recruitments[request.user.id] = {
-    #     "recruitments": rec,
-    # }
     if filter_obj.qs.exists() and view == "card":
         template = "pipeline/pipeline_card.html"
     elif rec.exists():
@@ -376,7 +364,33 @@ def recruitment_pipeline(request):
     )
 
 
-cache = {}
+PIPELINE_FILTER_SESSION_KEY = "recruitment_pipeline_filter"
+
+
+def pipeline_filter_query(request):
+    """
+    This method is used to get the last pipeline filter of the user, the filter
+    is kept in the session so that it is shared across the worker processes
+    """
+    return QueryDict(request.session.get(PIPELINE_FILTER_SESSION_KEY, ""))
+
+
+def pipeline_candidates(request):
+    """
+    This method is used to get the active candidates of the pipeline filter
+    """
+    return (
+        CandidateFilter(pipeline_filter_query(request))
+        .qs.filter(is_active=True)
+        .order_by("sequence")
+    )
+
+
+def pipeline_stages(request):
+    """
+    This method is used to get the stages of the pipeline filter
+    """
+    return StageFilter(pipeline_filter_query(request)).qs.order_by("sequence")
 
 
 @login_required
@@ -400,13 +414,7 @@ def filter_pipeline(request):
     filter_dict = parse_qs(request.GET.urlencode())
     filter_dict = get_key_instances(Recruitment, filter_dict)
 
-    cache[request.user.id] = {
-        "candidates": candidate_filter.qs.filter(is_active=True).order_by("sequence"),
-        "stages": stage_filter.qs.order_by("sequence"),
-        "recruitments": recruitments,
-        "filter_dict": filter_dict,
-        "filter_query": request.GET,
-    }
+    request.session[PIPELINE_FILTER_SESSION_KEY] = request.GET.urlencode()
 
     previous_data = request.GET.urlencode()
     paginator = Paginator(recruitments, 4)
@@ -451,7 +459,7 @@ def stage_component(request):
     """
     recruitment_id = request.GET["rec_id"]
     recruitment = Recruitment.objects.get(id=recruitment_id)
-    ordered_stages = cache[request.user.id]["stages"].filter(
+    ordered_stages = pipeline_stages(request).filter(
         recruitment_id__id=recruitment_id
     )
     template = "pipeline/components/stages_tab_content.html"
@@ -463,7 +471,10 @@ def stage_component(request):
         {
             "rec": recruitment,
             "ordered_stages": ordered_stages,
-            "filter_dict": cache[request.user.id]["filter_dict"],
+            "filter_dict": get_key_instances(
+                Recruitment,
+                parse_qs(request.session.get(PIPELINE_FILTER_SESSION_KEY, "")),
+            ),
         },
     )
 
@@ -476,10 +487,18 @@ def update_candidate_sequence(request):
     """
     order_list = request.GET.getlist("order")
     stage_id = request.GET["stage_id"]
-    stage = cache[request.user.id]["stages"].filter(id=stage_id).first()
+    stage = pipeline_stages(request).filter(id=stage_id).first()
+    candidates = pipeline_candidates(request).in_bulk(order_list)
+    ordered_candidates = []
     for index, cand_id in enumerate(order_list):
-        candidate = cache[request.user.id]["candidates"].filter(id=cand_id)
-        candidate.update(sequence=index, stage_id=stage)
+        candidate = candidates.get(int(cand_id))
+        if candidate is not None:
+            candidate.sequence = index
+            candidate.stage_id = stage
+            ordered_candidates.append(candidate)
+    Candidate.objects.bulk_update(ordered_candidates, ["sequence", "stage_id"])
+    if stage:
+        invalidate_stage_type_counts(stage.recruitment_id_id)
     return HttpResponse("")
 
 
@@ -492,7 +511,7 @@ def update_candidate_stage(request):
     stage_id = request.GET["stage_id"]
     candidate_id = request.GET["candidate_id"]
     stage = Stage.objects.get(id=stage_id)
-    candidate = cache[request.user.id]["candidates"].filter(id=candidate_id)
+    candidate = pipeline_candidates(request).filter(id=candidate_id)
     candidate.update(stage_id=stage)
     return update_candidate_sequence(request)
 
@@ -513,11 +532,11 @@ def candidate_component(request):
     Candidate component
     """
     stage_id = request.GET.get("stage_id")
-    stage = cache[request.user.id]["stages"].filter(id=stage_id).first()
-    candidates = cache[request.user.id]["candidates"].filter(stage_id=stage)
+    stage = pipeline_stages(request).filter(id=stage_id).first()
+    candidates = pipeline_candidates(request).filter(stage_id=stage)
 
     template = "pipeline/components/candidate_stage_component.html"
-    if cache[request.user.id]["filter_query"].get("view") == "card":
+    if pipeline_filter_query(request).get("view") == "card":
         template = "pipeline/kanban_components/candidate_kanban_components.html"
 
     return render(